@@ -2,38 +2,230 @@
 
 from __future__ import annotations
 
+from datetime import timedelta
+
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_SCAN_INTERVAL
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.const import Platform
+from homeassistant.core import Event
 from homeassistant.core import HomeAssistant
+from homeassistant.core import ServiceCall
+from homeassistant.core import ServiceResponse
+from homeassistant.core import SupportsResponse
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.typing import ConfigType
+import voluptuous as vol
 
 from .api import LesliesPoolApi
+from .const import ATTR_CONFIG_ENTRY_ID
+from .const import ATTR_FORMAT
+from .const import ATTR_PATH
+from .const import DATA_UPDATE_INTERVAL
 from .const import DOMAIN
+from .const import SERVICE_EXPORT_HISTORY
+from .const import SERVICE_GET_WATER_BALANCE
+from .const import SESSION_KEEPALIVE_INTERVAL
+from .coordinator import LesliesPoolCoordinator
+from .export import EXPORT_FORMATS
+from .export import FORMAT_CSV
+from .offload import shutdown as shutdown_parse_pool
+from .scheduler import async_get_scheduler
+from .session_cache import async_claim_session
+from .session_cache import async_park_session
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+GET_WATER_BALANCE_SCHEMA = vol.Schema({vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_CSV): vol.In(EXPORT_FORMATS),
+    }
+)
+
+
+def _update_interval(entry: ConfigEntry) -> timedelta:
+    """Return the polling interval, preferring options over initial data."""
+    scan_interval = entry.options.get(
+        CONF_SCAN_INTERVAL, entry.data.get(CONF_SCAN_INTERVAL, DATA_UPDATE_INTERVAL)
+    )
+    return timedelta(seconds=scan_interval)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Register the integration's services."""
+
+    async def async_get_water_balance(call: ServiceCall) -> ServiceResponse:
+        """Return the water balance series for every test of an entry."""
+        entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+        coordinator = hass.data.get(DOMAIN, {}).get(entry_id)
+        if coordinator is None:
+            raise ServiceValidationError(f"No loaded Leslie's Pool entry {entry_id}")
+        return coordinator.history.as_series()
+
+    async def async_export_history(call: ServiceCall) -> ServiceResponse:
+        """Append new water tests of one or every loaded pool to a file."""
+        path = call.data[ATTR_PATH]
+        if not hass.config.is_allowed_path(path):
+            raise ServiceValidationError(f"Cannot write to {path}")
+
+        coordinators: dict[str, LesliesPoolCoordinator] = hass.data.get(DOMAIN, {})
+        if ATTR_CONFIG_ENTRY_ID in call.data:
+            entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+            if entry_id not in coordinators:
+                raise ServiceValidationError(
+                    f"No loaded Leslie's Pool entry {entry_id}"
+                )
+            coordinators = {entry_id: coordinators[entry_id]}
+
+        # Pools are exported one after another so only one history is in memory
+        rows = 0
+        for coordinator in coordinators.values():
+            try:
+                rows += await coordinator.async_export_history(
+                    path, call.data[ATTR_FORMAT]
+                )
+            except ImportError as err:
+                raise HomeAssistantError(
+                    "Parquet export needs the pyarrow package"
+                ) from err
+            except OSError as err:
+                raise HomeAssistantError(f"Cannot write to {path}: {err}") from err
+        return {"rows": rows}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_WATER_BALANCE,
+        async_get_water_balance,
+        schema=GET_WATER_BALANCE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def async_stop_parse_pool(_event: Event) -> None:
+        """Stop the water test parse processes, if any were started."""
+        await hass.async_add_executor_job(shutdown_parse_pool)
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop_parse_pool)
+    return True
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Leslie's Pool Water Tests from a config entry."""
     data = entry.data
-    api = LesliesPoolApi(
-        data["username"], data["password"], data["pool_profile_id"], data["pool_name"]
+
+    # Reuse the session the config flow (or a previous load) already logged in
+    api = async_claim_session(
+        hass, data["username"], data["password"], data["pool_profile_id"]
     )
+    if api is None:
+        api = LesliesPoolApi(
+            data["username"],
+            data["password"],
+            data["pool_profile_id"],
+            data["pool_name"],
+        )
 
-    # Run the authenticate method in the executor to avoid blocking the event loop
-    authenticated = await hass.async_add_executor_job(api.authenticate)
-    if not authenticated:
-        return False
+        # Run the authenticate method in the executor to avoid blocking the event loop
+        await api.async_reserve(login=True)
+        authenticated = await hass.async_add_executor_job(api.authenticate)
+        if not authenticated:
+            return False
+
+    # Entries of one account share a scheduler so their work takes turns
+    coordinator = LesliesPoolCoordinator(
+        hass,
+        api,
+        _update_interval(entry),
+        scheduler=async_get_scheduler(hass, data["username"]),
+    )
+    coordinator.async_apply_options(_update_interval(entry), dict(entry.options))
+    await coordinator.async_refresh()
 
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = api
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
+
+    # Refresh the login during idle time so polls rarely pay for re-auth
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_keep_alive,
+            timedelta(seconds=SESSION_KEEPALIVE_INTERVAL),
+        )
+    )
+
+    # Options are applied to the live coordinator instead of reloading the entry
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
 
 
+async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Migrate an entry created by an older version of the integration."""
+    if entry.version > 2:
+        return False
+
+    if entry.version == 1:
+        # Version 1 sensors used "<entry_id>_<sensor>" unique IDs
+        registry = er.async_get(hass)
+        legacy_prefix = f"{entry.entry_id}_"
+        current_prefix = f"{entry.entry_id}_leslies_"
+
+        @callback
+        def _migrate_unique_id(entity_entry: er.RegistryEntry) -> dict | None:
+            """Move a legacy sensor to the current unique ID and entity ID."""
+            unique_id = entity_entry.unique_id
+            if not unique_id.startswith(legacy_prefix) or unique_id.startswith(
+                current_prefix
+            ):
+                return None
+            sensor_type = unique_id.removeprefix(legacy_prefix)
+            new_unique_id = f"{current_prefix}{sensor_type}"
+            if registry.async_get_entity_id("sensor", DOMAIN, new_unique_id):
+                # The current sensor was already created; drop the stale one
+                registry.async_remove(entity_entry.entity_id)
+                return None
+            updates: dict = {"new_unique_id": new_unique_id}
+            new_entity_id = f"sensor.leslies_{sensor_type}"
+            if registry.async_get(new_entity_id) is None:
+                updates["new_entity_id"] = new_entity_id
+            return updates
+
+        await er.async_migrate_entries(hass, entry.entry_id, _migrate_unique_id)
+        hass.config_entries.async_update_entry(entry, version=2)
+
+    return True
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if DOMAIN in hass.data:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id, None)
+        # Keep the session around briefly so a reload or reauth can reuse it
+        if coordinator is not None:
+            async_park_session(hass, coordinator.api)
 
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running entry without reloading it."""
+    coordinator: LesliesPoolCoordinator = hass.data[DOMAIN][entry.entry_id]
+    coordinator.async_apply_options(_update_interval(entry), dict(entry.options))
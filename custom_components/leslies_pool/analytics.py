@@ -0,0 +1,209 @@
+"""Vectorized water-balance analytics over a pool's water test history."""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import numpy as np
+
+# Columns kept for every test, in the order they are stored
+HISTORY_COLUMNS = (
+    "free_chlorine",
+    "ph",
+    "alkalinity",
+    "calcium",
+    "cyanuric_acid",
+    "salt",
+)
+
+# Acceptable ranges used for the out-of-range flags
+BALANCE_RANGES = {
+    "ph": (7.2, 7.8),
+    "alkalinity": (80.0, 120.0),
+    "calcium": (200.0, 400.0),
+    "cyanuric_acid": (30.0, 80.0),
+    "salt": (2700.0, 3400.0),
+    "saturation_index": (-0.3, 0.3),
+    "fc_cya_ratio": (7.5, np.inf),
+}
+
+# Assumed water temperature; the site does not report one
+DEFAULT_WATER_TEMPERATURE = 27.0  # Celsius
+# Dissolved solids in fresh fill water, on top of any added salt
+BASE_TDS = 300.0
+# Share of cyanuric acid that reads as alkalinity at a typical pool pH
+CYA_ALKALINITY_FACTOR = 1 / 3
+
+_INITIAL_CAPACITY = 64
+
+
+def _to_float(value) -> float:
+    """Return a reading as a float, or NaN if it is blank or not numeric."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_day(value) -> np.datetime64:
+    """Return an MM/DD/YYYY test date as a day, or NaT."""
+    try:
+        return np.datetime64(datetime.strptime(value, "%m/%d/%Y").date(), "D")
+    except (TypeError, ValueError):
+        return np.datetime64("NaT", "D")
+
+
+def saturation_index(
+    ph: np.ndarray,
+    alkalinity: np.ndarray,
+    calcium: np.ndarray,
+    cyanuric_acid: np.ndarray,
+    salt: np.ndarray,
+    temperature: float = DEFAULT_WATER_TEMPERATURE,
+) -> np.ndarray:
+    """Return the Langelier Saturation Index for every test.
+
+    Uses the Carrier form ``LSI = pH - pHs`` with
+    ``pHs = (9.3 + A + B) - (C + D)``, correcting total alkalinity for
+    cyanuric acid and estimating TDS from salt.
+    """
+    tds = BASE_TDS + np.nan_to_num(salt, nan=0.0)
+    carbonate_alkalinity = alkalinity - np.nan_to_num(cyanuric_acid, nan=0.0) * (
+        CYA_ALKALINITY_FACTOR
+    )
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a = (np.log10(tds) - 1) / 10
+        b = -13.12 * np.log10(temperature + 273.15) + 34.55
+        c = np.log10(calcium) - 0.4
+        d = np.log10(np.where(carbonate_alkalinity > 0, carbonate_alkalinity, np.nan))
+    return ph - ((9.3 + a + b) - (c + d))
+
+
+def fc_cya_ratio(free_chlorine: np.ndarray, cyanuric_acid: np.ndarray) -> np.ndarray:
+    """Return free chlorine as a percentage of cyanuric acid for every test."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(cyanuric_acid > 0, 100 * free_chlorine / cyanuric_acid, np.nan)
+
+
+def out_of_range(values: np.ndarray, bounds: tuple[float, float]) -> np.ndarray:
+    """Return True where a reading is present and outside its bounds."""
+    low, high = bounds
+    with np.errstate(invalid="ignore"):
+        return ~np.isnan(values) & ((values < low) | (values > high))
+
+
+class WaterTestHistory:
+    """A pool's water test history stored as growable columnar arrays.
+
+    Rows are appended as the fetch path discovers them; analytics are
+    computed for the whole history in one vectorized pass and cached until
+    more rows arrive.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty history."""
+        self._size = 0
+        self._dates = np.empty(_INITIAL_CAPACITY, dtype="datetime64[D]")
+        self._columns = {
+            column: np.empty(_INITIAL_CAPACITY, dtype=np.float64)
+            for column in HISTORY_COLUMNS
+        }
+        self._analysis: dict[str, np.ndarray] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of tests in the history."""
+        return self._size
+
+    def _grow(self, needed: int) -> None:
+        """Double the array capacity until ``needed`` rows fit."""
+        capacity = len(self._dates)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._dates = np.resize(self._dates, capacity)
+        for column, values in self._columns.items():
+            self._columns[column] = np.resize(values, capacity)
+
+    def extend(self, rows: list[dict]) -> None:
+        """Append water test rows, given newest first, in chronological order."""
+        if not rows:
+            return
+        start = self._size
+        self._grow(start + len(rows))
+        for offset, row in enumerate(reversed(rows), start):
+            self._dates[offset] = _to_day(row.get("test_date"))
+            for column, values in self._columns.items():
+                values[offset] = _to_float(row.get(column))
+        self._size += len(rows)
+        self._analysis = None
+
+    @property
+    def dates(self) -> np.ndarray:
+        """Return the test dates, oldest first."""
+        return self._dates[: self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """Return one reading for every test, oldest first."""
+        return self._columns[name][: self._size]
+
+    def analyze(self, temperature: float = DEFAULT_WATER_TEMPERATURE) -> dict:
+        """Return LSI, FC/CYA ratio and out-of-range flags for every test."""
+        if self._analysis is not None:
+            return self._analysis
+
+        series = {
+            "saturation_index": saturation_index(
+                self.column("ph"),
+                self.column("alkalinity"),
+                self.column("calcium"),
+                self.column("cyanuric_acid"),
+                self.column("salt"),
+                temperature,
+            ),
+            "fc_cya_ratio": fc_cya_ratio(
+                self.column("free_chlorine"), self.column("cyanuric_acid")
+            ),
+        }
+        readings = {name: self.column(name) for name in HISTORY_COLUMNS} | series
+        flags = {
+            name: out_of_range(readings[name], bounds)
+            for name, bounds in BALANCE_RANGES.items()
+        }
+        self._analysis = series | {"out_of_range": flags}
+        return self._analysis
+
+    def latest(self) -> dict:
+        """Return the analytics for the newest test."""
+        if not self._size:
+            return {}
+        analysis = self.analyze()
+        flagged = [
+            name for name, flags in analysis["out_of_range"].items() if flags[-1]
+        ]
+        return {
+            "saturation_index": _round(analysis["saturation_index"][-1]),
+            "fc_cya_ratio": _round(analysis["fc_cya_ratio"][-1]),
+            "out_of_range": len(flagged),
+            "out_of_range_readings": flagged,
+        }
+
+    def as_series(self) -> dict:
+        """Return the full analytics history in a JSON-friendly form."""
+        analysis = self.analyze()
+        return {
+            "dates": [None if np.isnat(day) else str(day) for day in self.dates],
+            "saturation_index": [
+                _round(value) for value in analysis["saturation_index"]
+            ],
+            "fc_cya_ratio": [_round(value) for value in analysis["fc_cya_ratio"]],
+            "out_of_range": {
+                name: flags.tolist() for name, flags in analysis["out_of_range"].items()
+            },
+        }
+
+
+def _round(value: float) -> float | None:
+    """Round a value for display, mapping NaN to None."""
+    return None if np.isnan(value) else round(float(value), 2)
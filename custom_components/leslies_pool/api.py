@@ -1,8 +1,79 @@
 """API client for Leslie's Pool Water Tests."""
 
+from collections.abc import Iterator
+import json
+import logging
+import threading
+import time
+
 import requests
-from bs4 import BeautifulSoup
-from bs4 import Tag
+
+from .cassette import Cassette
+from .cassette import RecordingAdapter
+from .cassette import ReplayAdapter
+from .const import CSRF_TOKEN_LIFETIME
+from .const import DATA_UPDATE_INTERVAL
+from .const import DEFAULT_MAX_ATTEMPTS
+from .const import DEFAULT_REQUEST_TIMEOUT
+from .const import DEFAULT_SHARED_CACHE_TTL
+from .const import MIN_SESSION_LIFETIME
+from .const import SESSION_LEARN_FACTOR
+from .offload import parse_rows
+from .parser import extract_csrf_token
+from .parser import iter_water_test_rows
+from .parser import parse_pool_profiles
+from .ratelimit import FETCH_BUCKET
+from .ratelimit import LOGIN_BUCKET
+from .ratelimit import TokenBucket
+from .shared_cache import SharedCache
+from .shared_cache import cache_key
+from .transport import TransportStats
+from .transport import configure_session
+from .transport import mount_transport
+
+_LOGGER = logging.getLogger(__name__)
+# Structured per-request trace, enabled by setting this logger to debug
+_TRACE_LOGGER = logging.getLogger(f"{__name__}.trace")
+
+# Only this much of a response body is decoded for logs and marker checks
+LOG_PREVIEW_CHARS = 200
+MARKER_SCAN_CHARS = 2048
+LOGIN_MARKERS = ("login", "sign in", "password", "username")
+# The login page is streamed in chunks of this many bytes
+LOGIN_PAGE_CHUNK_SIZE = 16 * 1024
+
+# Demandware cookies that carry the authenticated session
+SESSION_COOKIE_PREFIXES = ("dwsid", "dwsecuretoken")
+
+
+def _tracing() -> bool:
+    """Return True if the structured request trace is enabled."""
+    return _TRACE_LOGGER.isEnabledFor(logging.DEBUG)
+
+
+def _body_prefix(response: requests.Response, limit: int) -> str:
+    """Decode at most ``limit`` bytes from the start of a response body."""
+    return response.content[:limit].decode(response.encoding or "utf-8", "replace")
+
+
+class _SessionShare:
+    """Counts the clients using one requests session."""
+
+    def __init__(self) -> None:
+        """Initialize the share with its first client."""
+        self.clients = 1
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Register another client of the session."""
+        with self._lock:
+            self.clients += 1
+
+    def release(self) -> bool:
+        """Unregister a client; return True if it was the last one."""
+        with self._lock:
+            self.clients -= 1
+            return self.clients == 0
 
 
 class LesliesPoolApi:
@@ -10,10 +81,16 @@ class LesliesPoolApi:
 
     LOGIN_PAGE_URL = "https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/Account-Show"
     LOGIN_URL = "https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/Account-Login"
+    LANDING_URL = "https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/WaterTest-Landing"
     WATER_TEST_URL = "https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/WaterTest-GetWaterTest"
+    POOL_PROFILE_URL = "https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/PoolProfile-Landing"
 
     def __init__(
-        self, username: str, password: str, pool_profile_id: str, pool_name: str
+        self,
+        username: str,
+        password: str,
+        pool_profile_id: str | None = None,
+        pool_name: str | None = None,
     ) -> None:
         """Initialize the API with user credentials and pool details."""
         self.username = username
@@ -21,26 +98,155 @@ class LesliesPoolApi:
         self.pool_profile_id = pool_profile_id
         self.pool_name = pool_name
         self.session = requests.Session()
+        self._session_share = _SessionShare()
+        self._closed = False
+        self.transport_stats = TransportStats()  # Wire counters for the session
+        configure_session(self.session, self.transport_stats)
+        self.last_poll_transport = {}  # Counters for the latest water test fetch
         self._last_successful_values = {}  # Cache to store last valid data
         self._last_successful_fetch = None  # Timestamp of last successful fetch
+        self.max_attempts = DEFAULT_MAX_ATTEMPTS  # Fetch attempts per poll
+        self.timeout = DEFAULT_REQUEST_TIMEOUT  # Seconds per HTTP request
+        self.login_bucket = LOGIN_BUCKET  # Shared login budget, None to disable
+        self.fetch_bucket = FETCH_BUCKET  # Shared fetch budget, None to disable
+        self._reserved: set[TokenBucket] = set()  # Budget paid for on the loop
+        self.parse_in_process = False  # Parse large pages in the process pool
+        # Results shared with other instances polling the account, if any
+        self.shared_cache: SharedCache | None = None
+        self.shared_cache_ttl = DEFAULT_SHARED_CACHE_TTL
+        self.new_rows = []  # Tests newer than the latest fetch's stop_at
+        self.session_lifetime = None  # Learned idle lifetime of a session (seconds)
+        self.poll_interval = DATA_UPDATE_INTERVAL  # Seconds between polls
+        self._last_activity = None  # Monotonic time of last authenticated request
+        self._cookie_expiry = None  # Earliest session cookie expiry (epoch seconds)
+        self._csrf_token = None  # Login form token of the current session
+        self._csrf_issued = None  # Monotonic time the token was read
+        # The site tracks the selected pool per session, so fetches for pools
+        # sharing a session must not interleave
+        self._pool_lock = threading.Lock()
+
+    def for_pool(self, pool_profile_id: str, pool_name: str) -> "LesliesPoolApi":
+        """Return a client for another pool of the account sharing this session."""
+        api = LesliesPoolApi(self.username, self.password, pool_profile_id, pool_name)
+        api.session.close()
+        api.session = self.session
+        api._session_share = self._session_share
+        self._session_share.acquire()
+        api.transport_stats = self.transport_stats
+        api.max_attempts = self.max_attempts
+        api.timeout = self.timeout
+        api.login_bucket = self.login_bucket
+        api.fetch_bucket = self.fetch_bucket
+        api.parse_in_process = self.parse_in_process
+        api.shared_cache = self.shared_cache
+        api.shared_cache_ttl = self.shared_cache_ttl
+        api.session_lifetime = self.session_lifetime
+        api.poll_interval = self.poll_interval
+        api._last_activity = self._last_activity
+        api._cookie_expiry = self._cookie_expiry
+        api._pool_lock = self._pool_lock
+        return api
+
+    def close(self) -> None:
+        """Release this client; the session closes with its last client."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._session_share.release():
+            self.session.close()
+
+    def start_recording(self) -> Cassette:
+        """Record sanitized exchanges from now on and return the cassette."""
+        cassette = Cassette()
+        mount_transport(
+            self.session,
+            RecordingAdapter(
+                cassette,
+                secrets=(self.username, self.password),
+                stats=self.transport_stats,
+            ),
+        )
+        return cassette
+
+    def replay(self, cassette: Cassette, speed: float = 1.0) -> ReplayAdapter:
+        """Serve all requests from a recorded cassette instead of the network."""
+        adapter = ReplayAdapter(cassette, speed=speed)
+        mount_transport(self.session, adapter)
+        return adapter
+
+    async def async_reserve(self, login: bool = False) -> None:
+        """Wait on the event loop for the budget of the next job's first request.
+
+        Call it before handing a job to the executor. The job's first login
+        (``login``) or fetch then uses the reserved token; further requests
+        of the job, such as retries, are charged without waiting.
+        """
+        bucket = self.login_bucket if login else self.fetch_bucket
+        if bucket is None or bucket in self._reserved:
+            return
+        await bucket.async_acquire()
+        self._reserved.add(bucket)
+
+    def _spend(self, bucket: TokenBucket | None) -> None:
+        """Spend a token for a request, using one reserved on the loop if any."""
+        if bucket is None:
+            return
+        try:
+            self._reserved.remove(bucket)
+        except KeyError:
+            bucket.charge()
 
     def authenticate(self) -> bool:
-        """Authenticate the user and start a session."""
-        response = self.session.get(self.LOGIN_PAGE_URL)
-        soup = BeautifulSoup(response.text, "html.parser")
-        csrf_token_tag = soup.find("input", {"name": "csrf_token"})
+        """Authenticate the user and start a session.
 
-        csrf_token = None
-        if isinstance(csrf_token_tag, Tag) and csrf_token_tag.has_attr("value"):
-            csrf_token = csrf_token_tag["value"]
+        A CSRF token from earlier in the same session is reused, skipping the
+        login page; if the site rejects it, a fresh one is fetched.
+        """
+        self._spend(self.login_bucket)
 
+        csrf_token = self._reusable_csrf_token()
+        if csrf_token is not None:
+            if self._login(csrf_token):
+                return True
+            _LOGGER.debug("Reused CSRF token was rejected, fetching a new one")
+
+        self._csrf_token = None
+        csrf_token = self._login_page_csrf_token()
         if not csrf_token:
             return False
+        self._csrf_token = csrf_token
+        self._csrf_issued = time.monotonic()
+        return self._login(csrf_token)
+
+    def _reusable_csrf_token(self) -> str | None:
+        """Return the session's CSRF token if it is still expected to be valid."""
+        # Tokens belong to a session, so none is reused once it has expired
+        if self._csrf_token is None or self._last_activity is None:
+            return None
+        if time.monotonic() - self._csrf_issued >= CSRF_TOKEN_LIFETIME:
+            return None
+        return self._csrf_token
 
+    def _login_page_csrf_token(self) -> str | None:
+        """Stream the login page and return its CSRF token."""
+        response = self.session.get(
+            self.LOGIN_PAGE_URL, timeout=self.timeout, stream=True
+        )
+        try:
+            chunks = response.iter_content(LOGIN_PAGE_CHUNK_SIZE)
+            csrf_token = extract_csrf_token(chunks, response.encoding or "utf-8")
+            # Discard the unparsed rest so the kept-alive connection is reused
+            for _ in chunks:
+                pass
+        finally:
+            response.close()
+        return csrf_token
+
+    def _login(self, csrf_token: str) -> bool:
+        """Post the credentials with a CSRF token; return True if accepted."""
         headers = {
             "accept": "application/json, text/javascript, */*; q=0.01",
             "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-            "user-agent": "Mozilla/5.0",
         }
 
         payload = {
@@ -50,110 +256,278 @@ class LesliesPoolApi:
         }
 
         login_response = self.session.post(
-            self.LOGIN_URL, headers=headers, data=payload
+            self.LOGIN_URL, headers=headers, data=payload, timeout=self.timeout
         )
-        return login_response.status_code == 200
+        # A rejected token lands on the CSRF failure page
+        if login_response.status_code != 200 or "CSRF-Fail" in login_response.url:
+            return False
+
+        self._last_activity = time.monotonic()
+        self._cookie_expiry = self._session_cookie_expiry()
+        return True
+
+    def _session_cookie_expiry(self) -> float | None:
+        """Return the earliest expiry of the session cookies, if they have one."""
+        expiries = [
+            cookie.expires
+            for cookie in self.session.cookies
+            if cookie.expires and cookie.name.startswith(SESSION_COOKIE_PREFIXES)
+        ]
+        return min(expiries) if expiries else None
+
+    def _record_session_expired(self) -> None:
+        """Learn the session lifetime from an observed login redirect.
+
+        Only idle gaps clearly longer than the polling interval are learned
+        from, and they are averaged into the estimate so one early expiry
+        does not pin it.
+        """
+        if self._last_activity is None:
+            return
+        idle = time.monotonic() - self._last_activity
+        if idle >= self.poll_interval * SESSION_LEARN_FACTOR:
+            observed = max(idle, MIN_SESSION_LIFETIME)
+            if self.session_lifetime is None:
+                self.session_lifetime = observed
+            else:
+                self.session_lifetime = (self.session_lifetime + observed) / 2
+        self._last_activity = None
+        self._csrf_token = None
+
+    def _record_session_alive(self) -> None:
+        """Note an authenticated request, growing the lifetime it outlived."""
+        now = time.monotonic()
+        if (
+            self._last_activity is not None
+            and self.session_lifetime is not None
+            and now - self._last_activity > self.session_lifetime
+        ):
+            # The session survived a longer idle gap than estimated
+            self.session_lifetime = now - self._last_activity
+        self._last_activity = now
+
+    def session_expires_in(self) -> float | None:
+        """Return the estimated seconds until the session expires, if known."""
+        if self._last_activity is None:
+            return None
+
+        candidates = []
+        if self.session_lifetime is not None:
+            idle = time.monotonic() - self._last_activity
+            candidates.append(self.session_lifetime - idle)
+        if self._cookie_expiry is not None:
+            candidates.append(self._cookie_expiry - time.time())
+        return min(candidates) if candidates else None
+
+    def refresh_session_if_expiring(self, margin: float) -> bool:
+        """Re-authenticate if the session is expected to expire within margin."""
+        expires_in = self.session_expires_in()
+        if expires_in is None or expires_in > margin:
+            return False
+        return self.authenticate()
+
+    def discover_pools(self) -> list[dict]:
+        """Return every pool profile on the account from one page fetch."""
+        self._spend(self.fetch_bucket)
+        response = self.session.get(self.POOL_PROFILE_URL, timeout=self.timeout)
+        if "Account-Show" in response.url or "login?rurl=1" in response.url:
+            self._record_session_expired()
+            if not self.authenticate():
+                return []
+            response = self.session.get(self.POOL_PROFILE_URL, timeout=self.timeout)
+
+        response.raise_for_status()
+        self._record_session_alive()
+        return parse_pool_profiles(response.text)
 
-    def fetch_water_test_data(self) -> dict:
-        """Fetch water test data for the pool."""
-        import json
-        import logging
+    def fetch_water_test_data(self, stop_at: dict | None = None) -> dict:
+        """Fetch the pool's newest water test.
 
-        _LOGGER = logging.getLogger(__name__)
+        Tests newer than ``stop_at``, the newest test the caller already
+        knows, are left in ``new_rows``.
+        """
+        with self._pool_lock:
+            before = self.transport_stats.snapshot()
+            try:
+                return self._fetch_water_test_data(stop_at)
+            finally:
+                self._report_transport(before)
+
+    def _report_transport(self, before: dict[str, int]) -> None:
+        """Record and log what the latest fetch sent over the wire."""
+        self.last_poll_transport = self.transport_stats.since(before)
+        _LOGGER.debug(
+            "Fetch made %(requests)d requests receiving %(bytes_received)d bytes "
+            "(%(bytes_decoded)d decoded) over %(connections)d new connections "
+            "with %(handshakes)d TLS handshakes",
+            self.last_poll_transport,
+        )
+        if _tracing():
+            self._trace("transport", **self.last_poll_transport)
+
+    def iter_water_tests(self, stop_at: dict | None = None) -> Iterator[dict]:
+        """Yield the pool's full water test history, newest first.
+
+        Rows are parsed lazily from one history fetch and iteration stops at
+        the first test no newer than ``stop_at``. Nothing is yielded if the
+        fetch fails.
+        """
+        with self._pool_lock:
+            data = self._request_water_tests()
+        if data is None or "response" not in data:
+            return
+        yield from iter_water_test_rows(data["response"], stop_at=stop_at)
+
+    def _trace(self, event: str, **fields) -> None:
+        """Log a structured trace event; callers check ``_tracing()`` first."""
+        _TRACE_LOGGER.debug(
+            "%s",
+            json.dumps(
+                {"event": event, "pool_profile_id": self.pool_profile_id, **fields},
+                default=str,
+            ),
+        )
+
+    def _request_water_tests(self) -> dict | None:
+        """Return the water test JSON from the shared cache or upstream.
+
+        Callers hold the pool lock.
+        """
+        if self.shared_cache is None:
+            return self._request_upstream_water_tests()
+        return self.shared_cache.get_or_refresh(
+            cache_key(self.username, self.pool_profile_id),
+            self.shared_cache_ttl,
+            self._request_shareable_water_tests,
+            wait=self.timeout * self.max_attempts,
+        )
+
+    def _request_shareable_water_tests(self) -> dict | None:
+        """Fetch the water test JSON, or None if other instances cannot use it."""
+        data = self._request_upstream_water_tests()
+        return data if data is not None and "response" in data else None
+
+    def _request_upstream_water_tests(self) -> dict | None:
+        """Select the pool and return the water test JSON, or None on failure."""
         _LOGGER.debug("Fetching water test data")
-        
+
         # Try to fetch the data with authentication retry logic
-        for attempt in range(1, 3):  # Try up to 2 times
+        for attempt in range(1, self.max_attempts + 1):
             try:
                 # Check if we need to authenticate first
                 if attempt > 1:
-                    _LOGGER.info(f"Authentication attempt {attempt}")
+                    _LOGGER.info("Authentication attempt %d", attempt)
                     if not self.authenticate():
                         _LOGGER.error("Authentication failed")
-                        return {}
-                
+                        return None
+
+                self._spend(self.fetch_bucket)
+
                 # First navigate to the water test page to set up session and cookies
                 landing_response = self.session.get(
-                    f"https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/WaterTest-Landing?poolProfileId={self.pool_profile_id}&poolName={self.pool_name}"
+                    f"{self.LANDING_URL}?poolProfileId={self.pool_profile_id}&poolName={self.pool_name}",
+                    timeout=self.timeout,
                 )
-                
+                if _tracing():
+                    self._trace(
+                        "landing",
+                        attempt=attempt,
+                        status=landing_response.status_code,
+                        url=landing_response.url,
+                        elapsed=landing_response.elapsed.total_seconds(),
+                    )
+
                 # Check if we were redirected to the login page
                 if "Account-Show" in landing_response.url or "login?rurl=1" in landing_response.url:
                     _LOGGER.warning("Session expired, need to re-authenticate")
-                    if attempt < 2:  # Only try to authenticate once
+                    self._record_session_expired()
+                    if attempt < self.max_attempts:
                         continue  # Skip to next attempt which will authenticate
                     else:
                         _LOGGER.error("Failed to maintain authenticated session")
-                        return {}
-                
+                        return None
+
                 cookies = self.session.cookies.get_dict()
                 cookie_header = "; ".join([f"{key}={value}" for key, value in cookies.items()])
-                
+
                 headers = {
                     "accept": "application/json, text/javascript, */*; q=0.01",
                     "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
                     "cookie": cookie_header,
-                    "user-agent": "Mozilla/5.0",
                 }
-                
+
                 payload = "poolProfileName=Pool&poolSanitizer=Salt+3000-4000"
-                _LOGGER.debug(f"Sending POST request to {self.WATER_TEST_URL}")
-                response = self.session.post(self.WATER_TEST_URL, headers=headers, data=payload)
-                
+                _LOGGER.debug("Sending POST request to %s", self.WATER_TEST_URL)
+                response = self.session.post(
+                    self.WATER_TEST_URL, headers=headers, data=payload, timeout=self.timeout
+                )
+                if _tracing():
+                    self._trace(
+                        "water_test",
+                        attempt=attempt,
+                        status=response.status_code,
+                        elapsed=response.elapsed.total_seconds(),
+                        length=len(response.content),
+                        preview=_body_prefix(response, LOG_PREVIEW_CHARS),
+                    )
+
                 # Check HTTP status code
                 if response.status_code != 200:
-                    _LOGGER.error(f"HTTP error: {response.status_code}")
-                    if attempt < 2:
+                    _LOGGER.error("HTTP error: %s", response.status_code)
+                    if attempt < self.max_attempts:
                         continue  # Try again with authentication
-                    return {}
-                
+                    return None
+
                 # Try to parse JSON response
                 try:
-                    # Get a sample of the response for debugging
-                    response_preview = response.text[:200] + "..." if len(response.text) > 200 else response.text
-                    _LOGGER.debug(f"Response preview: {response_preview}")
-                    
                     data = response.json()
-                    
+
                     # Check for authentication issues in the JSON response
                     if "errorMsg" in data:
-                        _LOGGER.error(f"API returned error: {data.get('errorMsg')}")
-                        if "login" in str(data.get('errorMsg')).lower() and attempt < 2:
+                        _LOGGER.error("API returned error: %s", data.get("errorMsg"))
+                        if "login" in str(data.get('errorMsg')).lower() and attempt < self.max_attempts:
                             _LOGGER.warning("Authentication error detected in response, re-authenticating")
+                            # The session is gone, and its CSRF token with it
+                            self._csrf_token = None
                             if self.authenticate():
                                 continue
-                    
-                    break  # Successfully parsed JSON, exit the loop
+
+                    self._record_session_alive()
+                    return data  # Successfully parsed JSON
                 except json.JSONDecodeError as e:
-                    _LOGGER.error(f"JSON parsing error: {e}")
-                    _LOGGER.debug(f"Response content (first 500 chars): {response.text[:500]}")
-                    
-                    # Check if this looks like an auth issue (e.g., HTML login page)
-                    if "<html" in response.text[:100].lower():
+                    _LOGGER.error("JSON parsing error: %s", e)
+
+                    # Check if this looks like an auth issue (e.g., HTML login page);
+                    # only the start of the body is decoded and searched
+                    head = _body_prefix(response, MARKER_SCAN_CHARS).lower()
+                    if "<html" in head[:100]:
                         _LOGGER.warning("Response appears to be HTML instead of JSON - likely an auth issue")
                         # Look for login-related indicators in the response
-                        if any(sign in response.text.lower() for sign in ["login", "sign in", "password", "username"]):
+                        if any(sign in head for sign in LOGIN_MARKERS):
                             _LOGGER.info("Login page detected in response - session likely expired")
-                        if attempt < 2:  # Try re-authenticating
+                        if attempt < self.max_attempts:  # Try re-authenticating
+                            self._csrf_token = None
                             if self.authenticate():
                                 continue
-                    
-                    return {}  # If all attempts failed or not an auth issue
-            
+
+                    return None  # If all attempts failed or not an auth issue
+
             except requests.RequestException as e:
-                _LOGGER.error(f"Request failed: {e}")
-                if attempt < 2:
+                _LOGGER.error("Request failed: %s", e)
+                if attempt < self.max_attempts:
                     _LOGGER.info("Retrying after connection error")
                     continue
-                return {}
-        
-            # If we've exhausted all retries without success
-            if 'data' not in locals():
-                _LOGGER.error("Failed to fetch data after all retries")
-                if self._last_successful_values:
-                    _LOGGER.info("Returning last cached values due to fetch failure")
-                    return self._last_successful_values
-                return {}
+                return None
+
+        _LOGGER.error("Failed to fetch data after all retries")
+        return None
+
+    def _fetch_water_test_data(self, stop_at: dict | None) -> dict:
+        """Fetch the newest water test; callers hold the pool lock."""
+        self.new_rows = []
+        data = self._request_water_tests()
+        if data is None:
+            return {}
 
         # Process the data if we successfully retrieved it
         values = {}
@@ -162,73 +536,42 @@ class LesliesPoolApi:
             if "response" not in data:
                 _LOGGER.error("Missing 'response' key in JSON data")
                 return {}
-                
+
             html_content = data["response"]
-            _LOGGER.debug(f"HTML content length: {len(html_content)}")
-            
-            soup = BeautifulSoup(html_content, "html.parser")
-            # Original find syntax that was working before
-            table = soup.find(
-                "table", {"class": "table table-striped table-bordered table-hover table-sm"}
+
+            # Beyond the page's newest test, only rows newer than the newest
+            # test the caller already knows are parsed
+            parsed = parse_rows(
+                html_content,
+                stop_at=stop_at,
+                in_process=self.parse_in_process,
+                timeout=self.timeout,
             )
-            
-            if not isinstance(table, Tag):
+            if _tracing():
+                self._trace(
+                    "parsed",
+                    html_length=len(html_content),
+                    new_rows=None if parsed is None else len(parsed[1]),
+                )
+            if parsed is None:
                 _LOGGER.warning("Water test table not found in response")
                 if self._last_successful_values:
                     _LOGGER.info("Returning last cached values since no water test table was found")
                     return self._last_successful_values
                 return {}
-            first_row_tag = table.find("tbody")
-            if isinstance(first_row_tag, Tag):
-                first_row = first_row_tag.find("tr")
-                if isinstance(first_row, Tag):
-                    columns = first_row.find_all("td")
-                    if len(columns) > 10:
-                        # Extract test_date from the first column
-                        test_date_tag = first_row.find(
-                            "th", {"class": "text-center align-middle p-1"}
-                        )
-                        test_date = None
-                        if test_date_tag:
-                            badge = test_date_tag.find(
-                                "span", {"class": "badge badge-secondary p-2"}
-                            )
-                            if badge:
-                                test_date = badge.text.strip()
-
-                        # Determine in_store value from the last column
-                        in_store_tag = first_row.find_all("td")[-1]
-                        in_store = True  # Default to True
-                        if in_store_tag and in_store_tag.find(
-                            "i", {"class": "fa fa-times-circle text-danger"}
-                        ):
-                            in_store = False
-
-                        # Populate the values dictionary
-                        values = {
-                            "free_chlorine": columns[1].text.strip(),
-                            "total_chlorine": columns[2].text.strip(),
-                            "ph": columns[3].text.strip(),
-                            "alkalinity": columns[4].text.strip(),
-                            "calcium": columns[5].text.strip(),
-                            "cyanuric_acid": columns[6].text.strip(),
-                            "iron": columns[7].text.strip(),
-                            "copper": columns[8].text.strip(),
-                            "phosphates": columns[9].text.strip(),
-                            "salt": columns[10].text.strip(),
-                            "test_date": test_date,
-                            "in_store": in_store,
-                        }
+            latest, self.new_rows = parsed
+            # The current values always come from the page as it is now
+            if latest is not None:
+                values = dict(latest)
 
         except Exception as e:
-            _LOGGER.error(f"Error processing HTML content: {e}")
+            _LOGGER.error("Error processing HTML content: %s", e)
             return {}
-            
+
         # If we successfully got values, cache them for future use if needed
         if values:
-            import time
             self._last_successful_values = values.copy()
             self._last_successful_fetch = time.time()
             _LOGGER.debug("Successfully updated cache with new values")
-        
+
         return values
@@ -0,0 +1,278 @@
+"""Record-and-replay HTTP cassettes for offline runs of the API client.
+
+A recording adapter captures each exchange the client makes (login page,
+login, landing page and water test fetch, including every redirect hop),
+sanitizes credentials, CSRF tokens, cookie values and the account email
+wherever they appear, and writes them to a JSON cassette.
+A replay adapter serves a cassette back in order with the recorded latency,
+so end-to-end timing runs are repeatable without network access.
+"""
+
+from __future__ import annotations
+
+import html
+from http.client import HTTPMessage
+import io
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qsl
+from urllib.parse import quote
+from urllib.parse import quote_plus
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
+
+from requests import RequestException
+from requests.adapters import BaseAdapter
+from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+from requests.models import Response
+from urllib3 import HTTPResponse
+
+from .transport import TransportAdapter
+
+CASSETTE_VERSION = 1
+
+REDACTED = "REDACTED"
+SENSITIVE_FIELDS = ("loginEmail", "loginPassword", "csrf_token")
+# Headers that no longer describe the stored body, or that carry secrets
+DROPPED_HEADERS = ("content-encoding", "transfer-encoding", "content-length", "cookie")
+# CSRF tokens embedded in the login page form
+_CSRF_INPUT = re.compile(r"<input\b[^>]*\bname=[\"']?csrf_token\b[^>]*>", re.IGNORECASE)
+_INPUT_VALUE = re.compile(r"(\bvalue=)([\"']?)[^\"'\s>]*\2", re.IGNORECASE)
+
+
+def _sanitize_body(body: str | bytes | None) -> str | None:
+    """Redact credentials from a form-encoded request body."""
+    if body is None:
+        return None
+    if isinstance(body, bytes):
+        body = body.decode("utf-8", "replace")
+    pairs = parse_qsl(body, keep_blank_values=True)
+    if not pairs:
+        return body
+    return urlencode(
+        [(key, REDACTED if key in SENSITIVE_FIELDS else value) for key, value in pairs]
+    )
+
+
+def _sanitize_query(url: str) -> str:
+    """Redact credentials from the query string of a URL."""
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    pairs = parse_qsl(parts.query, keep_blank_values=True)
+    return urlunsplit(
+        parts._replace(
+            query=urlencode(
+                [
+                    (key, REDACTED if key in SENSITIVE_FIELDS else value)
+                    for key, value in pairs
+                ]
+            )
+        )
+    )
+
+
+def _sanitize_cookie(value: str) -> str:
+    """Redact the value of a Set-Cookie header but keep its attributes."""
+    return re.sub(r"^([^=;]+)=[^;]*", rf"\1={REDACTED}", value)
+
+
+def _sanitize_csrf(body: str) -> str:
+    """Redact the CSRF token of any form in a page."""
+    return _CSRF_INPUT.sub(
+        lambda tag: _INPUT_VALUE.sub(rf"\1\2{REDACTED}\2", tag.group(0)), body
+    )
+
+
+class Cassette:
+    """An ordered list of recorded HTTP exchanges."""
+
+    def __init__(self, interactions: list[dict] | None = None) -> None:
+        """Initialize the cassette."""
+        self.interactions: list[dict] = interactions or []
+
+    @classmethod
+    def load(cls, path: str) -> Cassette:
+        """Load a cassette from a JSON file."""
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+        if data.get("version") != CASSETTE_VERSION:
+            raise ValueError(f"Unsupported cassette version in {path}")
+        return cls(data["interactions"])
+
+    def save(self, path: str) -> None:
+        """Write the cassette to a JSON file."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": CASSETTE_VERSION, "interactions": self.interactions},
+                file,
+                indent=2,
+            )
+
+    @property
+    def recorded_latency(self) -> float:
+        """Return the total upstream latency captured in the cassette."""
+        return sum(item["response"]["elapsed"] for item in self.interactions)
+
+
+class RecordingAdapter(TransportAdapter):
+    """Transport adapter that records sanitized exchanges to a cassette."""
+
+    def __init__(
+        self, cassette: Cassette, secrets: tuple[str, ...] = (), **kwargs
+    ) -> None:
+        """Initialize the adapter with the strings to scrub from bodies."""
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        # Secrets also travel percent-encoded in URLs and escaped in HTML
+        self._secrets = tuple(
+            {
+                form
+                for secret in secrets
+                if secret
+                for form in (
+                    secret,
+                    quote(secret, safe=""),
+                    quote_plus(secret),
+                    html.escape(secret),
+                )
+            }
+        )
+
+    def _scrub(self, text: str) -> str:
+        """Replace account secrets in a URL, header or body."""
+        # Longest first, so no encoded form is left half replaced
+        for secret in sorted(self._secrets, key=len, reverse=True):
+            text = text.replace(secret, REDACTED)
+        return text
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        """Send the request upstream and record the exchange."""
+        start = time.perf_counter()
+        response = super().send(request, *args, **kwargs)
+        # Reading the body here keeps download time inside the recorded latency
+        content = response.content
+        elapsed = time.perf_counter() - start
+
+        # One entry per header line, so every cookie of a response is redacted
+        headers = [
+            [
+                name,
+                (
+                    _sanitize_cookie(value)
+                    if name.lower() == "set-cookie"
+                    else self._scrub(value)
+                ),
+            ]
+            for name, value in response.raw.headers.iteritems()
+            if name.lower() not in DROPPED_HEADERS
+        ]
+        self.cassette.interactions.append(
+            {
+                "request": {
+                    "method": request.method,
+                    "url": self._scrub(_sanitize_query(request.url)),
+                    "body": _sanitize_body(request.body),
+                },
+                "response": {
+                    "status": response.status_code,
+                    "reason": response.reason,
+                    "headers": headers,
+                    "body": self._scrub(
+                        _sanitize_csrf(
+                            content.decode(response.encoding or "utf-8", "replace")
+                        )
+                    ),
+                    "elapsed": round(elapsed, 6),
+                },
+            }
+        )
+        return response
+
+
+class _ReplayedMessage:
+    """Stand-in for http.client's response so requests can read cookies."""
+
+    def __init__(self, message: HTTPMessage) -> None:
+        """Initialize with the replayed headers."""
+        self.msg = message
+
+    def isclosed(self) -> bool:
+        """Report the body as fully read; it lives in memory."""
+        return True
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+
+class CassetteExhausted(RequestException):
+    """Raised when a request does not match the next recorded exchange."""
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter that serves a cassette with its recorded latency."""
+
+    def __init__(self, cassette: Cassette, speed: float = 1.0) -> None:
+        """Initialize the adapter; speed 0 replays without any delay."""
+        super().__init__()
+        self.cassette = cassette
+        self.speed = speed
+        self._position = 0
+        self._lock = threading.Lock()
+        # Only used for its build_response(); never opens a connection
+        self._builder = HTTPAdapter()
+
+    def rewind(self) -> None:
+        """Start serving the cassette from the first exchange again."""
+        with self._lock:
+            self._position = 0
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        """Serve the next recorded exchange for the request."""
+        with self._lock:
+            if self._position >= len(self.cassette.interactions):
+                raise CassetteExhausted(f"No recorded response for {request.url}")
+            interaction = self.cassette.interactions[self._position]
+            self._position += 1
+
+        recorded = interaction["request"]
+        if (recorded["method"], urlsplit(recorded["url"]).path) != (
+            request.method,
+            urlsplit(request.url).path,
+        ):
+            raise CassetteExhausted(
+                f"Expected {recorded['method']} {recorded['url']}, "
+                f"got {request.method} {request.url}"
+            )
+
+        played = interaction["response"]
+        if self.speed:
+            time.sleep(played["elapsed"] / self.speed)
+
+        body = played["body"].encode("utf-8")
+        message = HTTPMessage()
+        for name, value in played["headers"]:
+            message[name] = value
+        headers = [tuple(header) for header in played["headers"]]
+        headers.append(("Content-Length", str(len(body))))
+
+        raw = HTTPResponse(
+            body=io.BytesIO(body),
+            headers=headers,
+            status=played["status"],
+            reason=played["reason"],
+            preload_content=False,
+            decode_content=False,
+            original_response=_ReplayedMessage(message),
+        )
+        response = self._builder.build_response(request, raw)
+        response.encoding = "utf-8"
+        return response
+
+    def close(self) -> None:
+        """Release the response builder."""
+        self._builder.close()
@@ -6,45 +6,94 @@ import logging
 import re
 from typing import Any
 
+import requests
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_PASSWORD
 from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.const import CONF_USERNAME
 from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
 from homeassistant.exceptions import HomeAssistantError
 
 from .api import LesliesPoolApi
+from .const import CONF_CACHE_TTL
+from .const import CONF_MAX_ATTEMPTS
+from .const import CONF_PARSE_IN_PROCESS
+from .const import CONF_REQUEST_TIMEOUT
+from .const import CONF_SHARED_CACHE_DIR
+from .const import CONF_SHARED_CACHE_TTL
+from .const import DATA_UPDATE_INTERVAL
+from .const import DEFAULT_MAX_ATTEMPTS
+from .const import DEFAULT_REQUEST_TIMEOUT
+from .const import DEFAULT_SHARED_CACHE_TTL
 from .const import DOMAIN
+from .const import REFRESH_FRESHNESS_WINDOW
+from .session_cache import async_claim_session
+from .session_cache import async_park_session
 
 _LOGGER = logging.getLogger(__name__)
 
+# Flow source for the extra pools set up by a discovery pass
+SOURCE_POOL = "pool"
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_USERNAME): str,
         vol.Required(CONF_PASSWORD): str,
-        vol.Required("water_test_url"): str,
-        vol.Optional(CONF_SCAN_INTERVAL, default=300): int,
+        vol.Optional("water_test_url"): str,
+        vol.Optional(CONF_SCAN_INTERVAL, default=DATA_UPDATE_INTERVAL): int,
     }
 )
 
 
-async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
-    """Validate the user input allows us to connect."""
-    url = data["water_test_url"]
-    match = re.search(r"poolProfileId=(\d+)&poolName=([^&]+)", url)
-    if not match:
-        raise InvalidURL from None
-
-    pool_profile_id = match.group(1)
-    pool_name = match.group(2)
-
-    api = LesliesPoolApi(
-        data[CONF_USERNAME], data[CONF_PASSWORD], pool_profile_id, pool_name
+def _options_schema(entry: config_entries.ConfigEntry) -> vol.Schema:
+    """Return the options schema with the entry's current values as defaults."""
+    options = entry.options
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_SCAN_INTERVAL,
+                default=options.get(
+                    CONF_SCAN_INTERVAL,
+                    entry.data.get(CONF_SCAN_INTERVAL, DATA_UPDATE_INTERVAL),
+                ),
+            ): vol.All(int, vol.Range(min=30)),
+            vol.Required(
+                CONF_MAX_ATTEMPTS,
+                default=options.get(CONF_MAX_ATTEMPTS, DEFAULT_MAX_ATTEMPTS),
+            ): vol.All(int, vol.Range(min=1, max=5)),
+            vol.Required(
+                CONF_REQUEST_TIMEOUT,
+                default=options.get(CONF_REQUEST_TIMEOUT, DEFAULT_REQUEST_TIMEOUT),
+            ): vol.All(int, vol.Range(min=5, max=120)),
+            vol.Required(
+                CONF_CACHE_TTL,
+                default=options.get(CONF_CACHE_TTL, REFRESH_FRESHNESS_WINDOW),
+            ): vol.All(int, vol.Range(min=0)),
+            vol.Required(
+                CONF_PARSE_IN_PROCESS,
+                default=options.get(CONF_PARSE_IN_PROCESS, False),
+            ): bool,
+            vol.Optional(
+                CONF_SHARED_CACHE_DIR,
+                description={"suggested_value": options.get(CONF_SHARED_CACHE_DIR)},
+            ): str,
+            vol.Required(
+                CONF_SHARED_CACHE_TTL,
+                default=options.get(CONF_SHARED_CACHE_TTL, DEFAULT_SHARED_CACHE_TTL),
+            ): vol.All(int, vol.Range(min=30)),
+        }
     )
 
+
+async def _async_authenticate(
+    hass: HomeAssistant, api: LesliesPoolApi
+) -> LesliesPoolApi:
+    """Log in with a new client, raising InvalidAuth if the login is refused."""
     # Run the authenticate method in the executor to avoid blocking the event loop
     try:
+        await api.async_reserve(login=True)
         authenticated = await hass.async_add_executor_job(api.authenticate)
     except CannotConnect as err:
         raise CannotConnect from err
@@ -53,9 +102,15 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     if not authenticated:
         raise InvalidAuth
+    return api
 
+
+def _entry_data(
+    data: dict[str, Any], pool_profile_id: str, pool_name: str, title: str
+) -> dict[str, Any]:
+    """Return the config entry data for one pool."""
     return {
-        "title": "Leslie's Pool",
+        "title": title,
         "username": data[CONF_USERNAME],
         "password": data[CONF_PASSWORD],
         "pool_profile_id": pool_profile_id,
@@ -64,10 +119,81 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     }
 
 
+async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the user input allows us to connect."""
+    url = data["water_test_url"]
+    match = re.search(r"poolProfileId=(\d+)&poolName=([^&]+)", url)
+    if not match:
+        raise InvalidURL from None
+
+    pool_profile_id = match.group(1)
+    pool_name = match.group(2)
+
+    # Reuse a live session for this pool (e.g. from a reauth or reconfigure)
+    api = async_claim_session(
+        hass, data[CONF_USERNAME], data[CONF_PASSWORD], pool_profile_id
+    )
+    if api is None:
+        api = await _async_authenticate(
+            hass,
+            LesliesPoolApi(
+                data[CONF_USERNAME], data[CONF_PASSWORD], pool_profile_id, pool_name
+            ),
+        )
+
+    # Hand the authenticated session over to entry setup
+    async_park_session(hass, api)
+
+    return _entry_data(data, pool_profile_id, pool_name, "Leslie's Pool")
+
+
+async def discover_pools(
+    hass: HomeAssistant, data: dict[str, Any]
+) -> list[dict[str, Any]]:
+    """Log in once and return entry data for every pool on the account."""
+    api = await _async_authenticate(
+        hass, LesliesPoolApi(data[CONF_USERNAME], data[CONF_PASSWORD])
+    )
+    try:
+        await api.async_reserve()
+        pools = await hass.async_add_executor_job(api.discover_pools)
+        if not pools:
+            raise NoPoolsFound
+
+        entries = []
+        for pool in pools:
+            # Every pool's setup shares the session this login started
+            async_park_session(
+                hass, api.for_pool(pool["pool_profile_id"], pool["pool_name"])
+            )
+            entries.append(
+                _entry_data(
+                    data,
+                    pool["pool_profile_id"],
+                    pool["pool_name"],
+                    f"Leslie's Pool ({pool['title']})",
+                )
+            )
+    except requests.RequestException as err:
+        raise CannotConnect from err
+    finally:
+        # The pool clients keep the session open
+        api.close()
+    return entries
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Leslie's Pool Water Tests."""
 
-    VERSION = 1
+    VERSION = 2
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -76,9 +202,16 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         errors: dict[str, str] = {}
         if user_input is not None:
             try:
-                info = await validate_input(self.hass, user_input)
+                if user_input.get("water_test_url"):
+                    info = await validate_input(self.hass, user_input)
+                else:
+                    return await self._async_create_discovered(
+                        await discover_pools(self.hass, user_input)
+                    )
             except InvalidURL:
                 errors["base"] = "invalid_url"
+            except NoPoolsFound:
+                errors["base"] = "no_pools"
             except InvalidAuth:
                 errors["base"] = "invalid_auth"
             except CannotConnect:
@@ -87,6 +220,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
+                await self.async_set_unique_id(info["pool_profile_id"])
+                self._abort_if_unique_id_configured()
                 return self.async_create_entry(title=info["title"], data=info)
 
         return self.async_show_form(
@@ -95,11 +230,77 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def _async_create_discovered(
+        self, pools: list[dict[str, Any]]
+    ) -> config_entries.ConfigFlowResult:
+        """Create entries for every discovered pool that is not set up yet."""
+        configured = {
+            entry.data.get("pool_profile_id") for entry in self._async_current_entries()
+        }
+        pools = [pool for pool in pools if pool["pool_profile_id"] not in configured]
+        if not pools:
+            return self.async_abort(reason="already_configured")
+
+        # A flow creates a single entry, so the other pools get flows of their own
+        for pool in pools[1:]:
+            self.hass.async_create_task(
+                self.hass.config_entries.flow.async_init(
+                    DOMAIN, context={"source": SOURCE_POOL}, data=pool
+                )
+            )
+
+        first = pools[0]
+        await self.async_set_unique_id(first["pool_profile_id"])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=first["title"], data=first)
+
+    async def async_step_pool(
+        self, discovery_info: dict[str, Any]
+    ) -> config_entries.ConfigFlowResult:
+        """Create the entry for a pool found alongside another one."""
+        await self.async_set_unique_id(discovery_info["pool_profile_id"])
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(
+            title=discovery_info["title"], data=discovery_info
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle options for Leslie's Pool Water Tests.
+
+    Changes are applied to the running coordinator by the entry's update
+    listener, so saving options never reloads the entry or logs in again.
+    """
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> config_entries.ConfigFlowResult:
+        """Manage the polling and fetch options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            shared_cache_dir = user_input.get(CONF_SHARED_CACHE_DIR)
+            if shared_cache_dir and not self.hass.config.is_allowed_path(
+                shared_cache_dir
+            ):
+                errors[CONF_SHARED_CACHE_DIR] = "path_not_allowed"
+            else:
+                return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=_options_schema(self.config_entry),
+            errors=errors,
+        )
+
 
 class InvalidURL(HomeAssistantError):
     """Error to indicate the provided URL is invalid."""
 
 
+class NoPoolsFound(HomeAssistantError):
+    """Error to indicate the account has no pool profiles."""
+
+
 class InvalidAuth(HomeAssistantError):
     """Error to indicate there is invalid auth."""
 
@@ -2,3 +2,73 @@
 
 DOMAIN = "leslies_pool"
 DATA_UPDATE_INTERVAL = 300
+
+# Refresh requests arriving within this many seconds of a successful fetch are
+# answered from the coordinator's cached data instead of going upstream.
+REFRESH_FRESHNESS_WINDOW = 30
+
+# Authenticated sessions handed from the config flow to entry setup are kept
+# for this many seconds before being discarded.
+SESSION_HANDOFF_TTL = 300
+DATA_SESSION_CACHE = f"{DOMAIN}_session_cache"
+# Per-account schedulers ordering interactive, scheduled and background work
+DATA_SCHEDULERS = f"{DOMAIN}_schedulers"
+
+# Options that can be changed on a running entry without reloading it
+CONF_MAX_ATTEMPTS = "max_attempts"
+CONF_REQUEST_TIMEOUT = "request_timeout"
+CONF_CACHE_TTL = "cache_ttl"
+CONF_PARSE_IN_PROCESS = "parse_in_process"
+CONF_SHARED_CACHE_DIR = "shared_cache_dir"
+CONF_SHARED_CACHE_TTL = "shared_cache_ttl"
+
+DEFAULT_MAX_ATTEMPTS = 2
+DEFAULT_REQUEST_TIMEOUT = 30
+# Instances sharing a result cache refresh it at most once per this many
+# seconds, one polling interval by default
+DEFAULT_SHARED_CACHE_TTL = DATA_UPDATE_INTERVAL
+
+# Sessions are refreshed in the background when they are expected to expire
+# within SESSION_KEEPALIVE_MARGIN seconds, checked every
+# SESSION_KEEPALIVE_INTERVAL seconds.
+SESSION_KEEPALIVE_INTERVAL = 60
+SESSION_KEEPALIVE_MARGIN = 120
+MIN_SESSION_LIFETIME = 300
+# Session expiries are only learned from idle gaps at least this many polling
+# intervals long; shorter gaps are ordinary polling and say more about absolute
+# session caps than about the idle timeout
+SESSION_LEARN_FACTOR = 1.5
+
+# A login form CSRF token is reused for re-authentication while the session
+# it was issued for is alive, for at most this many seconds
+CSRF_TOKEN_LIFETIME = 1800
+
+# Process-wide request budgets shared by every entry: tokens per second and
+# burst size for logins and for water test fetches, plus the random spread
+# applied to each polling interval.
+LOGIN_RATE = 0.2
+LOGIN_BURST = 1
+FETCH_RATE = 1.0
+FETCH_BURST = 1
+POLL_JITTER = 0.05
+
+# HTTP transport: connection pools kept per host and connections kept per
+# pool (the site is a single host, so one pool serves login and fetches), and
+# how long resolved addresses are reused.
+POOL_CONNECTIONS = 2
+POOL_MAXSIZE = 4
+DNS_CACHE_TTL = 300
+
+# Water test pages of at least this many characters are parsed in a small,
+# lazily started process pool when process parsing is enabled; smaller pages
+# cost less to parse than to ship to another process.
+PROCESS_PARSE_THRESHOLD = 64 * 1024
+PARSE_PROCESSES = 2
+
+# Services returning the full water balance history for an entry and
+# exporting parsed water tests to a file
+SERVICE_GET_WATER_BALANCE = "get_water_balance"
+SERVICE_EXPORT_HISTORY = "export_history"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_PATH = "path"
+ATTR_FORMAT = "format"
@@ -0,0 +1,270 @@
+"""Data update coordinator for Leslie's Pool Water Tests."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from datetime import timedelta
+from functools import partial
+import logging
+import time
+from typing import Any
+
+import requests
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.helpers.update_coordinator import UpdateFailed
+
+from .analytics import WaterTestHistory
+from .api import LesliesPoolApi
+from .const import CONF_CACHE_TTL
+from .const import CONF_MAX_ATTEMPTS
+from .const import CONF_PARSE_IN_PROCESS
+from .const import CONF_REQUEST_TIMEOUT
+from .const import CONF_SHARED_CACHE_DIR
+from .const import CONF_SHARED_CACHE_TTL
+from .const import REFRESH_FRESHNESS_WINDOW
+from .const import SESSION_KEEPALIVE_MARGIN
+from .export import export_pool
+from .ratelimit import jittered
+from .ratelimit import stagger_offset
+from .scheduler import AccountScheduler
+from .scheduler import Priority
+from .scheduler import Ticket
+from .shared_cache import DirectoryCache
+from .trends import ChemicalTrends
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_test_date(date_str):
+    """Parse the test date string from Leslie's website into a datetime object."""
+    if not date_str:
+        return None
+
+    try:
+        # Parse MM/DD/YYYY format
+        date_obj = datetime.strptime(date_str, "%m/%d/%Y")
+
+        # Since we don't have a time component, set it to noon UTC to avoid timezone issues
+        date_obj = date_obj.replace(hour=12, minute=0, second=0, microsecond=0)
+
+        return date_obj
+    except ValueError:
+        _LOGGER.error("Failed to parse test date: %s", date_str)
+        return None
+
+
+class LesliesPoolCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Coordinator that funnels every refresh through a single-flight gate.
+
+    Entity updates, ``homeassistant.update_entity`` calls and scheduled polls
+    all end up in ``_async_update_data``. Concurrent callers share the one
+    in-flight fetch, and callers arriving shortly after a successful fetch are
+    answered from the cached data. Fetches, exports and keep-alives take turns
+    on the account's session through its ``AccountScheduler``.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: LesliesPoolApi,
+        update_interval: timedelta,
+        freshness_window: float = REFRESH_FRESHNESS_WINDOW,
+        scheduler: AccountScheduler | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="leslies_pool",
+            update_interval=update_interval,
+        )
+        self.api = api
+        self.freshness_window = freshness_window
+        # Polls are offset within the interval and jittered so that entries
+        # started together do not hit Leslie's at the same moment
+        self._base_interval = update_interval
+        self._stagger = stagger_offset(update_interval.total_seconds())
+        self._inflight: asyncio.Task[dict[str, Any]] | None = None
+        self._inflight_ticket: Ticket | None = None
+        self._last_fetch: float | None = None
+        # Orders use of the account's requests session across executor jobs
+        self.scheduler = scheduler or AccountScheduler()
+        # Refreshes requested through entities are interactive, polls are not.
+        # The priority is only raised by the debounced call itself, so a poll
+        # running while a request waits out the cooldown stays scheduled
+        self._requested_priority = Priority.SCHEDULED
+        self._debounced_refresh.function = self._async_interactive_refresh
+        self.trends = ChemicalTrends()
+        self.history = WaterTestHistory()
+        # Newest test fed into the trends and history; kept here rather than
+        # on the API, which outlives the coordinator across reloads
+        self._newest_row: dict[str, Any] | None = None
+
+    @callback
+    def async_apply_options(
+        self, update_interval: timedelta, options: dict[str, Any]
+    ) -> None:
+        """Apply polling and fetch tunables to the running coordinator."""
+        self.freshness_window = options.get(CONF_CACHE_TTL, self.freshness_window)
+        self.api.max_attempts = options.get(CONF_MAX_ATTEMPTS, self.api.max_attempts)
+        self.api.timeout = options.get(CONF_REQUEST_TIMEOUT, self.api.timeout)
+        self.api.parse_in_process = options.get(
+            CONF_PARSE_IN_PROCESS, self.api.parse_in_process
+        )
+        shared_cache_dir = options.get(CONF_SHARED_CACHE_DIR)
+        self.api.shared_cache = (
+            DirectoryCache(shared_cache_dir) if shared_cache_dir else None
+        )
+        self.api.shared_cache_ttl = options.get(
+            CONF_SHARED_CACHE_TTL, self.api.shared_cache_ttl
+        )
+
+        self.api.poll_interval = update_interval.total_seconds()
+
+        if update_interval != self._base_interval:
+            self._base_interval = update_interval
+            self.update_interval = self._next_update_interval()
+            # Move the pending poll onto the new interval without fetching now
+            if self._listeners:
+                self._schedule_refresh()
+
+    def _next_update_interval(self) -> timedelta:
+        """Return the jittered interval to the next poll, staggered once."""
+        seconds = jittered(self._base_interval.total_seconds()) + self._stagger
+        self._stagger = 0.0
+        return timedelta(seconds=seconds)
+
+    @property
+    def _effective_freshness(self) -> float:
+        """Return the freshness window, capped below the polling interval."""
+        return min(self.freshness_window, self._base_interval.total_seconds() / 2)
+
+    def _is_fresh(self) -> bool:
+        """Return True if the cached data can be served without a fetch."""
+        if not self.data or self._last_fetch is None:
+            return False
+        return time.monotonic() - self._last_fetch < self._effective_freshness
+
+    async def _async_interactive_refresh(self) -> None:
+        """Run a refresh requested by a user, ahead of scheduled work."""
+        # Nothing awaits between here and _async_update_data consuming it
+        self._requested_priority = Priority.INTERACTIVE
+        await self.async_refresh()
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Return fresh cached data or join the single in-flight fetch."""
+        self.update_interval = self._next_update_interval()
+        priority = self._requested_priority
+        self._requested_priority = Priority.SCHEDULED
+
+        if self._is_fresh():
+            self.logger.debug("Serving %s from cache", self.name)
+            return self.data
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight_ticket = self.scheduler.ticket(priority)
+            self._inflight = self.hass.async_create_task(
+                self._async_fetch(self._inflight_ticket),
+                f"{self.name} single-flight refresh",
+            )
+        else:
+            self.logger.debug("Joining in-flight refresh of %s", self.name)
+            # A user joining a queued poll should not wait at poll priority
+            self.scheduler.promote(self._inflight_ticket, priority)
+
+        # Shield the shared fetch so one cancelled caller does not abort it
+        # for everyone else waiting on the same result.
+        return await asyncio.shield(self._inflight)
+
+    async def _async_fetch(self, ticket: Ticket) -> dict[str, Any]:
+        """Run the upstream fetch and record when it succeeded."""
+        data = await self._async_fetch_water_test_data(ticket)
+        self._last_fetch = time.monotonic()
+        return data
+
+    async def async_keep_alive(self, _now: datetime | None = None) -> None:
+        """Refresh authentication in the background before the session expires."""
+        # Never compete with other work; a poll re-authenticates on its own
+        if self.scheduler.busy:
+            return
+        # With a shared cache only the elected instance goes upstream, and it
+        # re-authenticates on demand; keeping every instance logged in would
+        # scale logins with the number of instances again
+        if self.api.shared_cache is not None:
+            return
+
+        expires_in = self.api.session_expires_in()
+        if expires_in is None or expires_in > SESSION_KEEPALIVE_MARGIN:
+            return
+
+        self.logger.debug("Session expires in %.0fs, refreshing it", expires_in)
+        await self.api.async_reserve(login=True)
+        async with self.scheduler.slot(self.scheduler.ticket(Priority.BACKGROUND)):
+            try:
+                refreshed = await self.hass.async_add_executor_job(
+                    self.api.refresh_session_if_expiring, SESSION_KEEPALIVE_MARGIN
+                )
+            except requests.RequestException as err:
+                self.logger.debug("Background session refresh failed: %s", err)
+                return
+        if not refreshed:
+            self.logger.debug("Background session refresh did not authenticate")
+
+    async def async_export_history(self, path: str, file_format: str) -> int:
+        """Append the pool's new water tests to an export file.
+
+        The export runs as background work and pauses between row batches
+        whenever a refresh or poll of the account is waiting.
+        """
+        ticket = self.scheduler.ticket(Priority.BACKGROUND)
+        await self.api.async_reserve()
+        async with self.scheduler.slot(ticket):
+            return await self.hass.async_add_executor_job(
+                partial(
+                    export_pool,
+                    self.api,
+                    path,
+                    file_format,
+                    checkpoint=partial(
+                        self.scheduler.checkpoint, ticket, self.hass.loop
+                    ),
+                )
+            )
+
+    async def _async_fetch_water_test_data(self, ticket: Ticket) -> dict[str, Any]:
+        """Fetch data from API endpoint."""
+        try:
+            # Wait for the fetch budget before taking the account's session
+            await self.api.async_reserve()
+            async with self.scheduler.slot(ticket):
+                data = await self.hass.async_add_executor_job(
+                    self.api.fetch_water_test_data, self._newest_row
+                )
+            if self.api.new_rows:
+                self._newest_row = self.api.new_rows[0]
+            # Ensure 'test_date' is included in the data
+            if "test_date" in data:
+                data["last_tested"] = data["test_date"]  # Use the 'test_date' value
+                # Parse test_date into a datetime object
+                data["test_timestamp"] = parse_test_date(data["test_date"])
+            else:
+                data["last_tested"] = None  # Fallback if 'test_date' is missing
+                data["test_timestamp"] = None
+
+            # Feed only tests we have not seen before into the rolling windows
+            self.trends.add_rows(self.api.new_rows, parse_test_date)
+            self.trends.evict(datetime.now())
+            data["trends"] = self.trends.snapshot()
+
+            # Water balance for the newest test, computed over the full history
+            self.history.extend(self.api.new_rows)
+            data["water_balance"] = self.history.latest()
+
+            # Add timestamp to force update even when values haven't changed
+            data["_last_poll"] = datetime.now().isoformat()
+            return data
+        except requests.RequestException as err:
+            raise UpdateFailed(f"Error fetching data: {err}") from err
@@ -0,0 +1,24 @@
+"""Diagnostics support for Leslie's Pool Water Tests."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import LesliesPoolCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return queue waits and transport counters for a config entry."""
+    coordinator: LesliesPoolCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        # Shared by every entry of the account
+        "queue_wait": coordinator.scheduler.queue_wait_report(),
+        "transport": coordinator.api.transport_stats.snapshot(),
+        "last_poll_transport": coordinator.api.last_poll_transport,
+    }
@@ -0,0 +1,188 @@
+"""Streaming export of parsed water tests to CSV and Parquet files.
+
+Rows are written oldest first in fixed-size batches (one Parquet row group
+per batch), so memory stays bounded by a single history page however many
+pools or years are exported. Each export appends only the tests that are newer
+than the previous export of the same pool, tracked in a small state file next
+to the output. The state file is replaced atomically, and only once the rows
+it accounts for are on disk.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import suppress
+import csv
+from itertools import islice
+import json
+import os
+import tempfile
+import uuid
+
+from .api import LesliesPoolApi
+from .parser import CHEMICAL_KEYS
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+EXPORT_FORMATS = (FORMAT_CSV, FORMAT_PARQUET)
+
+EXPORT_FIELDS = (
+    "pool_profile_id",
+    "pool_name",
+    "test_date",
+    *CHEMICAL_KEYS,
+    "in_store",
+)
+# Rows written per batch, and per row group in Parquet files
+EXPORT_BATCH_SIZE = 1000
+
+
+def batched(
+    rows: Iterable[dict], size: int = EXPORT_BATCH_SIZE
+) -> Iterator[list[dict]]:
+    """Group rows into lists of at most ``size`` rows."""
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _with_checkpoints(
+    batches: Iterable[list[dict]], checkpoint: Callable[[], None]
+) -> Iterator[list[dict]]:
+    """Call ``checkpoint`` after each batch is written, before the next one."""
+    for batch in batches:
+        yield batch
+        checkpoint()
+
+
+def _state_path(path: str) -> str:
+    """Return the file recording the newest exported test of each pool."""
+    return f"{path}.state.json"
+
+
+def _load_state(path: str) -> dict[str, dict]:
+    """Return the newest exported test of each pool."""
+    try:
+        with open(_state_path(path), encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(path: str, state: dict[str, dict]) -> None:
+    """Atomically record the newest exported test of each pool."""
+    state_path = _state_path(path)
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(state_path) or ".",
+        prefix=f".{os.path.basename(state_path)}.",
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            json.dump(state, file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, state_path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(temp_path)
+        raise
+
+
+def _sync(path: str) -> None:
+    """Flush a written file to disk."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_csv(path: str, batches: Iterable[list[dict]]) -> int:
+    """Append batches to a CSV file, writing the header for a new file."""
+    count = 0
+    with open(path, "a", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS)
+        if file.tell() == 0:
+            writer.writeheader()
+        for batch in batches:
+            writer.writerows(batch)
+            count += len(batch)
+        file.flush()
+        os.fsync(file.fileno())
+    return count
+
+
+def _write_parquet(path: str, batches: Iterable[list[dict]]) -> int:
+    """Write batches as row groups of a new part file in a Parquet dataset.
+
+    Parquet files cannot be appended to, so ``path`` is a directory and every
+    export adds a part file to it.
+    """
+    # pyarrow is large and only needed here, so it is not a requirement
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema(
+        [
+            (field, pa.bool_() if field == "in_store" else pa.string())
+            for field in EXPORT_FIELDS
+        ]
+    )
+    count = 0
+    writer = None
+    part = None
+    try:
+        for batch in batches:
+            if writer is None:
+                os.makedirs(path, exist_ok=True)
+                part = os.path.join(path, f"part-{uuid.uuid4().hex}.parquet")
+                writer = pq.ParquetWriter(part, schema)
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            count += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if part is not None:
+        _sync(part)
+    return count
+
+
+def _pool_rows(api: LesliesPoolApi, rows: Iterable[dict]) -> Iterator[dict]:
+    """Tag rows with their pool."""
+    for row in rows:
+        yield {
+            "pool_profile_id": api.pool_profile_id,
+            "pool_name": api.pool_name,
+            **{field: row.get(field) for field in EXPORT_FIELDS[2:]},
+        }
+
+
+def export_pool(
+    api: LesliesPoolApi,
+    path: str,
+    file_format: str,
+    checkpoint: Callable[[], None] | None = None,
+) -> int:
+    """Append a pool's tests newer than its previous export; return the count.
+
+    ``checkpoint`` is called between batches, where the export may pause.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {file_format}")
+
+    state = _load_state(path)
+    # The site lists tests newest first; every export appends them oldest first
+    rows = list(api.iter_water_tests(stop_at=state.get(api.pool_profile_id)))
+    rows.reverse()
+    write = _write_csv if file_format == FORMAT_CSV else _write_parquet
+    batches = batched(_pool_rows(api, rows))
+    if checkpoint is not None:
+        batches = _with_checkpoints(batches, checkpoint)
+    count = write(path, batches)
+
+    if rows:
+        state[api.pool_profile_id] = rows[-1]
+        _save_state(path, state)
+    return count
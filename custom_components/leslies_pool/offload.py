@@ -0,0 +1,95 @@
+"""Optional process pool for parsing large water test pages.
+
+BeautifulSoup parsing is pure Python and holds the GIL, so with many entries
+parsing in Home Assistant's thread executor it delays the event loop. Large
+pages can instead be parsed in a small pool of worker processes, started on
+first use, that send back only the parsed rows.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import logging
+import multiprocessing
+import threading
+
+from .const import PARSE_PROCESSES
+from .const import PROCESS_PARSE_THRESHOLD
+from .parser import parse_latest_water_tests
+
+_LOGGER = logging.getLogger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Return the parse pool, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _LOGGER.debug("Starting %d water test parse processes", PARSE_PROCESSES)
+            # Forking a threaded process is unsafe, so workers are spawned
+            _executor = ProcessPoolExecutor(
+                max_workers=PARSE_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    """Stop a pool whose worker is stuck, so the next parse starts a new one."""
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    # Shutting down does not stop a running parse, so its workers are killed
+    for process in list((getattr(executor, "_processes", None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown() -> None:
+    """Stop the parse pool if it was started."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(cancel_futures=True)
+
+
+def parse_rows(
+    html: str,
+    stop_at: dict | None = None,
+    in_process: bool = False,
+    timeout: float | None = None,
+) -> tuple[dict | None, list[dict]] | None:
+    """Parse water tests like ``parse_latest_water_tests``, offloading large pages.
+
+    Pages below ``PROCESS_PARSE_THRESHOLD`` characters, and every page when
+    ``in_process`` is off, are parsed in the calling thread, as are pages the
+    pool fails to parse within ``timeout`` seconds.
+    """
+    if not in_process or len(html) < PROCESS_PARSE_THRESHOLD:
+        return parse_latest_water_tests(html, stop_at=stop_at)
+
+    executor = _get_executor()
+    try:
+        future = executor.submit(parse_latest_water_tests, html, stop_at)
+        return future.result(timeout=timeout)
+    except TimeoutError:
+        if not future.cancel():
+            # The parse is running and would keep its worker busy
+            _LOGGER.warning(
+                "Water test parse process timed out after %ss, restarting the pool",
+                timeout,
+            )
+            _discard_executor(executor)
+        else:
+            _LOGGER.warning("Water test parse pool is busy, parsing in thread instead")
+        return parse_latest_water_tests(html, stop_at=stop_at)
+    except BrokenProcessPool:
+        _LOGGER.warning("Water test parse process died, parsing in thread instead")
+        shutdown()
+        return parse_latest_water_tests(html, stop_at=stop_at)
@@ -0,0 +1,360 @@
+"""Parser for the Leslie's Pool water test history table."""
+
+from __future__ import annotations
+
+import codecs
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date
+from datetime import datetime
+from html.parser import HTMLParser
+from itertools import chain
+from itertools import islice
+import logging
+import re
+from urllib.parse import unquote_plus
+
+from bs4 import BeautifulSoup
+from bs4 import Tag
+
+_LOGGER = logging.getLogger(__name__)
+
+WATER_TEST_TABLE_CLASS = "table table-striped table-bordered table-hover table-sm"
+
+CHEMICAL_KEYS = (
+    "free_chlorine",
+    "total_chlorine",
+    "ph",
+    "alkalinity",
+    "calcium",
+    "cyanuric_acid",
+    "iron",
+    "copper",
+    "phosphates",
+    "salt",
+)
+
+# Normalized header labels and the value key each one maps to
+HEADER_ALIASES = {
+    "date": "test_date",
+    "test date": "test_date",
+    "tested": "test_date",
+    "free chlorine": "free_chlorine",
+    "fc": "free_chlorine",
+    "total chlorine": "total_chlorine",
+    "tc": "total_chlorine",
+    "ph": "ph",
+    "total alkalinity": "alkalinity",
+    "alkalinity": "alkalinity",
+    "ta": "alkalinity",
+    "calcium hardness": "calcium",
+    "calcium": "calcium",
+    "ch": "calcium",
+    "cyanuric acid": "cyanuric_acid",
+    "cya": "cyanuric_acid",
+    "stabilizer": "cyanuric_acid",
+    "iron": "iron",
+    "copper": "copper",
+    "phosphates": "phosphates",
+    "phosphate": "phosphates",
+    "salt": "salt",
+    "in store": "in_store",
+    "instore": "in_store",
+}
+
+# Pool links on the account's pool profile page
+POOL_LINK_PATTERN = re.compile(r"poolProfileId=(\d+)&(?:amp;)?poolName=([^&\"'#\s]+)")
+
+# Keep a handful of layouts around; the site rarely has more than one
+_SCHEMA_CACHE_SIZE = 8
+
+# The login form's CSRF token is searched for in at most this many bytes of
+# the login page
+CSRF_SCAN_LIMIT = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ColumnSchema:
+    """Column indexes compiled from a water test table header."""
+
+    cell_names: tuple[str, ...]
+    indices: tuple[tuple[str, int], ...]
+    date_index: int | None
+    in_store_index: int | None
+
+    @property
+    def min_cells(self) -> int:
+        """Return the number of cells a row needs for every lookup to succeed."""
+        positions = [index for _, index in self.indices]
+        for index in (self.date_index, self.in_store_index):
+            if index is not None:
+                positions.append(index)
+        return max((p if p >= 0 else -p - 1 for p in positions), default=-1) + 1
+
+
+# Positional layout used before the table shipped a usable header:
+# the date in the row's <th>, chemicals in <td> 1..10 and the in-store
+# marker in the last <td>.
+LEGACY_SCHEMA = ColumnSchema(
+    cell_names=("td",),
+    indices=tuple((key, position) for position, key in enumerate(CHEMICAL_KEYS, 1)),
+    date_index=None,
+    in_store_index=-1,
+)
+
+_schema_cache: dict[tuple[str, ...], ColumnSchema] = {}
+
+
+def _normalize_label(label: str) -> str:
+    """Lower-case a header label and drop units and punctuation."""
+    label = re.sub(r"\(.*?\)", " ", label.lower())
+    label = re.sub(r"[^a-z0-9]+", " ", label)
+    return label.strip()
+
+
+def compile_schema(labels: tuple[str, ...]) -> ColumnSchema | None:
+    """Compile header labels into a column schema.
+
+    Returns None when the header does not name every chemical, in which case
+    callers fall back to the legacy positional layout.
+    """
+    indices: dict[str, int] = {}
+    for position, label in enumerate(labels):
+        key = HEADER_ALIASES.get(_normalize_label(label))
+        if key is not None and key not in indices:
+            indices[key] = position
+
+    missing = [key for key in CHEMICAL_KEYS if key not in indices]
+    if missing:
+        _LOGGER.debug("Water test header %s is missing %s", labels, missing)
+        return None
+
+    return ColumnSchema(
+        cell_names=("th", "td"),
+        indices=tuple((key, indices[key]) for key in CHEMICAL_KEYS),
+        date_index=indices.get("test_date"),
+        in_store_index=indices.get("in_store"),
+    )
+
+
+def schema_for_table(table: Tag) -> ColumnSchema:
+    """Return the cached column schema for a table's header layout."""
+    header_row = None
+    thead = table.find("thead")
+    if isinstance(thead, Tag):
+        header_row = thead.find("tr")
+    if not isinstance(header_row, Tag):
+        return LEGACY_SCHEMA
+
+    labels = tuple(
+        cell.get_text(" ", strip=True)
+        for cell in header_row.find_all(["th", "td"], recursive=False)
+    )
+    schema = _schema_cache.get(labels)
+    if schema is None:
+        schema = compile_schema(labels) or LEGACY_SCHEMA
+        if len(_schema_cache) >= _SCHEMA_CACHE_SIZE:
+            _schema_cache.clear()
+        _schema_cache[labels] = schema
+        _LOGGER.debug("Compiled water test column schema for header %s", labels)
+    return schema
+
+
+def _date_from_cell(cell: Tag | None) -> str | None:
+    """Return the test date shown in a cell."""
+    if cell is None:
+        return None
+    badge = cell.find("span", {"class": "badge"})
+    text = (badge if isinstance(badge, Tag) else cell).get_text(strip=True)
+    return text or None
+
+
+def _in_store_from_cell(cell: Tag | None) -> bool:
+    """Return False if the cell shows the 'not in store' marker."""
+    if cell is None:
+        return True
+    return cell.find("i", {"class": "fa fa-times-circle text-danger"}) is None
+
+
+def parse_row(row: Tag, schema: ColumnSchema) -> dict | None:
+    """Extract one water test from a table row using direct index lookups."""
+    cells = row.find_all(schema.cell_names, recursive=False)
+    if len(cells) < schema.min_cells:
+        return None
+
+    values = {key: cells[index].get_text(strip=True) for key, index in schema.indices}
+
+    if schema.date_index is not None:
+        values["test_date"] = _date_from_cell(cells[schema.date_index])
+    else:
+        date_cell = row.find("th")
+        values["test_date"] = _date_from_cell(
+            date_cell if isinstance(date_cell, Tag) else None
+        )
+
+    values["in_store"] = (
+        _in_store_from_cell(cells[schema.in_store_index])
+        if schema.in_store_index is not None
+        else True
+    )
+    return values
+
+
+def _find_water_test_table(html: str) -> Tag | None:
+    """Return the water test history table of a page, if it has one."""
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", {"class": WATER_TEST_TABLE_CLASS})
+    return table if isinstance(table, Tag) else None
+
+
+def _test_day(values: dict) -> date | None:
+    """Return the MM/DD/YYYY test date of a row, or None if it has none."""
+    try:
+        return datetime.strptime(values.get("test_date") or "", "%m/%d/%Y").date()
+    except ValueError:
+        return None
+
+
+def _is_known(values: dict, stop_at: dict, stop_day: date | None) -> bool:
+    """Return True if a row is not newer than the newest known test.
+
+    Rows are compared on their test date, which stays put when the site
+    edits a test's readings; rows without a date fall back to equality.
+    """
+    day = _test_day(values)
+    if day is not None and stop_day is not None:
+        return day <= stop_day
+    return values == stop_at
+
+
+def _table_rows(table: Tag) -> Iterator[dict]:
+    """Yield every water test of a history table, newest first."""
+    schema = schema_for_table(table)
+    tbody = table.find("tbody")
+    if not isinstance(tbody, Tag):
+        return
+
+    for row in tbody.find_all("tr", recursive=False):
+        values = parse_row(row, schema)
+        if values is not None:
+            yield values
+
+
+def _newer_rows(rows: Iterator[dict], stop_at: dict | None) -> Iterator[dict]:
+    """Yield rows until the first one that is not newer than ``stop_at``."""
+    stop_day = _test_day(stop_at) if stop_at is not None else None
+    for values in rows:
+        if stop_at is not None and _is_known(values, stop_at, stop_day):
+            return
+        yield values
+
+
+def _iter_table_rows(table: Tag, stop_at: dict | None) -> Iterator[dict]:
+    """Yield the water tests of a history table newer than ``stop_at``."""
+    return _newer_rows(_table_rows(table), stop_at)
+
+
+def parse_water_test_rows(
+    html: str, limit: int | None = None, stop_at: dict | None = None
+) -> list[dict] | None:
+    """Parse water tests from the history table, newest first.
+
+    Returns None if the page has no water test table, and at most ``limit``
+    rows otherwise. Parsing stops at the first row tested no later than
+    ``stop_at``, so passing the newest row seen so far returns only newer
+    tests, even if the site has since edited that row.
+    """
+    table = _find_water_test_table(html)
+    if table is None:
+        return None
+    return list(islice(_iter_table_rows(table, stop_at), limit))
+
+
+def parse_latest_water_tests(
+    html: str, stop_at: dict | None = None
+) -> tuple[dict | None, list[dict]] | None:
+    """Return the page's newest water test and the tests newer than ``stop_at``.
+
+    The newest test is returned even when it is already known, so corrections,
+    same-day retests and deletions upstream show up in the current values.
+    Returns None if the page has no water test table.
+    """
+    table = _find_water_test_table(html)
+    if table is None:
+        return None
+    rows = _table_rows(table)
+    latest = next(rows, None)
+    if latest is None:
+        return None, []
+    return latest, list(_newer_rows(chain([latest], rows), stop_at))
+
+
+def iter_water_test_rows(html: str, stop_at: dict | None = None) -> Iterator[dict]:
+    """Yield water tests from the history table one at a time, newest first.
+
+    Yields nothing if the page has no water test table; ``stop_at`` works as
+    in ``parse_water_test_rows``.
+    """
+    table = _find_water_test_table(html)
+    if table is not None:
+        yield from _iter_table_rows(table, stop_at)
+
+
+def parse_pool_profiles(html: str) -> list[dict]:
+    """Return every pool linked from the account's pool profile page.
+
+    Each pool is reported once, in page order, with its profile id, the
+    URL-encoded name used in requests and a readable title.
+    """
+    pools: dict[str, dict] = {}
+    for pool_profile_id, pool_name in POOL_LINK_PATTERN.findall(html):
+        if pool_profile_id not in pools:
+            pools[pool_profile_id] = {
+                "pool_profile_id": pool_profile_id,
+                "pool_name": pool_name,
+                "title": unquote_plus(pool_name),
+            }
+    return list(pools.values())
+
+
+class _CsrfTokenParser(HTMLParser):
+    """Event parser that records the first ``csrf_token`` input it sees."""
+
+    def __init__(self) -> None:
+        """Initialize the parser."""
+        super().__init__()
+        self.found = False
+        self.token: str | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        """Record the value of the first input named ``csrf_token``."""
+        if self.found or tag != "input":
+            return
+        attributes = dict(attrs)
+        if attributes.get("name") == "csrf_token":
+            self.found = True
+            self.token = attributes.get("value")
+
+
+def extract_csrf_token(
+    chunks: Iterable[bytes], encoding: str = "utf-8", limit: int = CSRF_SCAN_LIMIT
+) -> str | None:
+    """Return the login form's CSRF token from a streamed login page.
+
+    Chunks are parsed as they arrive without building a document tree, and
+    consumption stops at the first ``csrf_token`` input or after ``limit``
+    bytes, so the rest of ``chunks`` is left unread.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    parser = _CsrfTokenParser()
+    scanned = 0
+    for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+        if parser.found:
+            return parser.token or None
+        scanned += len(chunk)
+        if scanned >= limit:
+            _LOGGER.debug("No CSRF token in the first %d bytes of the page", limit)
+            return None
+    return None
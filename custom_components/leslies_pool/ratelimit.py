@@ -0,0 +1,86 @@
+"""Process-wide rate limiting and poll staggering for Leslie's Pool requests.
+
+Every ``LesliesPoolApi`` on the instance draws from the same token buckets,
+one for logins and one for water test fetches, so the outbound load stays
+bounded no matter how many entries and accounts are configured. Waits for
+tokens happen on the event loop before a job is handed to the executor, so no
+executor thread sleeps for the budget. Poll start times are spread across the
+polling interval so entries do not fire together.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import random
+import threading
+import time
+
+from .const import FETCH_BURST
+from .const import FETCH_RATE
+from .const import LOGIN_BURST
+from .const import LOGIN_RATE
+from .const import POLL_JITTER
+
+# Fractional part of the golden ratio; successive multiples of it spread
+# evenly over [0, 1) however many entries are added
+_GOLDEN_FRACTION = 0.6180339887498949
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every client on the instance.
+
+    ``async_acquire`` reserves a token immediately and waits on the event loop
+    until it is due, so waiting callers are served in arrival order. ``charge``
+    takes tokens from executor threads without waiting; the debt delays the
+    next ``async_acquire`` callers instead.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Initialize a full bucket refilling at ``rate`` tokens per second."""
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens and return the seconds until they are due."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def charge(self, tokens: float = 1.0) -> None:
+        """Take tokens without waiting, e.g. for a retry inside a running job."""
+        self._reserve(tokens)
+
+    async def async_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, waiting on the event loop until they are due.
+
+        Returns the seconds waited.
+        """
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+        return wait
+
+
+LOGIN_BUCKET = TokenBucket(LOGIN_RATE, LOGIN_BURST)
+FETCH_BUCKET = TokenBucket(FETCH_RATE, FETCH_BURST)
+
+_poll_slots = itertools.count()
+
+
+def stagger_offset(interval: float) -> float:
+    """Return a start offset within the interval for the next entry's polls."""
+    return (next(_poll_slots) * _GOLDEN_FRACTION) % 1.0 * interval
+
+
+def jittered(interval: float) -> float:
+    """Return the interval with random jitter applied."""
+    return interval * (1 + random.uniform(-POLL_JITTER, POLL_JITTER))
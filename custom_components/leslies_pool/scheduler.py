@@ -0,0 +1,205 @@
+"""Per-account priority scheduling of work that uses the Leslie's session.
+
+Interactive refreshes, scheduled polls and background jobs (history exports,
+session keep-alive) of one account run one at a time, highest priority
+first, so a refresh requested by the user never queues behind a long export.
+Background jobs running in the executor call ``checkpoint`` at row-batch
+boundaries; when higher-priority work is waiting, the job hands its slot over
+and resumes once that work is done. Time spent waiting for a slot is recorded
+per priority class.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+from .const import DATA_SCHEDULERS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priority classes, most urgent first."""
+
+    INTERACTIVE = 0
+    SCHEDULED = 1
+    BACKGROUND = 2
+
+
+@dataclass
+class QueueWait:
+    """Time jobs of one priority class spent waiting for the session."""
+
+    waits: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last: float = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record one wait."""
+        self.waits += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the waits in a JSON-friendly form."""
+        return {
+            "waits": self.waits,
+            "mean_seconds": round(self.total / self.waits, 3) if self.waits else 0.0,
+            "max_seconds": round(self.max, 3),
+            "last_seconds": round(self.last, 3),
+        }
+
+
+class Ticket:
+    """A job's place in the queue; its priority can be raised while it waits."""
+
+    __slots__ = ("priority", "requested", "sequence", "future")
+
+    def __init__(self, priority: Priority, sequence: int) -> None:
+        """Initialize the ticket."""
+        self.priority = priority
+        self.requested = priority  # Class the job's waits are reported under
+        self.sequence = sequence
+        self.future: asyncio.Future[None] | None = None
+
+    def __lt__(self, other: Ticket) -> bool:
+        """Order by priority, then first come first served."""
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class AccountScheduler:
+    """Runs one account's session work one job at a time by priority.
+
+    All methods except ``checkpoint`` run on the event loop.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an idle scheduler."""
+        self._waiting: list[Ticket] = []
+        self._sequence = itertools.count()
+        self._running: Ticket | None = None
+        # Read by executor threads at checkpoints; only written on the loop
+        self._preempt = False
+        self.queue_wait = {priority: QueueWait() for priority in Priority}
+
+    @property
+    def busy(self) -> bool:
+        """Return True if a job holds the session."""
+        return self._running is not None
+
+    def ticket(self, priority: Priority) -> Ticket:
+        """Return a new ticket for a job of the given priority."""
+        return Ticket(priority, next(self._sequence))
+
+    @callback
+    def promote(self, ticket: Ticket, priority: Priority) -> None:
+        """Raise the priority of a job, e.g. when a user joins a queued poll."""
+        if priority >= ticket.priority:
+            return
+        ticket.priority = priority
+        if ticket.future is not None and not ticket.future.done():
+            heapq.heapify(self._waiting)
+        self._update_preempt()
+
+    @asynccontextmanager
+    async def slot(self, ticket: Ticket) -> AsyncIterator[Ticket]:
+        """Hold the account's session for the duration of the block."""
+        await self._acquire(ticket)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    async def _acquire(self, ticket: Ticket) -> None:
+        """Wait until the ticket is the highest-priority job."""
+        start = time.monotonic()
+        if self._running is None and not self._waiting:
+            self._running = ticket
+        else:
+            ticket.future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiting, ticket)
+            self._update_preempt()
+            try:
+                await ticket.future
+            except asyncio.CancelledError:
+                # Granted just before being cancelled; pass the slot on
+                if self._running is ticket:
+                    self._release(ticket)
+                else:
+                    self._update_preempt()
+                raise
+        self.queue_wait[ticket.requested].record(time.monotonic() - start)
+
+    @callback
+    def _release(self, ticket: Ticket) -> None:
+        """Hand the session to the highest-priority waiting job."""
+        if self._running is not ticket:
+            return
+        self._running = None
+        while self._waiting:
+            waiter = heapq.heappop(self._waiting)
+            if waiter.future is not None and not waiter.future.done():
+                self._running = waiter
+                waiter.future.set_result(None)
+                break
+        self._update_preempt()
+
+    @callback
+    def _update_preempt(self) -> None:
+        """Recompute whether waiting work outranks the running job."""
+        # Drop tickets whose callers gave up waiting
+        while self._waiting and self._waiting[0].future.done():
+            heapq.heappop(self._waiting)
+        self._preempt = bool(
+            self._running is not None
+            and self._waiting
+            and self._waiting[0].priority < self._running.priority
+        )
+
+    async def yield_slot(self, ticket: Ticket) -> None:
+        """Let outranking work run, then take the session back."""
+        if self._running is not ticket or not self._preempt:
+            return
+        _LOGGER.debug("Pausing background work for higher-priority work")
+        self._release(ticket)
+        # The ticket keeps its sequence, so it resumes ahead of later jobs
+        await self._acquire(ticket)
+
+    def checkpoint(self, ticket: Ticket, loop: asyncio.AbstractEventLoop) -> None:
+        """Yield the session from an executor job if outranking work waits.
+
+        Called between row batches; it blocks the calling thread until the
+        job holds the session again.
+        """
+        if self._preempt:
+            asyncio.run_coroutine_threadsafe(self.yield_slot(ticket), loop).result()
+
+    def queue_wait_report(self) -> dict[str, dict[str, float]]:
+        """Return the queue waits of every priority class."""
+        return {
+            priority.name.lower(): wait.as_dict()
+            for priority, wait in self.queue_wait.items()
+        }
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant, username: str) -> AccountScheduler:
+    """Return the scheduler shared by every entry of an account."""
+    schedulers: dict[str, AccountScheduler] = hass.data.setdefault(DATA_SCHEDULERS, {})
+    key = username.strip().casefold()
+    if key not in schedulers:
+        schedulers[key] = AccountScheduler()
+    return schedulers[key]
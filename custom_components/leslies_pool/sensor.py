@@ -1,39 +1,57 @@
 """Sensor platform for Leslie's Pool Water Tests."""
 
-import requests
-from .const import DOMAIN
-from homeassistant.helpers import entity_registry as er
-from homeassistant.helpers.update_coordinator import UpdateFailed
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.device_registry import DeviceEntryType
-from homeassistant.core import HomeAssistant
-from homeassistant.config_entries import ConfigEntry
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
 from homeassistant.components.sensor import SensorEntity
-import logging
-from datetime import datetime, timedelta
+from homeassistant.components.sensor import SensorEntityDescription
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.device_registry import DeviceEntryType
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import LesliesPoolCoordinator
+from .trends import TREND_CHEMICALS
+from .trends import TREND_WINDOWS
+from .trends import trend_key
 
 
-def parse_test_date(date_str):
-    """Parse the test date string from Leslie's website into a datetime object."""
-    if not date_str:
-        return None
+@dataclass(frozen=True, kw_only=True)
+class LesliesPoolSensorEntityDescription(SensorEntityDescription):
+    """Describes a Leslie's Pool sensor and where its data comes from."""
 
-    try:
-        # Parse MM/DD/YYYY format
-        date_obj = datetime.strptime(date_str, "%m/%d/%Y")
+    value_fn: Callable[[dict[str, Any]], Any]
+    attributes_fn: Callable[[dict[str, Any]], dict[str, Any]] = lambda data: {}
+
+
+def _reading(key: str) -> Callable[[dict[str, Any]], Any]:
+    """Return a getter for a value of the newest water test."""
+    return lambda data: data.get(key)
+
+
+def _window(chemical: str, days: int) -> Callable[[dict[str, Any]], dict]:
+    """Return a getter for a chemical's rolling statistics."""
+    return lambda data: (data.get("trends") or {}).get(chemical, {}).get(days, {})
 
-        # Since we don't have a time component, set it to noon UTC to avoid timezone issues
-        date_obj = date_obj.replace(hour=12, minute=0, second=0, microsecond=0)
 
-        return date_obj
-    except ValueError:
-        _LOGGER.error(f"Failed to parse test date: {date_str}")
+def _number(value: Any) -> float | None:
+    """Return a reading as a number, or None if the site left it blank."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
         return None
 
 
-_LOGGER = logging.getLogger(__name__)
+def _balance(data: dict[str, Any]) -> dict[str, Any]:
+    """Return the water balance computed for the newest test."""
+    return data.get("water_balance") or {}
+
 
 SENSOR_TYPES = {
     "free_chlorine": ("Leslies Free Chlorine", "ppm"),
@@ -50,121 +68,91 @@ SENSOR_TYPES = {
     "in_store": ("Leslies In Store", None),
 }
 
+READING_DESCRIPTIONS = tuple(
+    LesliesPoolSensorEntityDescription(
+        key=key,
+        name=name,
+        native_unit_of_measurement=unit,
+        value_fn=_reading(key),
+    )
+    for key, (name, unit) in SENSOR_TYPES.items()
+)
+
+# Rolling averages with deviation bands and rate of change as attributes
+TREND_DESCRIPTIONS = tuple(
+    LesliesPoolSensorEntityDescription(
+        key=trend_key(chemical, days),
+        name=f"{SENSOR_TYPES[chemical][0]} {days}d Average",
+        native_unit_of_measurement=SENSOR_TYPES[chemical][1],
+        value_fn=lambda data, stats=_window(chemical, days): stats(data).get("mean"),
+        attributes_fn=lambda data, stats=_window(chemical, days): {
+            key: value for key, value in stats(data).items() if key != "mean"
+        },
+    )
+    for chemical in TREND_CHEMICALS
+    for days in TREND_WINDOWS
+)
+
+# Latest water balance values, computed over the full test history
+WATER_BALANCE_DESCRIPTIONS = (
+    LesliesPoolSensorEntityDescription(
+        key="saturation_index",
+        name="Leslies Saturation Index",
+        value_fn=lambda data: _balance(data).get("saturation_index"),
+    ),
+    LesliesPoolSensorEntityDescription(
+        key="fc_cya_ratio",
+        name="Leslies FC/CYA Ratio",
+        native_unit_of_measurement="%",
+        value_fn=lambda data: _balance(data).get("fc_cya_ratio"),
+    ),
+    LesliesPoolSensorEntityDescription(
+        key="out_of_range",
+        name="Leslies Out Of Range",
+        value_fn=lambda data: _balance(data).get("out_of_range"),
+        attributes_fn=lambda data: {
+            "readings": _balance(data).get("out_of_range_readings", [])
+        },
+    ),
+)
+
+SENSOR_DESCRIPTIONS = (
+    READING_DESCRIPTIONS + TREND_DESCRIPTIONS + WATER_BALANCE_DESCRIPTIONS
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     """Set up Leslie's Pool Water Tests sensors from a config entry."""
-    api = hass.data[DOMAIN][entry.entry_id]
-    scan_interval = entry.data.get("scan_interval", 300)
-
-    async def async_update_data():
-        """Fetch data from API endpoint."""
-        try:
-            data = await hass.async_add_executor_job(api.fetch_water_test_data)
-            # Ensure 'test_date' is included in the data
-            if "test_date" in data:
-                data["last_tested"] = data["test_date"]  # Use the 'test_date' value
-                # Parse test_date into a datetime object
-                data["test_timestamp"] = parse_test_date(data["test_date"])
-            else:
-                data["last_tested"] = None  # Fallback if 'test_date' is missing
-                data["test_timestamp"] = None
-
-            # Add timestamp to force update even when values haven't changed
-            data["_last_poll"] = datetime.now().isoformat()
-            return data
-        except requests.RequestException as err:
-            raise UpdateFailed(f"Error fetching data: {err}") from err
-
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name="leslies_pool",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=scan_interval),
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+
+    async_add_entities(
+        [
+            LesliesPoolSensor(coordinator, entry, description)
+            for description in SENSOR_DESCRIPTIONS
+        ],
+        update_before_add=True,
     )
 
-    await coordinator.async_refresh()
-
-    # Access the entity registry
-    entity_registry = er.async_get(hass)
-
-    sensors = []
-    for sensor_type, (name, unit) in SENSOR_TYPES.items():
-        unique_id = f"{entry.entry_id}_leslies_{sensor_type}"
 
-        # Try to find the entity in the registry using the unique ID
-        entity_id = entity_registry.async_get_entity_id("sensor", DOMAIN, unique_id)
-
-        # If the entity is not found, check for the old format without "leslies_"
-        if not entity_id:
-            old_unique_id = f"{entry.entry_id}_{sensor_type}"  # Old unique ID format
-            entity_id = entity_registry.async_get_entity_id(
-                "sensor", DOMAIN, old_unique_id
-            )
-
-            # If an old entity is found, update its unique ID and entity_id
-            if entity_id:
-                new_entity_id = f"sensor.leslies_{sensor_type}"
-                entity_registry.async_update_entity(entity_id, new_unique_id=unique_id)
-                entity_registry.async_update_entity(
-                    entity_id, new_entity_id=new_entity_id
-                )
-
-        # Create the sensor entity
-        sensors.append(LesliesPoolSensor(coordinator, entry, sensor_type, name, unit))
-
-    async_add_entities(sensors, update_before_add=True)
-
-
-class LesliesPoolSensor(SensorEntity):
+class LesliesPoolSensor(CoordinatorEntity[LesliesPoolCoordinator], SensorEntity):
     """Representation of a Leslie's Pool sensor."""
 
-    def __init__(self, coordinator, config_entry, sensor_type, name, unit):
-        """Initialize the sensor."""
-        self.coordinator = coordinator
-        self.config_entry = config_entry
-        self._sensor_type = sensor_type
-        self._name = name
-        self._unit = unit
-        self._attr_should_poll = False  # We don't poll this entity directly
-        self._attr_last_updated = None
-
-    @property
-    def unique_id(self):
-        """Return a unique ID for this sensor."""
-        return f"{self.config_entry.entry_id}_leslies_{self._sensor_type}"
-
-    @property
-    def name(self):
-        """Return the name of the sensor."""
-        return self._name
+    entity_description: LesliesPoolSensorEntityDescription
 
-    @property
-    def state(self):
-        """Return the state of the sensor."""
-        if not self.coordinator.data:
-            return None
-            
-        # Access the timestamp field to ensure we're using the latest data
-        timestamp = self.coordinator.data.get("_last_poll")
-        if not timestamp:
-            return None
-            
-        # Get the actual value
-        return self.coordinator.data.get(self._sensor_type)
-
-    @property
-    def available(self):
-        """Return if the sensor is available."""
-        return self.coordinator.last_update_success
-
-    @property
-    def device_info(self):
-        """Return device information about this entity."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self.config_entry.entry_id)},
+    def __init__(
+        self,
+        coordinator: LesliesPoolCoordinator,
+        config_entry: ConfigEntry,
+        description: LesliesPoolSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{config_entry.entry_id}_leslies_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, config_entry.entry_id)},
             name="Leslie's Pool",
             manufacturer="Leslie's Pool",
             model="Water Test",
@@ -172,35 +160,25 @@ class LesliesPoolSensor(SensorEntity):
         )
 
     @property
-    def unit_of_measurement(self):
-        """Return the unit of measurement of this entity."""
-        return self._unit
-
-    async def async_update(self):
-        """Update the sensor."""
-        await self.coordinator.async_request_refresh()
-
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        # Register to receive updates from the coordinator
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self._handle_coordinator_update)
-        )
-        
-    def _handle_coordinator_update(self):
-        """Handle updated data from the coordinator."""
-        # Explicitly update state and force a timestamp change to ensure Home Assistant detects the update
-        self._attr_last_updated = datetime.now()
-        self.async_write_ha_state()
-        
+    def native_value(self) -> Any:
+        """Return the state of the sensor."""
+        if not self.coordinator.data:
+            return None
+        value = self.entity_description.value_fn(self.coordinator.data)
+        # Sensors with a unit must report numbers; readings arrive as text
+        if self.entity_description.native_unit_of_measurement is None:
+            return value
+        return _number(value)
+
     @property
-    def extra_state_attributes(self):
+    def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
-        if not self.coordinator.data:
+        data = self.coordinator.data
+        if not data:
             return {}
-            
-        # Add last update timestamp to the entity attributes to force Home Assistant to update
+        # The poll timestamp changes every poll, so a poll always records
+        # a new state even when the values are unchanged
         return {
-            "last_update": datetime.now().isoformat(),
-            "data_timestamp": self.coordinator.data.get("_last_poll", ""),
+            **self.entity_description.attributes_fn(data),
+            "data_timestamp": data.get("_last_poll", ""),
         }
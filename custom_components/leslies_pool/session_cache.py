@@ -0,0 +1,79 @@
+"""Short-lived cache of authenticated API sessions keyed by account and pool.
+
+Clients of sibling pools share one requests session, so discarded clients are
+released with ``LesliesPoolApi.close``, which closes the session only once no
+other client uses it.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+from homeassistant.core import callback
+
+from .api import LesliesPoolApi
+from .const import DATA_SESSION_CACHE
+from .const import SESSION_HANDOFF_TTL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _account_key(username: str, pool_profile_id: str | None) -> tuple[str, str | None]:
+    """Return the cache key for one pool of an account."""
+    return username.strip().casefold(), pool_profile_id
+
+
+def _purge_expired(cache: dict[tuple, tuple[LesliesPoolApi, float]]) -> None:
+    """Close and drop parked sessions that outlived the hand-off TTL."""
+    now = time.monotonic()
+    for key, (api, parked_at) in list(cache.items()):
+        if now - parked_at >= SESSION_HANDOFF_TTL:
+            _LOGGER.debug("Discarding unclaimed session for %s", api.username)
+            del cache[key]
+            api.close()
+
+
+@callback
+def async_park_session(hass: HomeAssistant, api: LesliesPoolApi) -> None:
+    """Park an authenticated API instance so the next setup can reuse it.
+
+    Clients for several pools of one account may share a session; each is
+    parked under its own pool so every entry set up from a discovery pass
+    finds one.
+    """
+    cache: dict[tuple, tuple[LesliesPoolApi, float]] = hass.data.setdefault(
+        DATA_SESSION_CACHE, {}
+    )
+    _purge_expired(cache)
+
+    key = _account_key(api.username, api.pool_profile_id)
+    previous = cache.get(key)
+    if previous is not None and previous[0] is not api:
+        previous[0].close()
+
+    cache[key] = (api, time.monotonic())
+
+
+@callback
+def async_claim_session(
+    hass: HomeAssistant, username: str, password: str, pool_profile_id: str
+) -> LesliesPoolApi | None:
+    """Take a parked, still-live session for the account's pool, if there is one."""
+    cache: dict[tuple, tuple[LesliesPoolApi, float]] = hass.data.get(
+        DATA_SESSION_CACHE, {}
+    )
+    _purge_expired(cache)
+
+    entry = cache.pop(_account_key(username, pool_profile_id), None)
+    if entry is None:
+        return None
+
+    api = entry[0]
+    if api.password != password:
+        api.close()
+        return None
+
+    _LOGGER.debug("Reusing authenticated session for %s", username)
+    return api
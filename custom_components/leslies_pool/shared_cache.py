@@ -0,0 +1,159 @@
+"""Result cache shared by every Home Assistant instance polling an account.
+
+Instances check the shared cache before going upstream. When the cached water
+tests are older than the TTL, one instance is elected to refresh them by
+taking the key's refresh lock; the others wait for that refresh and read its
+result instead of fetching themselves. Upstream traffic then scales with the
+number of accounts, not the number of instances.
+
+``SharedCache`` is the backend interface. ``DirectoryCache`` stores entries as
+JSON files in a directory on a shared volume and elects the refresher with an
+advisory file lock.
+"""
+
+from __future__ import annotations
+
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import ExitStack
+from contextlib import contextmanager
+from contextlib import suppress
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+# How often a waiting instance checks whether the refresh lock was released
+LOCK_POLL_INTERVAL = 0.1
+
+
+def cache_key(username: str, pool_profile_id: str | None) -> str:
+    """Return the shared cache key of a pool without exposing the account."""
+    return hashlib.sha256(
+        f"{username.casefold()}:{pool_profile_id}".encode()
+    ).hexdigest()
+
+
+class SharedCache(ABC):
+    """Backend for water test results shared between instances."""
+
+    @abstractmethod
+    def get(self, key: str, ttl: float) -> dict | None:
+        """Return the cached value if it is younger than ``ttl`` seconds."""
+
+    @abstractmethod
+    def put(self, key: str, value: dict) -> None:
+        """Store a freshly fetched value."""
+
+    @abstractmethod
+    def refresh_lock(self, key: str, timeout: float):
+        """Return a context manager electing one refresher for a key.
+
+        It yields True once this instance holds the key's refresh lock, or
+        False if the lock was not released within ``timeout`` seconds.
+        """
+
+    def get_or_refresh(
+        self, key: str, ttl: float, fetch: Callable[[], dict | None], wait: float
+    ) -> dict | None:
+        """Return the cached value, refreshing it if this instance is elected.
+
+        ``fetch`` returns None for results that must not be shared. If the
+        cache cannot be reached, the value is fetched without it.
+        """
+        value = self.get(key, ttl)
+        if value is not None:
+            _LOGGER.debug("Serving water tests from the shared cache")
+            return value
+
+        with ExitStack() as stack:
+            try:
+                elected = stack.enter_context(self.refresh_lock(key, wait))
+            except OSError as err:
+                _LOGGER.warning("Shared cache %s is unavailable: %s", self, err)
+                elected = False
+
+            # The previous lock holder may have refreshed while we waited
+            if elected and (value := self.get(key, ttl)) is not None:
+                _LOGGER.debug("Serving water tests refreshed by another instance")
+                return value
+
+            value = fetch()
+            if value is not None:
+                try:
+                    self.put(key, value)
+                except OSError as err:
+                    _LOGGER.warning("Cannot write to shared cache %s: %s", self, err)
+            return value
+
+
+class DirectoryCache(SharedCache):
+    """Shared cache kept as JSON files in a directory on a shared volume.
+
+    Entries are replaced atomically, so readers never see a partial file, and
+    the refresh lock is an ``flock`` that is released if its holder dies.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the cache; the directory is created on first use."""
+        self.path = path
+
+    def __str__(self) -> str:
+        """Return the cache directory."""
+        return self.path
+
+    def _file(self, key: str, suffix: str) -> str:
+        """Return the path of one of a key's files."""
+        return os.path.join(self.path, f"{key}{suffix}")
+
+    def get(self, key: str, ttl: float) -> dict | None:
+        """Return the cached value if it is younger than ``ttl`` seconds."""
+        try:
+            with open(self._file(key, ".json"), encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        # Wall-clock time, since entries are compared across hosts
+        if time.time() - entry.get("fetched_at", 0) >= ttl:
+            return None
+        return entry.get("value")
+
+    def put(self, key: str, value: dict) -> None:
+        """Atomically replace a key's entry."""
+        os.makedirs(self.path, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.path, prefix=f".{key}.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"fetched_at": time.time(), "value": value}, file)
+            os.replace(temp_path, self._file(key, ".json"))
+        except BaseException:
+            with suppress(OSError):
+                os.unlink(temp_path)
+            raise
+
+    @contextmanager
+    def refresh_lock(self, key: str, timeout: float) -> Iterator[bool]:
+        """Hold the key's lock file, waiting at most ``timeout`` seconds."""
+        os.makedirs(self.path, exist_ok=True)
+        with open(self._file(key, ".lock"), "a", encoding="utf-8") as file:
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(LOCK_POLL_INTERVAL)
+            try:
+                yield True
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
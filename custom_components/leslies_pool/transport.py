@@ -0,0 +1,253 @@
+"""Tuned HTTP transport for the Leslie's Pool client.
+
+Every request of a session goes through one ``TransportAdapter``: responses
+are requested compressed, connections are pooled and kept alive so login,
+landing and water test fetches reuse the same TLS connection, and host names
+are resolved through a small process-wide DNS cache. The adapter counts bytes
+on the wire, decoded bytes, new connections and TLS handshakes so the effect
+of each of these is visible per poll.
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from requests.models import PreparedRequest
+from requests.models import Response
+from urllib3.connection import HTTPConnection
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.exceptions import NewConnectionError
+from urllib3.util import make_headers
+from urllib3.util.connection import allowed_gai_family
+
+from .const import DNS_CACHE_TTL
+from .const import POOL_CONNECTIONS
+from .const import POOL_MAXSIZE
+
+USER_AGENT = "Mozilla/5.0"
+# Only encodings urllib3 can decode here are advertised: gzip and deflate
+# always, brotli when the brotli package is installed
+ACCEPT_ENCODING = make_headers(accept_encoding=True)["accept-encoding"]
+
+# TCP keep-alive probes stop idle pooled connections from being silently
+# dropped by middleboxes between polls
+SOCKET_OPTIONS = [
+    *HTTPConnection.default_socket_options,
+    (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+]
+
+TRANSPORT_COUNTERS = (
+    "requests",
+    "bytes_received",
+    "bytes_decoded",
+    "connections",
+    "handshakes",
+    "dns_lookups",
+)
+
+
+class TransportStats:
+    """Thread-safe counters for everything a transport sends and receives."""
+
+    def __init__(self) -> None:
+        """Initialize all counters at zero."""
+        self._counts = dict.fromkeys(TRANSPORT_COUNTERS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **counts: int) -> None:
+        """Add to one or more counters."""
+        with self._lock:
+            for name, value in counts.items():
+                self._counts[name] += value
+
+    def snapshot(self) -> dict[str, int]:
+        """Return a copy of the current counters."""
+        with self._lock:
+            return dict(self._counts)
+
+    def since(self, snapshot: dict[str, int]) -> dict[str, int]:
+        """Return how much each counter grew since an earlier snapshot."""
+        current = self.snapshot()
+        return {name: current[name] - snapshot[name] for name in TRANSPORT_COUNTERS}
+
+
+class DNSCache:
+    """Thread-safe cache of resolved host addresses."""
+
+    def __init__(self, ttl: float) -> None:
+        """Initialize an empty cache keeping addresses for ``ttl`` seconds."""
+        self.ttl = ttl
+        self._addresses: dict[tuple[str, int], tuple[list[str], float]] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, host: str, port: int, stats: TransportStats) -> list[str]:
+        """Return the cached addresses of the host, resolving it when stale.
+
+        Addresses keep the resolver's order and are limited to the families
+        urllib3 would connect to. Lookup failures return the host unchanged,
+        so the connection resolves it again and raises the usual error.
+        """
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._addresses.get(key)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        try:
+            answers = socket.getaddrinfo(
+                host, port, family=allowed_gai_family(), type=socket.SOCK_STREAM
+            )
+        except OSError:
+            return [host]
+        stats.add(dns_lookups=1)
+        addresses = list(dict.fromkeys(answer[4][0] for answer in answers))
+        if not addresses:
+            return [host]
+        with self._lock:
+            self._addresses[key] = (addresses, now + self.ttl)
+        return addresses
+
+    def forget(self, host: str, port: int) -> None:
+        """Drop the cached addresses of a host, e.g. after all of them failed."""
+        with self._lock:
+            self._addresses.pop((host, port), None)
+
+    def clear(self) -> None:
+        """Forget every cached address."""
+        with self._lock:
+            self._addresses.clear()
+
+
+DNS_CACHE = DNSCache(DNS_CACHE_TTL)
+
+
+class _ResolvingConnection:
+    """Connection mixin resolving the host through the DNS cache.
+
+    Each cached address is tried in turn until one accepts the connection.
+    Only the address connected to changes; the host name is still used for
+    SNI, certificate checks and the Host header.
+    """
+
+    dns_cache: DNSCache
+    stats: TransportStats
+
+    def _new_conn(self) -> socket.socket:
+        host = self._dns_host
+        addresses = self.dns_cache.resolve(host, self.port, self.stats)
+        try:
+            for index, address in enumerate(addresses, 1):
+                self._dns_host = address
+                try:
+                    sock = super()._new_conn()
+                    break
+                except (ConnectTimeoutError, NewConnectionError):
+                    if index == len(addresses):
+                        # Re-resolve next time in case the host has moved
+                        self.dns_cache.forget(host, self.port)
+                        raise
+        finally:
+            self._dns_host = host
+        self.stats.add(connections=1)
+        return sock
+
+
+class _HTTPConnection(_ResolvingConnection, HTTPConnection):
+    """Plain HTTP connection using the DNS cache."""
+
+
+class _HTTPSConnection(_ResolvingConnection, HTTPSConnection):
+    """HTTPS connection using the DNS cache and counting TLS handshakes."""
+
+    def connect(self) -> None:
+        super().connect()
+        self.stats.add(handshakes=1)
+
+
+def _wire_size(response: Response, content: bytes) -> int:
+    """Return the size of a response body as it was sent, before decoding.
+
+    urllib3 1.x does not count chunked bodies, so those report their decoded
+    size instead.
+    """
+    return response.raw.tell() or len(content)
+
+
+def _bind(cls: type, **attrs) -> type:
+    """Return a subclass of ``cls`` with the given class attributes."""
+    return type(cls.__name__, (cls,), attrs)
+
+
+class TransportAdapter(HTTPAdapter):
+    """Connection-pooling adapter with a DNS cache and transfer counters."""
+
+    def __init__(
+        self,
+        stats: TransportStats | None = None,
+        dns_cache: DNSCache = DNS_CACHE,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        **kwargs,
+    ) -> None:
+        """Initialize the adapter; pool sizes follow ``HTTPAdapter``."""
+        self.stats = stats or TransportStats()
+        bound = {"dns_cache": dns_cache, "stats": self.stats}
+        # Connection pools are created lazily by the pool manager, so the
+        # classes carrying the cache and counters are set up front
+        self._pool_classes = {
+            "http": _bind(
+                HTTPConnectionPool, ConnectionCls=_bind(_HTTPConnection, **bound)
+            ),
+            "https": _bind(
+                HTTPSConnectionPool, ConnectionCls=_bind(_HTTPSConnection, **bound)
+            ),
+        }
+        super().__init__(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs
+        )
+
+    def init_poolmanager(self, *args, **pool_kwargs) -> None:
+        """Create the pool manager with keep-alive sockets and tuned pools."""
+        pool_kwargs.setdefault("socket_options", SOCKET_OPTIONS)
+        super().init_poolmanager(*args, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+    def send(self, request: PreparedRequest, *args, **kwargs) -> Response:
+        """Send the request and count what came back over the wire."""
+        response = super().send(request, *args, **kwargs)
+        if kwargs.get("stream"):
+            self.stats.add(requests=1)
+            return response
+
+        # Reading the body here returns the connection to the pool and lets
+        # the raw (possibly compressed) size be measured
+        content = response.content
+        self.stats.add(
+            requests=1,
+            bytes_received=_wire_size(response, content),
+            bytes_decoded=len(content),
+        )
+        return response
+
+
+def mount_transport(session, adapter: HTTPAdapter) -> None:
+    """Route all of a session's requests through an adapter."""
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def configure_session(session, stats: TransportStats) -> TransportAdapter:
+    """Set compression and client headers and mount a tuned adapter."""
+    session.headers.update(
+        {"Accept-Encoding": ACCEPT_ENCODING, "User-Agent": USER_AGENT}
+    )
+    adapter = TransportAdapter(stats)
+    mount_transport(session, adapter)
+    return adapter
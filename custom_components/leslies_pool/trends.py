@@ -0,0 +1,175 @@
+"""Incremental rolling statistics for Leslie's Pool water tests."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+import math
+
+TREND_CHEMICALS = ("free_chlorine", "ph", "salt")
+TREND_WINDOWS = (7, 30)  # Days
+
+# Upper bound on tests kept per window; far more than anyone tests in 30 days
+WINDOW_CAPACITY = 256
+# Deviation bands are drawn this many standard deviations from the mean
+BAND_WIDTH = 2.0
+
+_EPOCH = datetime(2000, 1, 1)
+
+
+def _days(timestamp: datetime) -> float:
+    """Return a timestamp as fractional days since a fixed epoch."""
+    return (timestamp.replace(tzinfo=None) - _EPOCH).total_seconds() / 86400
+
+
+class RollingWindow:
+    """Time-windowed mean, variance and slope with O(1) updates.
+
+    Samples live in a bounded ring buffer. Adding or evicting a sample
+    updates running sums and Welford's mean and variance in constant time.
+    """
+
+    def __init__(self, days: int, capacity: int = WINDOW_CAPACITY) -> None:
+        """Initialize an empty window spanning the given number of days."""
+        self.days = days
+        self._samples: deque[tuple[float, float]] = deque()
+        self._capacity = capacity
+        self._mean = 0.0
+        self._m2 = 0.0
+        # Running sums for the least-squares slope over (day, value) pairs
+        self._sum_t = 0.0
+        self._sum_tt = 0.0
+        self._sum_tv = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of samples in the window."""
+        return len(self._samples)
+
+    def add(self, timestamp: datetime, value: float) -> None:
+        """Add a sample and evict whatever falls out of the window."""
+        if len(self._samples) >= self._capacity:
+            self._remove_oldest()
+
+        t = _days(timestamp)
+        self._samples.append((t, value))
+        n = len(self._samples)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+        self._sum_t += t
+        self._sum_tt += t * t
+        self._sum_tv += t * value
+
+        self.evict(timestamp)
+
+    def evict(self, now: datetime) -> None:
+        """Drop samples older than the window relative to ``now``."""
+        cutoff = _days(now) - self.days
+        while self._samples and self._samples[0][0] <= cutoff:
+            self._remove_oldest()
+
+    def _remove_oldest(self) -> None:
+        """Remove the oldest sample, reversing its Welford update."""
+        t, value = self._samples.popleft()
+        n = len(self._samples)
+        if n == 0:
+            self._mean = self._m2 = 0.0
+            self._sum_t = self._sum_tt = self._sum_tv = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / n
+        self._m2 = max(self._m2 - delta * (value - self._mean), 0.0)
+        self._sum_t -= t
+        self._sum_tt -= t * t
+        self._sum_tv -= t * value
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        return self._mean if self._samples else None
+
+    @property
+    def std_dev(self) -> float | None:
+        """Return the sample standard deviation of the window."""
+        n = len(self._samples)
+        if n < 2:
+            return None
+        return math.sqrt(self._m2 / (n - 1))
+
+    @property
+    def rate_of_change(self) -> float | None:
+        """Return the least-squares slope of the window in units per day."""
+        n = len(self._samples)
+        if n < 2:
+            return None
+        denominator = n * self._sum_tt - self._sum_t * self._sum_t
+        # Tests on the same day carry no slope information
+        if abs(denominator) < 1e-9:
+            return None
+        sum_v = self._mean * n
+        return (n * self._sum_tv - self._sum_t * sum_v) / denominator
+
+    def as_dict(self) -> dict:
+        """Return the window's statistics, rounded for display."""
+        mean = self.mean
+        std_dev = self.std_dev
+        rate = self.rate_of_change
+
+        def _round(value: float | None) -> float | None:
+            return None if value is None else round(value, 3)
+
+        return {
+            "mean": _round(mean),
+            "std_dev": _round(std_dev),
+            "lower_band": _round(
+                None if std_dev is None else mean - BAND_WIDTH * std_dev
+            ),
+            "upper_band": _round(
+                None if std_dev is None else mean + BAND_WIDTH * std_dev
+            ),
+            "rate_of_change": _round(rate),
+            "samples": len(self),
+        }
+
+
+class ChemicalTrends:
+    """Rolling windows per chemical, fed with new water test rows."""
+
+    def __init__(self) -> None:
+        """Initialize the windows."""
+        self.windows: dict[str, dict[int, RollingWindow]] = {
+            chemical: {days: RollingWindow(days) for days in TREND_WINDOWS}
+            for chemical in TREND_CHEMICALS
+        }
+
+    def add_rows(self, rows: list[dict], parse_date) -> None:
+        """Add water test rows, given newest first, in chronological order."""
+        for row in reversed(rows):
+            timestamp = parse_date(row.get("test_date"))
+            if timestamp is None:
+                continue
+            for chemical, windows in self.windows.items():
+                try:
+                    value = float(row.get(chemical) or "")
+                except ValueError:
+                    continue
+                for window in windows.values():
+                    window.add(timestamp, value)
+
+    def evict(self, now: datetime) -> None:
+        """Drop samples that aged out of every window."""
+        for windows in self.windows.values():
+            for window in windows.values():
+                window.evict(now)
+
+    def snapshot(self) -> dict[str, dict[int, dict]]:
+        """Return the current statistics for every chemical and window."""
+        return {
+            chemical: {days: window.as_dict() for days, window in windows.items()}
+            for chemical, windows in self.windows.items()
+        }
+
+
+def trend_key(chemical: str, days: int) -> str:
+    """Return the sensor key for a chemical's rolling average."""
+    return f"{chemical}_{days}d_average"
@@ -1,10 +1,14 @@
 """Common fixtures for the Leslie's Pool Water Tests tests."""
 
+from collections.abc import Callable
 from collections.abc import Generator
 from unittest.mock import AsyncMock
 from unittest.mock import patch
 
 import pytest
+from homeassistant.components.leslies_pool.ratelimit import TokenBucket
+
+from .fake_server import FakeLesliesServer
 
 
 @pytest.fixture
@@ -14,3 +18,42 @@ def mock_setup_entry() -> Generator[AsyncMock, None, None]:
         "homeassistant.components.leslies_pool.async_setup_entry", return_value=True
     ) as mock_setup_entry:
         yield mock_setup_entry
+
+
+@pytest.fixture(autouse=True)
+def unthrottled_requests() -> Generator[None, None, None]:
+    """Give each test its own generous request budgets."""
+    with patch(
+        "homeassistant.components.leslies_pool.api.LOGIN_BUCKET", TokenBucket(100, 100)
+    ), patch(
+        "homeassistant.components.leslies_pool.api.FETCH_BUCKET", TokenBucket(100, 100)
+    ):
+        yield
+
+
+@pytest.fixture
+def fake_server_factory(
+    socket_enabled,
+) -> Generator[Callable[..., FakeLesliesServer], None, None]:
+    """Start fake Leslie's servers that are stopped after the test.
+
+    ``expire_every`` drops the session every that many landings, forcing a
+    re-auth.
+    """
+    servers: list[FakeLesliesServer] = []
+
+    def start(expire_every: int = 0) -> FakeLesliesServer:
+        server = FakeLesliesServer(expire_every=expire_every)
+        server.start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def fake_server(fake_server_factory) -> FakeLesliesServer:
+    """Run a fake Leslie's server."""
+    return fake_server_factory()
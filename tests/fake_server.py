@@ -0,0 +1,190 @@
+"""Local fake of the Leslie's Pool endpoints used by the API client."""
+
+from __future__ import annotations
+
+import gzip
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import itertools
+import json
+import threading
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+WATER_TEST_HTML = """
+<table class="table table-striped table-bordered table-hover table-sm">
+    <tbody>
+        <tr>
+            <th class="text-center align-middle p-1">
+                <span class="badge badge-secondary p-2">05/21/2025</span>
+            </th>
+            <td>Test</td>
+            <td>1.0</td>
+            <td>2.0</td>
+            <td>7.0</td>
+            <td>80</td>
+            <td>200</td>
+            <td>30</td>
+            <td>0.1</td>
+            <td>0.2</td>
+            <td>300</td>
+            <td>4000</td>
+        </tr>
+    </tbody>
+</table>
+"""
+
+LOGIN_PAGE_HTML = """
+<html><body><form>
+<input type="hidden" name="csrf_token" value="csrf-{token}">
+</form></body></html>
+"""
+
+
+class FakeLesliesServer:
+    """Threaded HTTP server that mimics the Leslie's login and water test flow.
+
+    Every ``expire_every`` landing requests the current session is dropped, so
+    the next poll is redirected to ``Account-Show`` and has to re-authenticate.
+    """
+
+    def __init__(self, expire_every: int = 0) -> None:
+        """Initialize the server on a free localhost port."""
+        self.expire_every = expire_every
+        self.logins = 0
+        self.landings = 0
+        self.email = ""  # Echoed back the way the site greets a signed-in user
+        self._sessions: set[str] = set()
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Return the base URL of the running server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, api) -> None:
+        """Point an API client's endpoints at this server."""
+        api.LOGIN_PAGE_URL = f"{self.base_url}/Account-Show"
+        api.LOGIN_URL = f"{self.base_url}/Account-Login"
+        api.LANDING_URL = f"{self.base_url}/WaterTest-Landing"
+        api.WATER_TEST_URL = f"{self.base_url}/WaterTest-GetWaterTest"
+
+    def start(self) -> None:
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever, name="fake-leslies", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving and release the listening socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _new_session(self) -> str:
+        """Create and register a new session id."""
+        with self._lock:
+            session_id = f"sess{next(self._ids)}"
+            self._sessions.add(session_id)
+        return session_id
+
+    def _handler_class(self):
+        """Build a request handler bound to this server's state."""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):  # noqa: A002
+                """Silence per-request logging."""
+
+            def _session_id(self) -> str | None:
+                for part in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "dwsid":
+                        return value
+                return None
+
+            def _send(self, status, body="", content_type="text/html", headers=()):
+                payload = body.encode()
+                if payload and "gzip" in self.headers.get("Accept-Encoding", ""):
+                    payload = gzip.compress(payload)
+                    headers = [*headers, ("Content-Encoding", "gzip")]
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _read_body(self) -> dict[str, str]:
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode() if length else ""
+                return dict(parse_qsl(body))
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path == "/Account-Show":
+                    session_id = server._new_session()
+                    self._send(
+                        200,
+                        LOGIN_PAGE_HTML.format(token=session_id),
+                        headers=[("Set-Cookie", f"dwsid={session_id}; Path=/")],
+                    )
+                elif path == "/WaterTest-Landing":
+                    with server._lock:
+                        server.landings += 1
+                        if server.expire_every and (
+                            server.landings % server.expire_every == 0
+                        ):
+                            server._sessions.clear()
+                        valid = self._session_id() in server._sessions
+                    if valid:
+                        self._send(200, f"<html>Signed in as {server.email}</html>")
+                    else:
+                        location = "/Account-Show?" + urlencode(
+                            {"rurl": 1, "email": server.email}
+                        )
+                        self._send(302, headers=[("Location", location)])
+                else:
+                    self._send(404)
+
+            def do_POST(self):
+                form = self._read_body()
+                path = urlsplit(self.path).path
+                if path == "/Account-Login":
+                    with server._lock:
+                        server.logins += 1
+                        server.email = form.get("loginEmail", "")
+                    self._send(
+                        200,
+                        json.dumps({"success": True}),
+                        content_type="application/json",
+                        headers=[
+                            ("Set-Cookie", "dwsecuretoken_x=token; Path=/"),
+                            ("Set-Cookie", "dwcustomer_x=customer; Path=/"),
+                        ],
+                    )
+                elif path == "/WaterTest-GetWaterTest":
+                    if self._session_id() not in server._sessions:
+                        self._send(200, "<html>login</html>")
+                        return
+                    self._send(
+                        200,
+                        json.dumps({"response": WATER_TEST_HTML}),
+                        content_type="application/json",
+                    )
+                else:
+                    self._send(404)
+
+        return Handler
@@ -0,0 +1,133 @@
+"""Test the Leslie's Pool Water Tests water balance analytics."""
+
+import numpy as np
+import pytest
+from homeassistant.components.leslies_pool.analytics import WaterTestHistory
+from homeassistant.components.leslies_pool.analytics import fc_cya_ratio
+from homeassistant.components.leslies_pool.analytics import saturation_index
+from homeassistant.components.leslies_pool.const import ATTR_CONFIG_ENTRY_ID
+from homeassistant.components.leslies_pool.const import DOMAIN
+from homeassistant.components.leslies_pool.const import SERVICE_GET_WATER_BALANCE
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.setup import async_setup_component
+
+
+def _row(test_date, **values):
+    """Return a parsed water test row with balanced defaults."""
+    row = {
+        "test_date": test_date,
+        "free_chlorine": "4.0",
+        "ph": "7.5",
+        "alkalinity": "90",
+        "calcium": "300",
+        "cyanuric_acid": "40",
+        "salt": "3200",
+    }
+    row.update(values)
+    return row
+
+
+def test_saturation_index_reference_value():
+    """Test the LSI matches a hand-computed Carrier value."""
+    lsi = saturation_index(
+        np.array([7.5]),
+        np.array([100.0]),
+        np.array([300.0]),
+        np.array([0.0]),
+        np.array([0.0]),
+        temperature=27.0,
+    )
+
+    # pHs = (9.3 + 0.1477 + 2.0480) - (2.0771 + 2.0) = 7.4186
+    assert lsi[0] == pytest.approx(0.081, abs=0.005)
+
+
+def test_fc_cya_ratio_handles_missing_cya():
+    """Test the ratio is NaN where no stabilizer is present."""
+    ratio = fc_cya_ratio(np.array([3.0, 3.0]), np.array([40.0, 0.0]))
+
+    assert ratio[0] == pytest.approx(7.5)
+    assert np.isnan(ratio[1])
+
+
+def test_history_is_chronological_and_flags_latest():
+    """Test rows given newest first are stored oldest first."""
+    history = WaterTestHistory()
+    history.extend(
+        [_row("05/02/2025", ph="8.2", free_chlorine="1.0"), _row("05/01/2025")]
+    )
+
+    assert [str(day) for day in history.dates] == ["2025-05-01", "2025-05-02"]
+    latest = history.latest()
+    assert "ph" in latest["out_of_range_readings"]
+    assert "fc_cya_ratio" in latest["out_of_range_readings"]
+    assert latest["out_of_range"] == len(latest["out_of_range_readings"])
+    assert latest["fc_cya_ratio"] == 2.5
+
+
+def test_history_tolerates_blank_readings():
+    """Test blank cells become NaN and are never flagged."""
+    history = WaterTestHistory()
+    history.extend([_row("", ph="", cyanuric_acid="N/A")])
+
+    series = history.as_series()
+    assert series["dates"] == [None]
+    assert series["saturation_index"] == [None]
+    assert series["fc_cya_ratio"] == [None]
+    assert series["out_of_range"]["ph"] == [False]
+
+
+def test_history_grows_and_caches_analysis():
+    """Test appends past capacity keep earlier rows and reset the cache."""
+    history = WaterTestHistory()
+    history.extend([_row("01/01/2020", salt=str(2000 + day)) for day in range(100)])
+    first = history.analyze()
+    assert history.analyze() is first
+
+    history.extend([_row("01/01/2021")])
+    assert history.analyze() is not first
+    assert len(history) == 101
+    # Rows were given newest first, so the last of the batch is the oldest
+    assert history.column("salt")[0] == 2099
+    assert history.column("salt")[-1] == 3200
+
+
+def test_multi_year_history_is_analyzed():
+    """Test analytics cover years of daily tests in one pass."""
+    history = WaterTestHistory()
+    history.extend([_row("01/01/2020") for _ in range(20000)])
+
+    analysis = history.analyze()
+
+    assert len(analysis["saturation_index"]) == 20000
+    assert not np.isnan(analysis["saturation_index"]).any()
+
+
+async def test_get_water_balance_service(hass):
+    """Test the service returns the full series for a loaded entry."""
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    class _Coordinator:
+        history = WaterTestHistory()
+
+    _Coordinator.history.extend([_row("05/02/2025"), _row("05/01/2025")])
+    hass.data[DOMAIN] = {"entry": _Coordinator()}
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_GET_WATER_BALANCE,
+        {ATTR_CONFIG_ENTRY_ID: "entry"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["dates"] == ["2025-05-01", "2025-05-02"]
+    assert len(response["saturation_index"]) == 2
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_GET_WATER_BALANCE,
+            {ATTR_CONFIG_ENTRY_ID: "missing"},
+            blocking=True,
+            return_response=True,
+        )
@@ -1,12 +1,24 @@
 """Test the API for Leslie's Pool Water Tests."""
 
+import json
 import unittest
 from unittest.mock import MagicMock
+from unittest.mock import PropertyMock
 from unittest.mock import patch
 
+from homeassistant.components.leslies_pool.api import LOG_PREVIEW_CHARS
 from homeassistant.components.leslies_pool.api import LesliesPoolApi
 
 
+def _login_page(token="test_csrf_token"):
+    """Return a mocked, streamed login page response."""
+    response = MagicMock(status_code=200, encoding="utf-8")
+    response.iter_content.return_value = iter(
+        [f'<form><input name="csrf_token" value="{token}"></form>'.encode()]
+    )
+    return response
+
+
 class TestLesliesPoolApi(unittest.TestCase):
     """Test the Leslie's Pool API."""
 
@@ -18,40 +30,85 @@ class TestLesliesPoolApi(unittest.TestCase):
     @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
     def test_authenticate_success(self, mock_post, mock_get):
         """Test successful authentication."""
-        login_page_html = '<input name="csrf_token" value="test_csrf_token">'
-        mock_get.return_value = MagicMock(status_code=200, text=login_page_html)
+        mock_get.return_value = _login_page()
         mock_post.return_value = MagicMock(status_code=200)
 
         result = self.api.authenticate()
 
         assert result
-        mock_get.assert_called_once_with(self.api.LOGIN_PAGE_URL)
+        mock_get.assert_called_once_with(
+            self.api.LOGIN_PAGE_URL, timeout=self.api.timeout, stream=True
+        )
         mock_post.assert_called_once_with(
             self.api.LOGIN_URL,
             headers={
                 "accept": "application/json, text/javascript, */*; q=0.01",
                 "content-type": "application/x-www-form-urlencoded; charset=UTF-8",
-                "user-agent": "Mozilla/5.0",
             },
             data={
                 "loginEmail": "testuser",
                 "loginPassword": "testpassword",
                 "csrf_token": "test_csrf_token",
             },
+            timeout=self.api.timeout,
         )
 
     @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
     @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
     def test_authenticate_fail(self, mock_post, mock_get):
         """Test failed authentication."""
-        login_page_html = '<input name="csrf_token" value="test_csrf_token">'
-        mock_get.return_value = MagicMock(status_code=200, text=login_page_html)
+        mock_get.return_value = _login_page()
         mock_post.return_value = MagicMock(status_code=401)
 
         result = self.api.authenticate()
 
         assert not result
 
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
+    def test_authenticate_reuses_csrf_token(self, mock_post, mock_get):
+        """Test re-authentication in a live session skips the login page."""
+        mock_get.return_value = _login_page()
+        mock_post.return_value = MagicMock(status_code=200)
+
+        assert self.api.authenticate()
+        assert self.api.authenticate()
+
+        assert mock_get.call_count == 1
+        assert mock_post.call_count == 2
+        assert mock_post.call_args.kwargs["data"]["csrf_token"] == "test_csrf_token"
+
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
+    def test_authenticate_refetches_rejected_token(self, mock_post, mock_get):
+        """Test a rejected reused token is replaced by a fresh one."""
+        mock_get.side_effect = [_login_page("first"), _login_page("second")]
+        mock_post.side_effect = [
+            MagicMock(status_code=200),
+            MagicMock(status_code=200, url="https://site/CSRF-Fail"),
+            MagicMock(status_code=200),
+        ]
+
+        assert self.api.authenticate()
+        assert self.api.authenticate()
+
+        assert mock_get.call_count == 2
+        tokens = [call.kwargs["data"]["csrf_token"] for call in mock_post.mock_calls]
+        assert tokens == ["first", "first", "second"]
+
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
+    def test_expired_session_drops_csrf_token(self, mock_post, mock_get):
+        """Test tokens are not reused once their session has expired."""
+        mock_get.side_effect = [_login_page(), _login_page()]
+        mock_post.return_value = MagicMock(status_code=200)
+
+        assert self.api.authenticate()
+        self.api._record_session_expired()
+        assert self.api.authenticate()
+
+        assert mock_get.call_count == 2
+
     @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
     @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
     def test_fetch_water_test_data(self, mock_post, mock_get):
@@ -95,3 +152,139 @@ class TestLesliesPoolApi(unittest.TestCase):
         assert data["copper"] == "0.2"
         assert data["phosphates"] == "300"
         assert data["salt"] == "4000"
+
+    @patch("homeassistant.components.leslies_pool.api.time.monotonic")
+    def test_session_lifetime_learned_from_redirect(self, mock_monotonic):
+        """Test the session lifetime is learned from a login redirect."""
+        mock_monotonic.return_value = 1000.0
+        self.api._last_activity = 0.0
+
+        self.api._record_session_expired()
+
+        assert self.api.session_lifetime == 1000.0
+        assert self.api.session_expires_in() is None
+
+        self.api._last_activity = 1000.0
+        mock_monotonic.return_value = 1900.0
+        assert self.api.session_expires_in() == 100.0
+
+    @patch("homeassistant.components.leslies_pool.api.time.monotonic")
+    def test_session_lifetime_ignores_polling_gaps(self, mock_monotonic):
+        """Test an expiry between polls does not make every poll log in."""
+        logins = []
+
+        def authenticate():
+            logins.append(mock_monotonic.return_value)
+            self.api._last_activity = mock_monotonic.return_value
+            return True
+
+        self.api.poll_interval = 300
+        with patch.object(self.api, "authenticate", side_effect=authenticate):
+            for cycle in range(6):
+                mock_monotonic.return_value = 300.0 * (cycle + 1)
+                self.api.refresh_session_if_expiring(120)
+                if cycle == 2:
+                    # The site ended the session between two polls
+                    self.api._record_session_expired()
+                    authenticate()
+                self.api._record_session_alive()
+
+        assert self.api.session_lifetime is None
+        assert len(logins) == 1
+
+    @patch("homeassistant.components.leslies_pool.api.time.monotonic")
+    def test_session_lifetime_recovers(self, mock_monotonic):
+        """Test the estimate is averaged and grows after longer sessions."""
+        self.api.poll_interval = 300
+        self.api.session_lifetime = 1000.0
+        self.api._last_activity = 0.0
+        mock_monotonic.return_value = 500.0
+
+        self.api._record_session_expired()
+        assert self.api.session_lifetime == 750.0
+
+        self.api._last_activity = 500.0
+        mock_monotonic.return_value = 1400.0
+        self.api._record_session_alive()
+        assert self.api.session_lifetime == 900.0
+        assert self.api._last_activity == 1400.0
+
+    @patch.object(LesliesPoolApi, "authenticate", return_value=True)
+    def test_refresh_session_if_expiring(self, mock_authenticate):
+        """Test the session is only refreshed when close to expiry."""
+        with patch.object(self.api, "session_expires_in", return_value=None):
+            assert not self.api.refresh_session_if_expiring(120)
+        with patch.object(self.api, "session_expires_in", return_value=600):
+            assert not self.api.refresh_session_if_expiring(120)
+        assert mock_authenticate.call_count == 0
+
+        with patch.object(self.api, "session_expires_in", return_value=60):
+            assert self.api.refresh_session_if_expiring(120)
+        assert mock_authenticate.call_count == 1
+
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
+    def test_discover_pools(self, mock_get):
+        """Test pools are discovered from one profile page fetch."""
+        mock_get.return_value = MagicMock(
+            url=LesliesPoolApi.POOL_PROFILE_URL,
+            text='<a href="?poolProfileId=111&poolName=Pool">Pool</a>'
+            '<a href="?poolProfileId=222&poolName=Spa">Spa</a>',
+        )
+
+        pools = self.api.discover_pools()
+
+        assert [pool["pool_profile_id"] for pool in pools] == ["111", "222"]
+        mock_get.assert_called_once_with(LesliesPoolApi.POOL_PROFILE_URL, timeout=30)
+
+    def test_for_pool_shares_session(self):
+        """Test clients for other pools share the session and pool lock."""
+        sibling = self.api.for_pool("222", "Spa")
+
+        assert sibling.session is self.api.session
+        assert sibling._pool_lock is self.api._pool_lock
+        assert (sibling.pool_profile_id, sibling.pool_name) == ("222", "Spa")
+
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
+    def test_fetch_skips_body_previews_without_trace(self, mock_post, mock_get):
+        """Test the response body is not decoded for logging by default."""
+        mock_get.return_value = MagicMock(status_code=200)
+        response = MagicMock(status_code=200)
+        response.json.return_value = {"response": "<p>no table</p>"}
+        type(response).text = PropertyMock(side_effect=AssertionError("text read"))
+        content = PropertyMock(return_value=b"{}")
+        type(response).content = content
+        mock_post.return_value = response
+
+        assert self.api.fetch_water_test_data() == {}
+        content.assert_not_called()
+
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.get")
+    @patch("homeassistant.components.leslies_pool.api.requests.Session.post")
+    def test_trace_logs_structured_events(self, mock_post, mock_get):
+        """Test the trace logger records bounded request details as JSON."""
+        mock_get.return_value = MagicMock(status_code=200, url="https://landing")
+        mock_get.return_value.elapsed.total_seconds.return_value = 0.1
+        body = b'{"response": "' + b"x" * 5000 + b'"}'
+        mock_post.return_value = MagicMock(
+            status_code=200, content=body, encoding="utf-8"
+        )
+        mock_post.return_value.elapsed.total_seconds.return_value = 0.2
+        mock_post.return_value.json.return_value = {"response": "<p>no table</p>"}
+
+        with self.assertLogs(
+            "homeassistant.components.leslies_pool.api.trace", level="DEBUG"
+        ) as logs:
+            self.api.fetch_water_test_data()
+
+        events = [json.loads(record.getMessage()) for record in logs.records]
+        assert [event["event"] for event in events] == [
+            "landing",
+            "water_test",
+            "parsed",
+            "transport",
+        ]
+        water_test = events[1]
+        assert water_test["pool_profile_id"] == "123456"
+        assert water_test["length"] == len(body)
+        assert len(water_test["preview"]) == LOG_PREVIEW_CHARS
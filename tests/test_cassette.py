@@ -0,0 +1,97 @@
+"""Test record-and-replay cassettes for the Leslie's Pool API client."""
+
+import json
+import time
+
+import pytest
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+from homeassistant.components.leslies_pool.cassette import Cassette
+from homeassistant.components.leslies_pool.cassette import CassetteExhausted
+
+
+@pytest.fixture
+def fake_server(fake_server_factory):
+    """Run a fake Leslie's server that forces one re-auth."""
+    return fake_server_factory(expire_every=2)
+
+
+def _record(fake_server, path):
+    """Record a login, a plain poll and a poll that has to re-authenticate."""
+    api = LesliesPoolApi("user@example.com", "hunter2", "123456", "Pool")
+    fake_server.configure(api)
+    cassette = api.start_recording()
+    assert api.authenticate()
+    first = api.fetch_water_test_data()
+    second = api.fetch_water_test_data()
+    api.session.close()
+    cassette.save(path)
+    return first, second
+
+
+def test_record_is_sanitized(fake_server, tmp_path):
+    """Test credentials and cookie values never reach the cassette file."""
+    path = tmp_path / "cassette.json"
+    _record(fake_server, path)
+
+    raw = path.read_text()
+    for secret in (
+        "hunter2",
+        "user@example.com",
+        "user%40example.com",
+        "csrf-sess",
+        "dwsid=sess",
+        "dwsecuretoken_x=token",
+        "dwcustomer_x=customer",
+    ):
+        assert secret not in raw
+
+    interactions = json.loads(raw)["interactions"]
+    paths = [item["request"]["url"].rsplit("/", 1)[-1] for item in interactions]
+    # The expired session shows up as a landing redirect followed by a re-login
+    assert paths[0] == "Account-Show"
+    assert any(item["response"]["status"] == 302 for item in interactions)
+
+
+def test_replay_matches_recording(fake_server, tmp_path):
+    """Test a replayed run returns the recorded results without the network."""
+    path = tmp_path / "cassette.json"
+    recorded = _record(fake_server, path)
+    cassette = Cassette.load(path)
+
+    api = LesliesPoolApi("user@example.com", "hunter2", "123456", "Pool")
+    fake_server.configure(api)
+    api.replay(cassette, speed=0)
+    fake_server.stop()
+
+    assert api.authenticate()
+    assert api.fetch_water_test_data() == recorded[0]
+    assert api.fetch_water_test_data() == recorded[1]
+    assert api.session.cookies.get("dwsid") == "REDACTED"
+
+    with pytest.raises(CassetteExhausted):
+        api.session.get(api.LOGIN_PAGE_URL)
+
+
+def test_replay_honors_recorded_latency(tmp_path):
+    """Test replay sleeps for the recorded upstream latency."""
+    cassette = Cassette(
+        [
+            {
+                "request": {"method": "GET", "url": "https://x/Account-Show"},
+                "response": {
+                    "status": 200,
+                    "reason": "OK",
+                    "headers": [["Content-Type", "text/html"]],
+                    "body": '<input name="csrf_token" value="t">',
+                    "elapsed": 0.05,
+                },
+            }
+        ]
+    )
+    api = LesliesPoolApi("user", "pass", "1", "Pool")
+    api.replay(cassette)
+
+    start = time.perf_counter()
+    response = api.session.get("https://x/Account-Show")
+    assert time.perf_counter() - start >= 0.05
+    assert "csrf_token" in response.text
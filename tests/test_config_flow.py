@@ -3,16 +3,25 @@
 from unittest.mock import AsyncMock
 from unittest.mock import patch
 
+import requests
 from homeassistant import config_entries
 from homeassistant.components.leslies_pool.config_flow import CannotConnect
 from homeassistant.components.leslies_pool.config_flow import InvalidAuth
 from homeassistant.components.leslies_pool.config_flow import InvalidURL
+from homeassistant.components.leslies_pool.config_flow import SOURCE_POOL
+from homeassistant.components.leslies_pool.const import CONF_CACHE_TTL
+from homeassistant.components.leslies_pool.const import CONF_MAX_ATTEMPTS
+from homeassistant.components.leslies_pool.const import CONF_PARSE_IN_PROCESS
+from homeassistant.components.leslies_pool.const import CONF_REQUEST_TIMEOUT
+from homeassistant.components.leslies_pool.const import CONF_SHARED_CACHE_DIR
+from homeassistant.components.leslies_pool.const import CONF_SHARED_CACHE_TTL
 from homeassistant.components.leslies_pool.const import DOMAIN
 from homeassistant.const import CONF_PASSWORD
 from homeassistant.const import CONF_SCAN_INTERVAL
 from homeassistant.const import CONF_USERNAME
 from homeassistant.core import HomeAssistant
 from homeassistant.data_entry_flow import FlowResultType
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
 WATER_TEST_URL = "https://lesliespool.com/on/demandware.store/Sites-lpm_site-Site/en_US/WaterTest-Landing?poolProfileId=5891278&poolName=Pool"
 
@@ -50,6 +59,7 @@ async def test_form(hass: HomeAssistant, mock_setup_entry: AsyncMock) -> None:
         "pool_name": "Pool",
         "scan_interval": 300,
     }
+    assert result["result"].unique_id == "5891278"
     assert len(mock_setup_entry.mock_calls) == 1
 
 
@@ -210,3 +220,217 @@ async def test_form_invalid_url(
         "scan_interval": 300,
     }
     assert len(mock_setup_entry.mock_calls) == 1
+
+
+async def test_form_url_already_configured(hass: HomeAssistant) -> None:
+    """Test a pool entered by URL that already has an entry is rejected."""
+    MockConfigEntry(domain=DOMAIN, unique_id="5891278", data={}).add_to_hass(hass)
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    with patch(
+        "homeassistant.components.leslies_pool.api.LesliesPoolApi.authenticate",
+        return_value=True,
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_USERNAME: "test-username",
+                CONF_PASSWORD: "test-password",
+                "water_test_url": WATER_TEST_URL,
+                CONF_SCAN_INTERVAL: 300,
+            },
+        )
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+    assert len(hass.config_entries.async_entries(DOMAIN)) == 1
+
+
+async def test_form_discovers_all_pools(
+    hass: HomeAssistant, mock_setup_entry: AsyncMock
+) -> None:
+    """Test leaving the URL empty sets up every pool on the account."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    with (
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.authenticate",
+            return_value=True,
+        ) as mock_authenticate,
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.discover_pools",
+            return_value=[
+                {"pool_profile_id": "111", "pool_name": "Pool", "title": "Pool"},
+                {"pool_profile_id": "222", "pool_name": "Spa", "title": "Spa"},
+            ],
+        ),
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_USERNAME: "test-username",
+                CONF_PASSWORD: "test-password",
+                CONF_SCAN_INTERVAL: 300,
+            },
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == "Leslie's Pool (Pool)"
+    entries = hass.config_entries.async_entries(DOMAIN)
+    assert sorted(entry.data["pool_profile_id"] for entry in entries) == ["111", "222"]
+    assert {entry.unique_id for entry in entries} == {"111", "222"}
+    assert len(mock_authenticate.mock_calls) == 1
+    assert len(mock_setup_entry.mock_calls) == 2
+
+
+async def test_form_no_pools(hass: HomeAssistant, mock_setup_entry: AsyncMock) -> None:
+    """Test an account without pool profiles shows an error."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    with (
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.authenticate",
+            return_value=True,
+        ),
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.discover_pools",
+            return_value=[],
+        ),
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_USERNAME: "test-username",
+                CONF_PASSWORD: "test-password",
+                CONF_SCAN_INTERVAL: 300,
+            },
+        )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "no_pools"}
+
+
+async def test_form_discovery_cannot_connect(hass: HomeAssistant) -> None:
+    """Test a failed pool lookup shows an error and closes the session."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+
+    with (
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.authenticate",
+            return_value=True,
+        ),
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.discover_pools",
+            side_effect=requests.ConnectionError,
+        ),
+        patch(
+            "homeassistant.components.leslies_pool.api.LesliesPoolApi.close"
+        ) as mock_close,
+    ):
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"],
+            {
+                CONF_USERNAME: "test-username",
+                CONF_PASSWORD: "test-password",
+                CONF_SCAN_INTERVAL: 300,
+            },
+        )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+    assert len(mock_close.mock_calls) == 1
+
+
+async def test_discovered_pool_already_configured(hass: HomeAssistant) -> None:
+    """Test a discovered pool that already has an entry is skipped."""
+    MockConfigEntry(domain=DOMAIN, unique_id="111", data={}).add_to_hass(hass)
+
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN,
+        context={"source": SOURCE_POOL},
+        data={"pool_profile_id": "111", "pool_name": "Pool", "title": "Pool"},
+    )
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "already_configured"
+
+
+async def test_options_flow(hass: HomeAssistant) -> None:
+    """Test the options flow stores polling and fetch tunables."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "username": "test-username",
+            "password": "test-password",
+            "pool_profile_id": "5891278",
+            "pool_name": "Pool",
+            "scan_interval": 300,
+        },
+    )
+    entry.add_to_hass(hass)
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "init"
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_SCAN_INTERVAL: 600,
+            CONF_MAX_ATTEMPTS: 3,
+            CONF_REQUEST_TIMEOUT: 15,
+            CONF_CACHE_TTL: 45,
+            CONF_PARSE_IN_PROCESS: True,
+        },
+    )
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert entry.options == {
+        CONF_SCAN_INTERVAL: 600,
+        CONF_MAX_ATTEMPTS: 3,
+        CONF_REQUEST_TIMEOUT: 15,
+        CONF_CACHE_TTL: 45,
+        CONF_PARSE_IN_PROCESS: True,
+        CONF_SHARED_CACHE_TTL: 300,
+    }
+
+
+async def test_options_flow_rejects_cache_path(hass: HomeAssistant) -> None:
+    """Test the shared cache directory must be an allowed path."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "username": "test-username",
+            "password": "test-password",
+            "pool_profile_id": "5891278",
+            "pool_name": "Pool",
+            "scan_interval": 300,
+        },
+    )
+    entry.add_to_hass(hass)
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {
+            CONF_SCAN_INTERVAL: 300,
+            CONF_MAX_ATTEMPTS: 2,
+            CONF_REQUEST_TIMEOUT: 30,
+            CONF_CACHE_TTL: 30,
+            CONF_PARSE_IN_PROCESS: False,
+            CONF_SHARED_CACHE_DIR: "/not/allowed",
+            CONF_SHARED_CACHE_TTL: 300,
+        },
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {CONF_SHARED_CACHE_DIR: "path_not_allowed"}
@@ -0,0 +1,185 @@
+"""Test the Leslie's Pool Water Tests data update coordinator."""
+
+import asyncio
+from datetime import timedelta
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+from homeassistant.components.leslies_pool.coordinator import LesliesPoolCoordinator
+from homeassistant.components.leslies_pool.const import CONF_CACHE_TTL
+from homeassistant.components.leslies_pool.const import CONF_MAX_ATTEMPTS
+from homeassistant.components.leslies_pool.const import CONF_REQUEST_TIMEOUT
+from homeassistant.components.leslies_pool.const import CONF_SHARED_CACHE_DIR
+from homeassistant.components.leslies_pool.const import POLL_JITTER
+from homeassistant.components.leslies_pool.shared_cache import DirectoryCache
+
+
+def _make_coordinator(hass, fetch, freshness_window=30):
+    """Build a coordinator around a mocked API fetch."""
+    api = MagicMock()
+    api.fetch_water_test_data = fetch
+    api.shared_cache = None
+    api.async_reserve = AsyncMock()
+    return LesliesPoolCoordinator(
+        hass, api, timedelta(seconds=300), freshness_window=freshness_window
+    )
+
+
+async def test_concurrent_refreshes_share_one_fetch(hass):
+    """Test concurrent refresh callers join the in-flight fetch."""
+    release = asyncio.Event()
+    fetch = AsyncMock(side_effect=lambda: {"free_chlorine": "3.0"})
+
+    async def _slow_fetch(_ticket):
+        await release.wait()
+        return await fetch()
+
+    coordinator = _make_coordinator(hass, MagicMock())
+
+    with patch.object(coordinator, "_async_fetch_water_test_data", _slow_fetch):
+        first = hass.async_create_task(coordinator._async_update_data())
+        second = hass.async_create_task(coordinator._async_update_data())
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await first == {"free_chlorine": "3.0"}
+        assert await second == {"free_chlorine": "3.0"}
+    assert fetch.call_count == 1
+
+
+async def test_refresh_within_window_served_from_cache(hass):
+    """Test refreshes inside the freshness window do not go upstream."""
+    fetch = MagicMock(return_value={"ph": "7.4"})
+    coordinator = _make_coordinator(hass, fetch)
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert fetch.call_count == 1
+    assert coordinator.data["ph"] == "7.4"
+
+
+async def test_refresh_after_window_goes_upstream(hass):
+    """Test refreshes outside the freshness window fetch again."""
+    fetch = MagicMock(return_value={"ph": "7.4"})
+    coordinator = _make_coordinator(hass, fetch, freshness_window=0)
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+
+    assert fetch.call_count == 2
+
+
+async def test_failed_fetch_is_not_cached(hass):
+    """Test a failed fetch leaves the gate open for the next caller."""
+    fetch = MagicMock(side_effect=[Exception("boom"), {"salt": "3200"}])
+    coordinator = _make_coordinator(hass, fetch)
+
+    await coordinator.async_refresh()
+    assert not coordinator.last_update_success
+
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.data["salt"] == "3200"
+    assert fetch.call_count == 2
+
+
+async def test_apply_options_updates_live_coordinator(hass):
+    """Test options are applied in place without an upstream fetch."""
+    fetch = MagicMock(return_value={"ph": "7.4"})
+    coordinator = _make_coordinator(hass, fetch)
+
+    with patch.object(coordinator, "_schedule_refresh") as mock_schedule:
+        coordinator.async_apply_options(
+            timedelta(seconds=600),
+            {CONF_MAX_ATTEMPTS: 3, CONF_REQUEST_TIMEOUT: 10, CONF_CACHE_TTL: 60},
+        )
+
+    assert coordinator._base_interval == timedelta(seconds=600)
+    assert coordinator.freshness_window == 60
+    assert coordinator.api.max_attempts == 3
+    assert coordinator.api.timeout == 10
+    assert mock_schedule.call_count == 0
+    assert fetch.call_count == 0
+
+
+async def test_keep_alive_refreshes_expiring_session(hass):
+    """Test the keep-alive re-authenticates only when expiry is near."""
+    coordinator = _make_coordinator(hass, MagicMock(return_value={}))
+    api = coordinator.api
+    api.refresh_session_if_expiring.return_value = True
+
+    api.session_expires_in.return_value = None
+    await coordinator.async_keep_alive()
+    api.session_expires_in.return_value = 3600
+    await coordinator.async_keep_alive()
+    assert api.refresh_session_if_expiring.call_count == 0
+
+    api.session_expires_in.return_value = 30
+    await coordinator.async_keep_alive()
+    assert api.refresh_session_if_expiring.call_count == 1
+
+
+async def test_keep_alive_is_skipped_with_shared_cache(hass):
+    """Test instances sharing results do not each keep a session alive."""
+    coordinator = _make_coordinator(hass, MagicMock(return_value={}))
+    coordinator.async_apply_options(
+        timedelta(seconds=300), {CONF_SHARED_CACHE_DIR: "/shared/leslies"}
+    )
+    coordinator.api.session_expires_in.return_value = 30
+
+    await coordinator.async_keep_alive()
+
+    assert isinstance(coordinator.api.shared_cache, DirectoryCache)
+    assert coordinator.api.refresh_session_if_expiring.call_count == 0
+
+
+async def test_polls_are_staggered_and_jittered(hass):
+    """Test the first scheduled poll is offset and later ones are jittered."""
+    fetch = MagicMock(return_value={"ph": "7.4"})
+    coordinators = [
+        _make_coordinator(hass, fetch, freshness_window=0) for _ in range(4)
+    ]
+
+    for coordinator in coordinators:
+        await coordinator.async_refresh()
+    first = sorted(c.update_interval.total_seconds() for c in coordinators)
+    # Offsets spread the entries across the interval instead of bunching them
+    assert first[-1] - first[0] > 300 * 0.25
+
+    for coordinator in coordinators:
+        await coordinator.async_refresh()
+        assert coordinator.update_interval.total_seconds() == pytest.approx(
+            300, rel=POLL_JITTER
+        )
+
+
+async def test_reloaded_entry_rebuilds_history(hass, fake_server):
+    """Test a coordinator taking over a parked API sees the whole history."""
+    api = LesliesPoolApi("user", "pass", "123456", "Pool")
+    fake_server.configure(api)
+    api.login_bucket = api.fetch_bucket = None
+    try:
+        assert await hass.async_add_executor_job(api.authenticate)
+        for _ in range(2):
+            # Each load builds a new coordinator around the same client
+            coordinator = LesliesPoolCoordinator(
+                hass, api, timedelta(seconds=300), freshness_window=0
+            )
+            await coordinator.async_refresh()
+
+            assert len(api.new_rows) == 1
+            assert len(coordinator.history) == 1
+            assert coordinator.data["water_balance"] != {}
+
+            # Later polls of the same coordinator skip the known test
+            await coordinator.async_refresh()
+            await coordinator.async_shutdown()
+            assert api.new_rows == []
+            assert len(coordinator.history) == 1
+    finally:
+        api.close()
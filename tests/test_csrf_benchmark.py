@@ -0,0 +1,106 @@
+"""Benchmark of CSRF token extraction from the login page.
+
+Compares building a full BeautifulSoup tree, as login used to, with the
+streaming extractor on login pages of realistic sizes, reporting time and
+peak memory. It is opt-in because it takes a while:
+
+    LESLIES_CSRF_BENCHMARK=1 pytest -s tests/test_csrf_benchmark.py
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import time
+import tracemalloc
+
+import pytest
+from bs4 import BeautifulSoup
+from homeassistant.components.leslies_pool.api import LOGIN_PAGE_CHUNK_SIZE
+from homeassistant.components.leslies_pool.parser import extract_csrf_token
+
+# Roughly the size of the site's login page, and pages with heavier navigation
+PAGE_SIZES = (64 * 1024, 256 * 1024, 1024 * 1024)
+ROUNDS = 20
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("LESLIES_CSRF_BENCHMARK"),
+    reason="set LESLIES_CSRF_BENCHMARK to run the CSRF benchmark",
+)
+
+NAVIGATION = (
+    '<li class="nav-item"><a class="nav-link" href="/pool-chemicals/">'
+    '<span class="label">Pool Chemicals</span></a>'
+    '<ul class="dropdown"><li><a href="/chlorine/">Chlorine</a></li></ul></li>\n'
+)
+FORM = (
+    '<form action="/Account-Login" method="post" class="login" name="login-form">'
+    '<input type="email" id="login-form-email" name="loginEmail">'
+    '<input type="password" id="login-form-password" name="loginPassword">'
+    '<input type="hidden" name="csrf_token" value="{token}">'
+    "</form>\n"
+)
+FOOTER = '<div class="product-tile"><img src="/tile.jpg" alt="Product"></div>\n'
+
+
+def _login_page(size: int) -> bytes:
+    """Build a login page of about ``size`` bytes with the form in the middle."""
+    half = size // 2
+    return (
+        "<html><head><title>Sign In</title></head><body>"
+        + NAVIGATION * (half // len(NAVIGATION))
+        + FORM.format(token="x" * 64)
+        + FOOTER * (half // len(FOOTER))
+        + "</body></html>"
+    ).encode()
+
+
+def _chunks(page: bytes) -> list[bytes]:
+    """Split a page into the chunks the client streams it in."""
+    return [
+        page[i : i + LOGIN_PAGE_CHUNK_SIZE]
+        for i in range(0, len(page), LOGIN_PAGE_CHUNK_SIZE)
+    ]
+
+
+def _full_parse(page: bytes) -> str | None:
+    """Extract the token the way login did before streaming."""
+    tag = BeautifulSoup(page.decode(), "html.parser").find(
+        "input", {"name": "csrf_token"}
+    )
+    return tag["value"] if tag is not None else None
+
+
+def _measure(extract, page: bytes) -> tuple[float, int]:
+    """Return the median time and the peak memory of an extraction."""
+    times = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        extract(page)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    extract(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+@pytest.mark.parametrize("size", PAGE_SIZES)
+def test_streaming_extraction_is_cheaper(size):
+    """Test the streaming extractor beats a full parse on time and memory."""
+    page = _login_page(size)
+    assert _full_parse(page) == extract_csrf_token(_chunks(page))
+
+    full_time, full_peak = _measure(_full_parse, page)
+    stream_time, stream_peak = _measure(
+        lambda page: extract_csrf_token(_chunks(page)), page
+    )
+
+    print(
+        f"\n{size // 1024} KiB page: "
+        f"full parse {full_time * 1000:.1f} ms / {full_peak // 1024} KiB, "
+        f"streaming {stream_time * 1000:.1f} ms / {stream_peak // 1024} KiB"
+    )
+    assert stream_time < full_time
+    assert stream_peak < full_peak
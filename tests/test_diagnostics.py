@@ -0,0 +1,31 @@
+"""Test the Leslie's Pool Water Tests diagnostics."""
+
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+from homeassistant.components.leslies_pool.const import DOMAIN
+from homeassistant.components.leslies_pool.coordinator import LesliesPoolCoordinator
+from homeassistant.components.leslies_pool.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from homeassistant.components.leslies_pool.transport import TransportStats
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+
+async def test_diagnostics_report_queue_wait_and_transport(hass):
+    """Test diagnostics expose queue waits per class and transfer counters."""
+    entry = MockConfigEntry(domain=DOMAIN, data={})
+    entry.add_to_hass(hass)
+    api = MagicMock()
+    api.transport_stats = TransportStats()
+    api.transport_stats.add(requests=2, bytes_received=512)
+    api.last_poll_transport = {"requests": 2}
+    hass.data[DOMAIN] = {
+        entry.entry_id: LesliesPoolCoordinator(hass, api, timedelta(seconds=300))
+    }
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert set(diagnostics["queue_wait"]) == {"interactive", "scheduled", "background"}
+    assert diagnostics["transport"]["bytes_received"] == 512
+    assert diagnostics["last_poll_transport"] == {"requests": 2}
@@ -0,0 +1,189 @@
+"""Test the Leslie's Pool Water Tests history export."""
+
+import csv
+from datetime import timedelta
+import json
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.leslies_pool.const import ATTR_FORMAT
+from homeassistant.components.leslies_pool.const import ATTR_PATH
+from homeassistant.components.leslies_pool.const import DOMAIN
+from homeassistant.components.leslies_pool.const import SERVICE_EXPORT_HISTORY
+from homeassistant.components.leslies_pool.coordinator import LesliesPoolCoordinator
+from homeassistant.components.leslies_pool.export import batched
+from homeassistant.components.leslies_pool.export import export_pool
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.setup import async_setup_component
+
+
+class _HistoryApi:
+    """Stand-in client serving a fixed history, newest first."""
+
+    def __init__(self, pool_profile_id, rows):
+        """Initialize with the pool's rows."""
+        self.pool_profile_id = pool_profile_id
+        self.pool_name = f"Pool{pool_profile_id}"
+        self.rows = rows
+        self.fetches = 0
+
+    async def async_reserve(self, login=False):
+        """Reserve no budget; the history is local."""
+
+    def iter_water_tests(self, stop_at=None):
+        """Yield rows newer than ``stop_at``."""
+        self.fetches += 1
+        for row in self.rows:
+            if row == stop_at:
+                return
+            yield row
+
+
+def _row(test_date, salt="3200"):
+    """Return a parsed water test row."""
+    return {
+        "test_date": test_date,
+        "free_chlorine": "3.0",
+        "salt": salt,
+        "in_store": True,
+    }
+
+
+def test_batched_is_lazy():
+    """Test batches are drawn from the source only as they are consumed."""
+    consumed = []
+
+    def _source():
+        for number in range(5):
+            consumed.append(number)
+            yield number
+
+    batches = batched(_source(), size=2)
+    assert next(batches) == [0, 1]
+    assert consumed == [0, 1]
+    assert list(batches) == [[2, 3], [4]]
+
+
+def test_csv_export_appends_only_new_tests(tmp_path):
+    """Test a second export appends just the tests added since the first."""
+    path = str(tmp_path / "history.csv")
+    api = _HistoryApi("111", [_row("05/14/2025"), _row("05/07/2025")])
+
+    assert export_pool(api, path, "csv") == 2
+    api.rows.insert(0, _row("05/21/2025", salt="3300"))
+    assert export_pool(api, path, "csv") == 1
+    assert export_pool(api, path, "csv") == 0
+
+    with open(path, encoding="utf-8") as file:
+        rows = list(csv.DictReader(file))
+    assert [row["test_date"] for row in rows] == [
+        "05/07/2025",
+        "05/14/2025",
+        "05/21/2025",
+    ]
+    assert rows[2]["salt"] == "3300"
+    assert rows[0]["pool_profile_id"] == "111"
+    assert rows[0]["iron"] == ""
+
+    with open(f"{path}.state.json", encoding="utf-8") as file:
+        assert json.load(file)["111"]["test_date"] == "05/21/2025"
+
+
+def test_batches_are_written_oldest_first(tmp_path):
+    """Test rows are oldest first across batches, as they are across runs."""
+    path = str(tmp_path / "history.csv")
+    dates = [f"05/{day:02d}/2025" for day in range(5, 0, -1)]
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            "homeassistant.components.leslies_pool.export.EXPORT_BATCH_SIZE", 2
+        )
+        export_pool(_HistoryApi("111", [_row(date) for date in dates]), path, "csv")
+
+    with open(path, encoding="utf-8") as file:
+        assert [row["test_date"] for row in csv.DictReader(file)] == dates[::-1]
+
+
+def test_failed_write_keeps_previous_state(tmp_path):
+    """Test the state only advances once the exported rows are written."""
+    path = str(tmp_path / "history.csv")
+    api = _HistoryApi("111", [_row("05/14/2025")])
+    export_pool(api, path, "csv")
+    api.rows.insert(0, _row("05/21/2025"))
+
+    with patch(
+        "homeassistant.components.leslies_pool.export.os.fsync", side_effect=OSError
+    ), pytest.raises(OSError):
+        export_pool(api, path, "csv")
+
+    with open(f"{path}.state.json", encoding="utf-8") as file:
+        assert json.load(file)["111"]["test_date"] == "05/14/2025"
+    # No temporary state file is left behind
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == [
+        "history.csv",
+        "history.csv.state.json",
+    ]
+
+
+def test_csv_export_tracks_pools_separately(tmp_path):
+    """Test several pools append to one file with their own progress."""
+    path = str(tmp_path / "history.csv")
+
+    assert export_pool(_HistoryApi("111", [_row("05/14/2025")]), path, "csv") == 1
+    assert export_pool(_HistoryApi("222", [_row("05/14/2025")]), path, "csv") == 1
+
+    with open(path, encoding="utf-8") as file:
+        pools = [row["pool_profile_id"] for row in csv.DictReader(file)]
+    assert pools == ["111", "222"]
+
+
+def test_parquet_export_writes_row_groups(tmp_path):
+    """Test each batch becomes a row group of a new part file."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = str(tmp_path / "history")
+    api = _HistoryApi("111", [_row(f"01/{day:02d}/2025") for day in range(1, 29)])
+
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(
+            "homeassistant.components.leslies_pool.export.EXPORT_BATCH_SIZE", 10
+        )
+        assert export_pool(api, path, "parquet") == 28
+
+    (part,) = (tmp_path / "history").iterdir()
+    assert pq.ParquetFile(part).num_row_groups == 3
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    """Test an unsupported format fails before anything is fetched."""
+    api = _HistoryApi("111", [_row("05/14/2025")])
+
+    with pytest.raises(ValueError):
+        export_pool(api, str(tmp_path / "history.xlsx"), "xlsx")
+    assert api.fetches == 0
+
+
+async def test_export_history_service(hass, tmp_path):
+    """Test the service exports loaded pools to an allowed path."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    hass.config.allowlist_external_dirs = {str(tmp_path)}
+
+    api = _HistoryApi("111", [_row("05/14/2025"), _row("05/07/2025")])
+    coordinator = LesliesPoolCoordinator(hass, api, timedelta(seconds=300))
+    hass.data[DOMAIN] = {"entry": coordinator}
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        {ATTR_PATH: str(tmp_path / "history.csv"), ATTR_FORMAT: "csv"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {"rows": 2}
+
+    with pytest.raises(ServiceValidationError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_EXPORT_HISTORY,
+            {ATTR_PATH: "/etc/leslies.csv"},
+            blocking=True,
+        )
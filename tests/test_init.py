@@ -0,0 +1,41 @@
+"""Test the Leslie's Pool Water Tests integration setup."""
+
+from homeassistant.components.leslies_pool import async_migrate_entry
+from homeassistant.components.leslies_pool.const import DOMAIN
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+
+async def test_migrate_legacy_unique_ids(hass):
+    """Test version 1 entries move legacy sensors to the current IDs once."""
+    entry = MockConfigEntry(domain=DOMAIN, version=1, data={})
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    legacy = registry.async_get_or_create(
+        "sensor", DOMAIN, f"{entry.entry_id}_ph", config_entry=entry
+    )
+    current = registry.async_get_or_create(
+        "sensor", DOMAIN, f"{entry.entry_id}_leslies_salt", config_entry=entry
+    )
+    # A sensor registered under both IDs, e.g. after a downgrade and upgrade
+    stale = registry.async_get_or_create(
+        "sensor", DOMAIN, f"{entry.entry_id}_salt", config_entry=entry
+    )
+
+    assert await async_migrate_entry(hass, entry)
+
+    migrated = registry.async_get(legacy.entity_id)
+    assert migrated is None
+    migrated = registry.async_get("sensor.leslies_ph")
+    assert migrated.unique_id == f"{entry.entry_id}_leslies_ph"
+    assert registry.async_get(current.entity_id).unique_id == current.unique_id
+    assert registry.async_get(stale.entity_id) is None
+    assert entry.version == 2
+
+
+async def test_migrate_rejects_newer_version(hass):
+    """Test entries from a newer version of the integration are not loaded."""
+    entry = MockConfigEntry(domain=DOMAIN, version=3, data={})
+    entry.add_to_hass(hass)
+
+    assert not await async_migrate_entry(hass, entry)
@@ -0,0 +1,108 @@
+"""Test the Leslie's Pool Water Tests process-pool parsing backend."""
+
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.leslies_pool import offload
+from homeassistant.components.leslies_pool.const import PROCESS_PARSE_THRESHOLD
+from homeassistant.components.leslies_pool.parser import parse_latest_water_tests
+from homeassistant.components.leslies_pool.parser import parse_water_test_rows
+
+from .test_parser import HEADER
+from .test_parser import VALUES
+from .test_parser import _table
+
+
+def _page(size: int) -> str:
+    """Return a history page of at least ``size`` characters, newest first."""
+    rows = []
+    while len(_table(HEADER, rows)) < size:
+        rows.extend((f"05/{day:02d}/2025", VALUES) for day in range(28, 0, -1))
+    return _table(HEADER, rows)
+
+
+@pytest.fixture(autouse=True)
+def stop_parse_pool():
+    """Stop any parse processes a test started."""
+    yield
+    offload.shutdown()
+
+
+def test_small_pages_are_parsed_inline():
+    """Test pages under the threshold never start the process pool."""
+    html = _page(1000)
+
+    with patch.object(offload, "_get_executor") as get_executor:
+        rows = offload.parse_rows(html, in_process=True)
+
+    get_executor.assert_not_called()
+    assert rows == parse_latest_water_tests(html)
+
+
+def test_disabled_offload_parses_inline():
+    """Test large pages stay in the thread unless offloading is enabled."""
+    with patch.object(offload, "_get_executor") as get_executor:
+        offload.parse_rows(_page(PROCESS_PARSE_THRESHOLD))
+
+    get_executor.assert_not_called()
+
+
+def test_large_pages_are_parsed_in_process():
+    """Test a worker process returns the same rows as an inline parse."""
+    html = _page(PROCESS_PARSE_THRESHOLD)
+    stop_at = parse_water_test_rows(html)[3]
+
+    parsed = offload.parse_rows(html, stop_at=stop_at, in_process=True, timeout=60)
+
+    assert offload._executor is not None
+    assert parsed == parse_latest_water_tests(html, stop_at=stop_at)
+    assert len(parsed[1]) == 3
+
+
+def test_broken_pool_falls_back_inline():
+    """Test a dead worker is replaced by an inline parse."""
+    html = _page(PROCESS_PARSE_THRESHOLD)
+    executor = MagicMock()
+    executor.submit.side_effect = BrokenProcessPool
+
+    with patch.object(offload, "_get_executor", return_value=executor):
+        rows = offload.parse_rows(html, in_process=True)
+
+    assert rows == parse_latest_water_tests(html)
+
+
+def test_timed_out_parse_falls_back_inline():
+    """Test a parse that outlives the timeout stops its worker and runs inline."""
+    html = _page(PROCESS_PARSE_THRESHOLD)
+    worker = MagicMock()
+    executor = MagicMock(_processes={1: worker})
+    future = executor.submit.return_value
+    future.result.side_effect = TimeoutError
+    future.cancel.return_value = False
+    offload._executor = executor
+
+    rows = offload.parse_rows(html, in_process=True, timeout=1)
+
+    assert rows == parse_latest_water_tests(html)
+    assert offload._executor is None
+    worker.terminate.assert_called_once()
+    executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+
+
+def test_queued_parse_is_cancelled_on_timeout():
+    """Test a parse still waiting for a worker is cancelled, keeping the pool."""
+    html = _page(PROCESS_PARSE_THRESHOLD)
+    executor = MagicMock()
+    future = executor.submit.return_value
+    future.result.side_effect = TimeoutError
+    future.cancel.return_value = True
+    offload._executor = executor
+
+    rows = offload.parse_rows(html, in_process=True, timeout=1)
+
+    assert rows == parse_latest_water_tests(html)
+    assert offload._executor is executor
+    executor.shutdown.assert_not_called()
+    offload._executor = None
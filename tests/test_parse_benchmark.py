@@ -0,0 +1,87 @@
+"""Benchmark of event loop latency with inline and process-pool parsing.
+
+Several simulated entries parse a large history page in the thread executor
+at once while a ticker measures how late the event loop wakes up. Parsing in
+the thread holds the GIL and delays the loop; offloaded parsing should not.
+It is opt-in because it takes a while:
+
+    LESLIES_PARSE_BENCHMARK=1 pytest -s tests/test_parse_benchmark.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import time
+
+import pytest
+from homeassistant.components.leslies_pool import offload
+
+from .test_parser import HEADER
+from .test_parser import VALUES
+from .test_parser import _table
+
+ENTRIES = 8
+ROUNDS = 3
+PAGE_ROWS = 400
+TICK = 0.005
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("LESLIES_PARSE_BENCHMARK"),
+    reason="set LESLIES_PARSE_BENCHMARK to run the parse benchmark",
+)
+
+
+async def _measure_lag(in_process: bool) -> list[float]:
+    """Return event loop wake-up delays while every entry parses a page."""
+    loop = asyncio.get_running_loop()
+    html = _table(HEADER, [("05/21/2025", VALUES)] * PAGE_ROWS)
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def _ticker() -> None:
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - start - TICK)
+
+    ticker = asyncio.create_task(_ticker())
+    for _ in range(ROUNDS):
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    None, lambda: offload.parse_rows(html, in_process=in_process)
+                )
+                for _ in range(ENTRIES)
+            )
+        )
+    done.set()
+    await ticker
+    return lags
+
+
+def _summary(lags: list[float]) -> str:
+    """Format lag percentiles in milliseconds."""
+    ordered = sorted(lags)
+    p99 = ordered[int(len(ordered) * 0.99)]
+    return (
+        f"median {statistics.median(ordered) * 1000:.1f} ms, "
+        f"p99 {p99 * 1000:.1f} ms, max {ordered[-1] * 1000:.1f} ms"
+    )
+
+
+def test_offload_reduces_event_loop_lag():
+    """Test offloaded parsing keeps the event loop more responsive."""
+    # Start the workers outside the measurement
+    html = _table(HEADER, [("05/21/2025", VALUES)] * PAGE_ROWS)
+    offload.parse_rows(html, in_process=True)
+
+    try:
+        inline = asyncio.run(_measure_lag(in_process=False))
+        offloaded = asyncio.run(_measure_lag(in_process=True))
+    finally:
+        offload.shutdown()
+
+    print(f"\ninline:    {_summary(inline)}\noffloaded: {_summary(offloaded)}")
+    assert statistics.median(offloaded) < statistics.median(inline)
@@ -3,7 +3,7 @@
 from datetime import datetime
 
 import pytest
-from homeassistant.components.leslies_pool.sensor import parse_test_date
+from homeassistant.components.leslies_pool.coordinator import parse_test_date
 
 
 def test_parse_test_date_valid():
@@ -0,0 +1,210 @@
+"""Test the Leslie's Pool Water Tests history table parser."""
+
+from unittest.mock import patch
+
+from homeassistant.components.leslies_pool import parser
+from homeassistant.components.leslies_pool.parser import LEGACY_SCHEMA
+from homeassistant.components.leslies_pool.parser import extract_csrf_token
+from homeassistant.components.leslies_pool.parser import iter_water_test_rows
+from homeassistant.components.leslies_pool.parser import parse_latest_water_tests
+from homeassistant.components.leslies_pool.parser import parse_pool_profiles
+from homeassistant.components.leslies_pool.parser import parse_water_test_rows
+
+HEADER = [
+    "Date",
+    "Type",
+    "Free Chlorine (ppm)",
+    "Total Chlorine (ppm)",
+    "pH",
+    "Total Alkalinity (ppm)",
+    "Calcium Hardness (ppm)",
+    "Cyanuric Acid (ppm)",
+    "Iron (ppm)",
+    "Copper (ppm)",
+    "Phosphates (ppb)",
+    "Salt (ppm)",
+    "In Store",
+]
+
+
+def _table(header, rows):
+    """Build a water test table with a header and body rows."""
+    head = "".join(f"<th>{label}</th>" for label in header)
+    body = "".join(
+        "<tr>"
+        f'<th><span class="badge badge-secondary p-2">{date}</span></th>'
+        + "".join(f"<td>{value}</td>" for value in values)
+        + '<td><i class="fa fa-times-circle text-danger"></i></td>'
+        "</tr>"
+        for date, values in rows
+    )
+    return (
+        '<table class="table table-striped table-bordered table-hover table-sm">'
+        f"<thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+    )
+
+
+VALUES = ["Home", "1.0", "2.0", "7.0", "80", "200", "30", "0.1", "0.2", "300", "4000"]
+
+
+def test_parse_with_header():
+    """Test rows are mapped by header labels."""
+    rows = parse_water_test_rows(
+        _table(HEADER, [("05/21/2025", VALUES), ("05/14/2025", VALUES)])
+    )
+
+    assert len(rows) == 2
+    assert rows[0] == {
+        "free_chlorine": "1.0",
+        "total_chlorine": "2.0",
+        "ph": "7.0",
+        "alkalinity": "80",
+        "calcium": "200",
+        "cyanuric_acid": "30",
+        "iron": "0.1",
+        "copper": "0.2",
+        "phosphates": "300",
+        "salt": "4000",
+        "test_date": "05/21/2025",
+        "in_store": False,
+    }
+
+
+def test_parse_with_reordered_header():
+    """Test a column order change is followed instead of mislabeling data."""
+    header = HEADER[:2] + ["Salt (ppm)"] + HEADER[2:11] + ["In Store"]
+    values = ["Home", "4000"] + VALUES[1:10]
+
+    rows = parse_water_test_rows(_table(header, [("05/21/2025", values)]), limit=1)
+
+    assert rows[0]["salt"] == "4000"
+    assert rows[0]["free_chlorine"] == "1.0"
+    assert rows[0]["phosphates"] == "300"
+
+
+def test_schema_compiled_once_per_header():
+    """Test the schema is cached per header and recompiled on a change."""
+    parser._schema_cache.clear()
+    html = _table(HEADER, [("05/21/2025", VALUES)])
+
+    with patch.object(
+        parser, "compile_schema", wraps=parser.compile_schema
+    ) as mock_compile:
+        parse_water_test_rows(html)
+        parse_water_test_rows(html)
+        assert mock_compile.call_count == 1
+
+        renamed = ["Test Date"] + HEADER[1:]
+        parse_water_test_rows(_table(renamed, [("05/21/2025", VALUES)]))
+        assert mock_compile.call_count == 2
+
+
+def test_unknown_header_falls_back_to_positions():
+    """Test an unrecognized header uses the legacy positional layout."""
+    table = parser.BeautifulSoup(
+        _table(["A"] * 13, [("05/21/2025", VALUES)]), "html.parser"
+    ).table
+
+    assert parser.schema_for_table(table) is LEGACY_SCHEMA
+
+
+def test_missing_table():
+    """Test a page without the water test table returns None."""
+    assert parse_water_test_rows("<html><body>Sign in</body></html>") is None
+
+
+def test_iter_rows_is_lazy_and_stops():
+    """Test rows are yielded one at a time up to the known newest row."""
+    html = _table(
+        HEADER,
+        [("05/21/2025", VALUES), ("05/14/2025", VALUES), ("05/07/2025", VALUES)],
+    )
+    known = parse_water_test_rows(html)[1]
+
+    rows = iter_water_test_rows(html, stop_at=known)
+    assert next(rows)["test_date"] == "05/21/2025"
+    assert list(rows) == []
+    assert list(iter_water_test_rows("<html></html>")) == []
+
+
+def test_edited_newest_row_does_not_replay_history():
+    """Test an edit to the known newest row does not make old rows new."""
+    rows = [("05/21/2025", VALUES), ("05/14/2025", VALUES), ("05/07/2025", VALUES)]
+    known = parse_water_test_rows(_table(HEADER, rows))[0]
+    edited = _table(HEADER, [("05/21/2025", ["Home", "9.9", *VALUES[2:]]), *rows[1:]])
+
+    assert parse_water_test_rows(edited, stop_at=known) == []
+
+    newer = _table(HEADER, [("05/28/2025", VALUES), *rows])
+    assert [
+        row["test_date"] for row in parse_water_test_rows(newer, stop_at=known)
+    ] == ["05/28/2025"]
+
+
+def test_latest_test_reflects_the_current_page():
+    """Test corrections and deletions upstream show up in the newest test."""
+    rows = [("05/21/2025", VALUES), ("05/14/2025", VALUES)]
+    known = parse_water_test_rows(_table(HEADER, rows))[0]
+
+    corrected = _table(
+        HEADER, [("05/21/2025", ["Home", "5.0", *VALUES[2:]]), *rows[1:]]
+    )
+    latest, new_rows = parse_latest_water_tests(corrected, stop_at=known)
+    assert latest["free_chlorine"] == "5.0"
+    assert new_rows == []
+
+    latest, new_rows = parse_latest_water_tests(_table(HEADER, rows[1:]), known)
+    assert latest["test_date"] == "05/14/2025"
+    assert new_rows == []
+
+    latest, new_rows = parse_latest_water_tests(_table(HEADER, rows))
+    assert new_rows == parse_water_test_rows(_table(HEADER, rows))
+    assert latest == new_rows[0]
+    assert parse_latest_water_tests(_table(HEADER, [])) == (None, [])
+    assert parse_latest_water_tests("<html></html>") is None
+
+
+def test_parse_pool_profiles():
+    """Test every pool linked from the profile page is found once."""
+    html = """
+    <div class="pool-profile">
+      <a href="/WaterTest-Landing?poolProfileId=111&amp;poolName=Back+Yard">Tests</a>
+      <a href="/PoolProfile-Edit?poolProfileId=111&poolName=Back+Yard">Edit</a>
+    </div>
+    <div class="pool-profile">
+      <a href='/WaterTest-Landing?poolProfileId=222&poolName=Spa'>Tests</a>
+    </div>
+    """
+
+    assert parse_pool_profiles(html) == [
+        {"pool_profile_id": "111", "pool_name": "Back+Yard", "title": "Back Yard"},
+        {"pool_profile_id": "222", "pool_name": "Spa", "title": "Spa"},
+    ]
+    assert parse_pool_profiles("<html></html>") == []
+
+
+def test_csrf_token_split_across_chunks():
+    """Test a token input split over chunk boundaries is still found."""
+    page = b'<form><input type="hidden" name="csrf_token" value="a&amp;b"></form>'
+    chunks = [page[i : i + 7] for i in range(0, len(page), 7)]
+
+    assert extract_csrf_token(chunks) == "a&b"
+
+
+def test_csrf_token_extraction_stops_early():
+    """Test chunks after the token input are left unread."""
+    chunks = iter(
+        [b'<input name="email"><input name="csrf_token" value="t">', b"<p>rest</p>"]
+    )
+
+    assert extract_csrf_token(chunks) == "t"
+    assert next(chunks) == b"<p>rest</p>"
+
+
+def test_csrf_token_scan_is_bounded():
+    """Test the scan gives up after the byte limit or without a token."""
+    late = [b"<p>filler</p>" * 10, b'<input name="csrf_token" value="t">']
+
+    assert extract_csrf_token(iter(late), limit=100) is None
+    assert extract_csrf_token([b'<input name="csrf_token">']) is None
+    assert extract_csrf_token([b"<html></html>"]) is None
@@ -0,0 +1,93 @@
+"""Test the Leslie's Pool Water Tests shared rate limiter."""
+
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+from homeassistant.components.leslies_pool.const import FETCH_BURST
+from homeassistant.components.leslies_pool.const import FETCH_RATE
+from homeassistant.components.leslies_pool.ratelimit import TokenBucket
+from homeassistant.components.leslies_pool.ratelimit import stagger_offset
+
+
+async def test_bucket_allows_burst_then_paces():
+    """Test the bucket serves its burst immediately and then waits on the loop."""
+    with patch(
+        "homeassistant.components.leslies_pool.ratelimit.time.monotonic",
+        return_value=100.0,
+    ), patch(
+        "homeassistant.components.leslies_pool.ratelimit.asyncio.sleep"
+    ) as mock_sleep:
+        bucket = TokenBucket(rate=2.0, capacity=3)
+        waits = [await bucket.async_acquire() for _ in range(5)]
+
+    assert waits == [0.0, 0.0, 0.0, pytest.approx(0.5), pytest.approx(1.0)]
+    assert mock_sleep.call_count == 2
+
+
+async def test_bucket_refills_over_time():
+    """Test tokens come back at the configured rate up to the capacity."""
+    with patch(
+        "homeassistant.components.leslies_pool.ratelimit.time.monotonic"
+    ) as mock_monotonic, patch(
+        "homeassistant.components.leslies_pool.ratelimit.asyncio.sleep"
+    ):
+        mock_monotonic.return_value = 0.0
+        bucket = TokenBucket(rate=1.0, capacity=2)
+        await bucket.async_acquire()
+        await bucket.async_acquire()
+        mock_monotonic.return_value = 60.0
+        assert await bucket.async_acquire() == 0.0
+        assert await bucket.async_acquire() == 0.0
+        assert await bucket.async_acquire() == pytest.approx(1.0)
+
+
+async def test_charges_delay_later_callers():
+    """Test requests charged from executor jobs push back the next waiter."""
+    with patch(
+        "homeassistant.components.leslies_pool.ratelimit.time.monotonic",
+        return_value=0.0,
+    ), patch("homeassistant.components.leslies_pool.ratelimit.asyncio.sleep"):
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        bucket.charge()
+        bucket.charge()
+        assert await bucket.async_acquire() == pytest.approx(2.0)
+
+
+async def test_reserved_token_pays_for_first_request():
+    """Test a job's first request uses the token reserved on the loop."""
+    with patch(
+        "homeassistant.components.leslies_pool.ratelimit.time.monotonic",
+        return_value=0.0,
+    ), patch("homeassistant.components.leslies_pool.ratelimit.asyncio.sleep"):
+        api = LesliesPoolApi("user", "pass", "123456", "Pool")
+        api.fetch_bucket = TokenBucket(rate=1.0, capacity=1)
+        await api.async_reserve()
+        await api.async_reserve()  # Already reserved, nothing more is taken
+
+        api._spend(api.fetch_bucket)  # First request of the job
+        assert await api.fetch_bucket.async_acquire() == pytest.approx(1.0)
+        api._spend(api.fetch_bucket)  # A retry is charged
+        assert await api.fetch_bucket.async_acquire() == pytest.approx(3.0)
+    api.close()
+
+
+async def test_setup_burst_is_spread_out():
+    """Test entries set up together do not all fetch at once."""
+    with patch(
+        "homeassistant.components.leslies_pool.ratelimit.time.monotonic",
+        return_value=0.0,
+    ), patch("homeassistant.components.leslies_pool.ratelimit.asyncio.sleep"):
+        bucket = TokenBucket(FETCH_RATE, FETCH_BURST)
+        waits = [await bucket.async_acquire() for _ in range(4)]
+
+    assert waits == [0.0, *(pytest.approx(n / FETCH_RATE) for n in range(1, 4))]
+
+
+def test_stagger_offsets_spread_over_interval():
+    """Test successive entries get offsets spread across the interval."""
+    offsets = sorted(stagger_offset(300) for _ in range(10))
+
+    assert all(0 <= offset < 300 for offset in offsets)
+    gaps = [b - a for a, b in zip(offsets, offsets[1:])]
+    assert min(gaps) > 300 / 10 / 3
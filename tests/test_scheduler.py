@@ -0,0 +1,163 @@
+"""Test the per-account priority scheduler."""
+
+import asyncio
+from datetime import timedelta
+import time
+from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
+
+from homeassistant.components.leslies_pool.coordinator import LesliesPoolCoordinator
+from homeassistant.components.leslies_pool.scheduler import AccountScheduler
+from homeassistant.components.leslies_pool.scheduler import Priority
+from homeassistant.components.leslies_pool.scheduler import async_get_scheduler
+
+
+async def _job(scheduler, priority, order, name, ticket=None):
+    """Hold the scheduler briefly and record when the job ran."""
+    async with scheduler.slot(ticket or scheduler.ticket(priority)):
+        order.append(name)
+        await asyncio.sleep(0)
+
+
+async def test_waiting_jobs_run_by_priority():
+    """Test queued jobs run most urgent first, then in arrival order."""
+    scheduler = AccountScheduler()
+    order = []
+    holder = scheduler.ticket(Priority.BACKGROUND)
+
+    async with scheduler.slot(holder):
+        jobs = [
+            asyncio.create_task(_job(scheduler, priority, order, name))
+            for priority, name in (
+                (Priority.BACKGROUND, "export"),
+                (Priority.SCHEDULED, "poll 1"),
+                (Priority.INTERACTIVE, "refresh"),
+                (Priority.SCHEDULED, "poll 2"),
+            )
+        ]
+        await asyncio.sleep(0)
+        assert scheduler._preempt
+
+    await asyncio.gather(*jobs)
+    assert order == ["refresh", "poll 1", "poll 2", "export"]
+
+
+async def test_promoted_job_moves_ahead():
+    """Test a user joining a queued poll raises it to interactive."""
+    scheduler = AccountScheduler()
+    order = []
+    holder = scheduler.ticket(Priority.SCHEDULED)
+    joined = scheduler.ticket(Priority.SCHEDULED)
+
+    async with scheduler.slot(holder):
+        first = asyncio.create_task(
+            _job(scheduler, Priority.SCHEDULED, order, "other poll")
+        )
+        second = asyncio.create_task(
+            _job(scheduler, Priority.SCHEDULED, order, "joined poll", joined)
+        )
+        await asyncio.sleep(0)
+        scheduler.promote(joined, Priority.INTERACTIVE)
+
+    await asyncio.gather(first, second)
+    assert order == ["joined poll", "other poll"]
+    # Waits are reported under the class the job was submitted in
+    assert scheduler.queue_wait[Priority.SCHEDULED].waits == 3
+
+
+async def test_cancelled_waiter_is_skipped():
+    """Test a job that stops waiting does not block the queue."""
+    scheduler = AccountScheduler()
+    order = []
+
+    async with scheduler.slot(scheduler.ticket(Priority.BACKGROUND)):
+        cancelled = asyncio.create_task(
+            _job(scheduler, Priority.INTERACTIVE, order, "cancelled")
+        )
+        waiting = asyncio.create_task(
+            _job(scheduler, Priority.SCHEDULED, order, "poll")
+        )
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+
+    await waiting
+    assert order == ["poll"]
+    assert not scheduler.busy
+
+
+async def test_background_work_is_preempted_at_checkpoints(hass):
+    """Test interactive work waits at most one batch behind a long export."""
+    scheduler = AccountScheduler()
+    batch_time = 0.02
+    order = []
+
+    def _export(ticket):
+        for batch in range(50):
+            time.sleep(batch_time)
+            order.append(f"batch {batch}")
+            scheduler.checkpoint(ticket, hass.loop)
+
+    async def _background():
+        ticket = scheduler.ticket(Priority.BACKGROUND)
+        async with scheduler.slot(ticket):
+            await hass.async_add_executor_job(_export, ticket)
+
+    export = hass.async_create_task(_background())
+    await asyncio.sleep(batch_time * 3)
+    await _job(scheduler, Priority.INTERACTIVE, order, "refresh")
+    await export
+
+    assert "refresh" in order[:10]
+    assert order[-1] == "batch 49"
+    report = scheduler.queue_wait_report()
+    assert report["interactive"]["waits"] == 1
+    assert report["interactive"]["max_seconds"] < batch_time * 5
+
+
+async def test_entries_of_an_account_share_a_scheduler(hass):
+    """Test schedulers are per account, whatever the username's case."""
+    scheduler = async_get_scheduler(hass, "User@Example.com")
+
+    assert async_get_scheduler(hass, " user@example.com") is scheduler
+    assert async_get_scheduler(hass, "other@example.com") is not scheduler
+
+
+async def test_user_refresh_is_interactive(hass):
+    """Test refreshes requested through entities jump ahead of polls."""
+    api = MagicMock()
+    api.fetch_water_test_data = MagicMock(return_value={"ph": "7.4"})
+    api.new_rows = []
+    api.async_reserve = AsyncMock()
+    coordinator = LesliesPoolCoordinator(
+        hass, api, timedelta(seconds=300), freshness_window=0
+    )
+
+    await coordinator.async_refresh()
+    await coordinator.async_request_refresh()
+    await coordinator.async_shutdown()
+
+    report = coordinator.scheduler.queue_wait_report()
+    assert report["scheduled"]["waits"] == 1
+    assert report["interactive"]["waits"] == 1
+
+
+async def test_poll_during_refresh_cooldown_stays_scheduled(hass):
+    """Test a poll that runs while a user refresh is debounced is not promoted."""
+    api = MagicMock()
+    api.fetch_water_test_data = MagicMock(return_value={"ph": "7.4"})
+    api.new_rows = []
+    api.async_reserve = AsyncMock()
+    coordinator = LesliesPoolCoordinator(
+        hass, api, timedelta(seconds=300), freshness_window=0
+    )
+
+    await coordinator.async_request_refresh()
+    # Still cooling down, so this request is deferred to the end of the timer
+    await coordinator.async_request_refresh()
+    await coordinator.async_refresh()
+    await coordinator.async_shutdown()
+
+    report = coordinator.scheduler.queue_wait_report()
+    assert report["interactive"]["waits"] == 1
+    assert report["scheduled"]["waits"] == 1
@@ -3,12 +3,18 @@
 import logging
 from datetime import timedelta
 from unittest.mock import AsyncMock
+from unittest.mock import MagicMock
 from unittest.mock import patch
 
 import pytest
 from homeassistant.components.leslies_pool.const import DOMAIN
 from homeassistant.components.leslies_pool.sensor import async_setup_entry
 from homeassistant.components.leslies_pool.sensor import LesliesPoolSensor
+from homeassistant.components.leslies_pool.sensor import SENSOR_DESCRIPTIONS
+from homeassistant.components.leslies_pool.sensor import TREND_DESCRIPTIONS
+from homeassistant.components.leslies_pool.sensor import WATER_BALANCE_DESCRIPTIONS
+from homeassistant.components.leslies_pool.trends import TREND_CHEMICALS
+from homeassistant.components.leslies_pool.trends import TREND_WINDOWS
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -41,10 +47,17 @@ def mock_coordinator(hass):
     )
     coordinator.data = {sensor: 1 for sensor in SENSOR_TYPES}
     coordinator.async_refresh = AsyncMock()
-    coordinator.async_add_listener = AsyncMock()
+    coordinator.async_add_listener = MagicMock()
     return coordinator
 
 
+def _description(key):
+    """Return the entity description for a sensor key."""
+    return next(
+        description for description in SENSOR_DESCRIPTIONS if description.key == key
+    )
+
+
 async def test_async_setup_entry(hass, mock_coordinator):
     """Test setting up the config entry."""
     mock_entry = AsyncMock()
@@ -66,7 +79,10 @@ async def test_async_setup_entry(hass, mock_coordinator):
         await async_setup_entry(hass, mock_entry, async_add_entities)
 
     assert async_add_entities.call_count == 1
-    assert len(async_add_entities.call_args[0][0]) == len(SENSOR_TYPES)
+    assert len(TREND_DESCRIPTIONS) == len(TREND_CHEMICALS) * len(TREND_WINDOWS)
+    assert len(async_add_entities.call_args[0][0]) == len(SENSOR_TYPES) + len(
+        TREND_DESCRIPTIONS
+    ) + len(WATER_BALANCE_DESCRIPTIONS)
 
 
 async def test_sensor_properties(hass, mock_coordinator):
@@ -75,12 +91,12 @@ async def test_sensor_properties(hass, mock_coordinator):
     mock_entry.entry_id = "test_entry"
 
     sensor = LesliesPoolSensor(
-        mock_coordinator, mock_entry, "free_chlorine", "Free Chlorine", "ppm"
+        mock_coordinator, mock_entry, _description("free_chlorine")
     )
 
     assert sensor.unique_id == "test_entry_leslies_free_chlorine"
-    assert sensor.name == "Free Chlorine"
-    assert sensor.state == 1
+    assert sensor.name == "Leslies Free Chlorine"
+    assert sensor.native_value == 1
     assert sensor.available
     assert sensor.device_info == {
         "identifiers": {(DOMAIN, "test_entry")},
@@ -89,7 +105,25 @@ async def test_sensor_properties(hass, mock_coordinator):
         "model": "Water Test",
         "entry_type": "service",
     }
-    assert sensor.unit_of_measurement == "ppm"
+    assert sensor.native_unit_of_measurement == "ppm"
+
+
+async def test_blank_readings_are_unknown(hass, mock_coordinator):
+    """Test readings the site leaves blank or marks N/A have no state."""
+    mock_entry = AsyncMock()
+    mock_entry.entry_id = "test_entry"
+    mock_coordinator.data.update(free_chlorine="", salt="N/A", ph="7.4")
+
+    def _value(key):
+        """Return the state of one sensor."""
+        return LesliesPoolSensor(
+            mock_coordinator, mock_entry, _description(key)
+        ).native_value
+
+    assert _value("free_chlorine") is None
+    assert _value("salt") is None
+    assert _value("ph") == 7.4
+    assert _value("in_store") == 1
 
 
 async def test_sensor_update(hass, mock_coordinator):
@@ -98,7 +132,7 @@ async def test_sensor_update(hass, mock_coordinator):
     mock_entry.entry_id = "test_entry"
 
     sensor = LesliesPoolSensor(
-        mock_coordinator, mock_entry, "free_chlorine", "Free Chlorine", "ppm"
+        mock_coordinator, mock_entry, _description("free_chlorine")
     )
 
     with patch.object(
@@ -114,7 +148,7 @@ async def test_sensor_added_to_hass(hass, mock_coordinator):
     mock_entry.entry_id = "test_entry"
 
     sensor = LesliesPoolSensor(
-        mock_coordinator, mock_entry, "free_chlorine", "Free Chlorine", "ppm"
+        mock_coordinator, mock_entry, _description("free_chlorine")
     )
 
     with patch.object(sensor, "async_write_ha_state", AsyncMock()):
@@ -122,5 +156,69 @@ async def test_sensor_added_to_hass(hass, mock_coordinator):
         assert mock_coordinator.async_add_listener.call_count == 1
         assert (
             mock_coordinator.async_add_listener.call_args[0][0]
-            == sensor.async_write_ha_state
+            == sensor._handle_coordinator_update
         )
+
+
+async def test_trend_sensor(hass, mock_coordinator):
+    """Test trend sensor state and attributes."""
+    mock_entry = AsyncMock()
+    mock_entry.entry_id = "test_entry"
+    mock_coordinator.data["_last_poll"] = "2025-05-21T12:00:00"
+    mock_coordinator.data["trends"] = {
+        "ph": {
+            7: {
+                "mean": 7.4,
+                "std_dev": 0.1,
+                "lower_band": 7.2,
+                "upper_band": 7.6,
+                "rate_of_change": -0.05,
+                "samples": 4,
+            }
+        }
+    }
+
+    sensor = LesliesPoolSensor(
+        mock_coordinator, mock_entry, _description("ph_7d_average")
+    )
+
+    assert sensor.unique_id == "test_entry_leslies_ph_7d_average"
+    assert sensor.name == "Leslies pH 7d Average"
+    assert sensor.native_unit_of_measurement == "pH"
+    assert sensor.native_value == 7.4
+    assert sensor.extra_state_attributes == {
+        "std_dev": 0.1,
+        "lower_band": 7.2,
+        "upper_band": 7.6,
+        "rate_of_change": -0.05,
+        "samples": 4,
+        "data_timestamp": "2025-05-21T12:00:00",
+    }
+
+
+async def test_balance_sensor(hass, mock_coordinator):
+    """Test water balance sensor state and attributes."""
+    mock_entry = AsyncMock()
+    mock_entry.entry_id = "test_entry"
+    mock_coordinator.data["_last_poll"] = "2025-05-21T12:00:00"
+    mock_coordinator.data["water_balance"] = {
+        "saturation_index": -0.42,
+        "fc_cya_ratio": 5.0,
+        "out_of_range": 2,
+        "out_of_range_readings": ["saturation_index", "fc_cya_ratio"],
+    }
+
+    lsi = LesliesPoolSensor(
+        mock_coordinator, mock_entry, _description("saturation_index")
+    )
+    flags = LesliesPoolSensor(
+        mock_coordinator, mock_entry, _description("out_of_range")
+    )
+
+    assert lsi.native_value == -0.42
+    assert lsi.extra_state_attributes == {"data_timestamp": "2025-05-21T12:00:00"}
+    assert flags.native_value == 2
+    assert flags.extra_state_attributes["readings"] == [
+        "saturation_index",
+        "fc_cya_ratio",
+    ]
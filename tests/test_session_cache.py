@@ -0,0 +1,70 @@
+"""Test the Leslie's Pool Water Tests session hand-off cache."""
+
+from unittest.mock import patch
+
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+from homeassistant.components.leslies_pool.session_cache import async_claim_session
+from homeassistant.components.leslies_pool.session_cache import async_park_session
+
+
+async def test_claim_parked_session(hass):
+    """Test a parked session is handed to the next claimant exactly once."""
+    api = LesliesPoolApi("User@Example.com", "secret", "123456", "TestPool")
+    async_park_session(hass, api)
+
+    assert async_claim_session(hass, "user@example.com", "secret", "123456") is api
+    assert async_claim_session(hass, "user@example.com", "secret", "123456") is None
+
+
+async def test_claim_rejects_changed_password(hass):
+    """Test a parked session is not reused with different credentials."""
+    api = LesliesPoolApi("user@example.com", "old", "123456", "TestPool")
+    async_park_session(hass, api)
+
+    assert async_claim_session(hass, "user@example.com", "new", "123456") is None
+
+
+async def test_claim_rejects_expired_session(hass):
+    """Test a parked session past its TTL is discarded."""
+    api = LesliesPoolApi("user@example.com", "secret", "123456", "TestPool")
+    with patch(
+        "homeassistant.components.leslies_pool.session_cache.time.monotonic",
+        return_value=0,
+    ):
+        async_park_session(hass, api)
+
+    with patch(
+        "homeassistant.components.leslies_pool.session_cache.time.monotonic",
+        return_value=10_000,
+    ):
+        assert async_claim_session(hass, "user@example.com", "secret", "123456") is None
+
+
+async def test_sibling_pools_share_parked_session(hass):
+    """Test each pool of an account claims its own client over one session."""
+    api = LesliesPoolApi("user@example.com", "secret")
+    first = api.for_pool("111", "Pool")
+    second = api.for_pool("222", "Spa")
+    async_park_session(hass, first)
+    async_park_session(hass, second)
+
+    assert async_claim_session(hass, "user@example.com", "secret", "222") is second
+    assert async_claim_session(hass, "user@example.com", "secret", "111") is first
+    assert first.session is second.session is api.session
+
+
+async def test_discarding_sibling_keeps_shared_session(hass):
+    """Test a discarded client does not close a session siblings still use."""
+    api = LesliesPoolApi("user@example.com", "secret")
+    first = api.for_pool("111", "Pool")
+    second = api.for_pool("222", "Spa")
+    api.close()
+    async_park_session(hass, first)
+
+    with patch.object(first.session, "close") as close:
+        # A wrong password rejects the parked client
+        assert async_claim_session(hass, "user@example.com", "other", "111") is None
+        assert close.call_count == 0
+
+        second.close()
+        assert close.call_count == 1
@@ -0,0 +1,96 @@
+"""Test the result cache shared between Home Assistant instances."""
+
+import threading
+import time
+from unittest.mock import patch
+
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+from homeassistant.components.leslies_pool.shared_cache import DirectoryCache
+from homeassistant.components.leslies_pool.shared_cache import cache_key
+
+
+def test_cache_key_hides_the_account():
+    """Test keys are stable per pool and do not contain the username."""
+    key = cache_key("User@Example.com", "123456")
+
+    assert key == cache_key("user@example.com", "123456")
+    assert key != cache_key("user@example.com", "654321")
+    assert "example" not in key
+
+
+def test_entries_expire_after_ttl(tmp_path):
+    """Test entries are served until they are older than the TTL."""
+    cache = DirectoryCache(str(tmp_path / "shared"))
+
+    with patch(
+        "homeassistant.components.leslies_pool.shared_cache.time.time",
+        side_effect=[1000.0, 1299.0, 1300.0],
+    ):
+        cache.put("key", {"response": "<table/>"})
+        assert cache.get("key", ttl=300) == {"response": "<table/>"}
+        assert cache.get("key", ttl=300) is None
+
+
+def test_one_instance_refreshes_per_window(tmp_path):
+    """Test concurrent instances elect a single refresher and share its result."""
+    calls = []
+
+    def fetch():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return {"response": "<table/>"}
+
+    results = []
+    instances = [
+        threading.Thread(
+            target=lambda: results.append(
+                DirectoryCache(str(tmp_path)).get_or_refresh("key", 300, fetch, wait=5)
+            )
+        )
+        for _ in range(4)
+    ]
+    for instance in instances:
+        instance.start()
+    for instance in instances:
+        instance.join()
+
+    assert len(calls) == 1
+    assert results == [{"response": "<table/>"}] * 4
+
+
+def test_failed_fetches_are_not_shared(tmp_path):
+    """Test a fetch that returns None leaves the cache empty."""
+    cache = DirectoryCache(str(tmp_path))
+
+    assert cache.get_or_refresh("key", 300, lambda: None, wait=1) is None
+    assert cache.get("key", 300) is None
+
+
+def test_unreachable_cache_falls_back_to_upstream(tmp_path):
+    """Test a broken shared volume does not stop polling."""
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+    cache = DirectoryCache(str(blocker / "shared"))
+
+    assert cache.get_or_refresh("key", 300, lambda: {"response": ""}, wait=1) == {
+        "response": ""
+    }
+
+
+def test_instances_share_one_upstream_fetch(fake_server, tmp_path):
+    """Test a second instance polling the same pool does not go upstream."""
+    instances = []
+    for _ in range(2):
+        api = LesliesPoolApi("user", "pass", "123456", "Pool")
+        fake_server.configure(api)
+        api.shared_cache = DirectoryCache(str(tmp_path))
+        assert api.authenticate()
+        instances.append(api)
+
+    first, second = (api.fetch_water_test_data() for api in instances)
+    for api in instances:
+        api.session.close()
+
+    assert fake_server.landings == 1
+    assert first == second
+    assert second["test_date"] == "05/21/2025"
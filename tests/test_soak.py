@@ -0,0 +1,120 @@
+"""Soak test for long-running memory, cookie-jar and socket growth.
+
+The harness drives ``LesliesPoolApi`` against a local fake server for many
+fetch and re-auth cycles and fails if RSS, the cookie jar, open sockets or
+traced allocations keep growing after warm-up. It is opt-in because a useful
+run takes minutes:
+
+    LESLIES_SOAK_CYCLES=20000 pytest tests/test_soak.py
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import gc
+import os
+import statistics
+import tracemalloc
+
+import pytest
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+
+SOAK_CYCLES = int(os.environ.get("LESLIES_SOAK_CYCLES", "0"))
+SAMPLE_EVERY = 100
+EXPIRE_EVERY = 10  # Force a re-auth every 10th poll
+
+# Allowed growth between the first and last quarter of samples after warm-up
+MAX_RSS_GROWTH = 16 * 1024 * 1024
+MAX_TRACED_GROWTH = 2 * 1024 * 1024
+MAX_SOCKET_GROWTH = 2
+
+pytestmark = pytest.mark.skipif(
+    SOAK_CYCLES <= 0, reason="set LESLIES_SOAK_CYCLES to run the soak test"
+)
+
+
+@dataclass
+class Sample:
+    """Resource usage measured after a cycle."""
+
+    cycle: int
+    rss: int
+    cookies: int
+    sockets: int
+    traced: int
+
+
+def _rss_bytes() -> int:
+    """Return the resident set size of this process."""
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def _open_sockets() -> int:
+    """Return the number of open socket file descriptors."""
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+def _growth(samples: list[Sample], field: str) -> float:
+    """Return the growth of a metric between the first and last quarter."""
+    quarter = max(len(samples) // 4, 1)
+    head = [getattr(sample, field) for sample in samples[:quarter]]
+    tail = [getattr(sample, field) for sample in samples[-quarter:]]
+    return statistics.mean(tail) - statistics.mean(head)
+
+
+@pytest.fixture
+def fake_server(fake_server_factory):
+    """Run a fake Leslie's server that forces regular re-auths."""
+    return fake_server_factory(expire_every=EXPIRE_EVERY)
+
+
+@pytest.mark.skipif(
+    not os.path.exists("/proc/self/statm"), reason="requires Linux procfs"
+)
+def test_soak_fetch_and_reauth(fake_server):
+    """Test resource usage stays bounded over many fetch and re-auth cycles."""
+    api = LesliesPoolApi("soak@example.com", "secret", "123456", "Pool")
+    fake_server.configure(api)
+    # The soak measures the client itself, not the shared request budgets
+    api.login_bucket = api.fetch_bucket = None
+    assert api.authenticate()
+
+    tracemalloc.start()
+    samples: list[Sample] = []
+    try:
+        for cycle in range(1, SOAK_CYCLES + 1):
+            data = api.fetch_water_test_data()
+            assert data["salt"] == "4000", f"fetch failed on cycle {cycle}"
+
+            if cycle % SAMPLE_EVERY == 0:
+                gc.collect()
+                samples.append(
+                    Sample(
+                        cycle=cycle,
+                        rss=_rss_bytes(),
+                        cookies=len(api.session.cookies),
+                        sockets=_open_sockets(),
+                        traced=tracemalloc.get_traced_memory()[0],
+                    )
+                )
+    finally:
+        tracemalloc.stop()
+        api.session.close()
+
+    # Discard the first samples while caches and connection pools warm up
+    steady = samples[len(samples) // 5 :]
+    assert len(steady) >= 4, "increase LESLIES_SOAK_CYCLES for a meaningful run"
+
+    assert fake_server.logins > SOAK_CYCLES // EXPIRE_EVERY // 2
+    assert max(s.cookies for s in steady) <= max(s.cookies for s in samples[:2])
+    assert _growth(steady, "sockets") <= MAX_SOCKET_GROWTH
+    assert _growth(steady, "traced") <= MAX_TRACED_GROWTH
+    assert _growth(steady, "rss") <= MAX_RSS_GROWTH
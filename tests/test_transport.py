@@ -0,0 +1,149 @@
+"""Test the tuned HTTP transport for the Leslie's Pool API client."""
+
+import socket
+from unittest.mock import MagicMock
+from unittest.mock import patch
+
+import pytest
+from homeassistant.components.leslies_pool.api import LesliesPoolApi
+from homeassistant.components.leslies_pool.transport import ACCEPT_ENCODING
+from homeassistant.components.leslies_pool.transport import DNSCache
+from homeassistant.components.leslies_pool.transport import TransportAdapter
+from homeassistant.components.leslies_pool.transport import TransportStats
+from homeassistant.components.leslies_pool.transport import USER_AGENT
+from urllib3.connection import HTTPConnection
+from urllib3.exceptions import NewConnectionError
+
+
+def test_session_requests_compression():
+    """Test the client asks for compressed responses with its own user agent."""
+    api = LesliesPoolApi("user", "pass", "123456", "Pool")
+
+    assert "gzip" in ACCEPT_ENCODING
+    assert api.session.headers["Accept-Encoding"] == ACCEPT_ENCODING
+    assert api.session.headers["User-Agent"] == USER_AGENT
+
+
+def test_polls_reuse_one_connection(fake_server):
+    """Test login, landing and fetches share one kept-alive connection."""
+    api = LesliesPoolApi("user", "pass", "123456", "Pool")
+    fake_server.configure(api)
+
+    assert api.authenticate()
+    assert api.fetch_water_test_data()
+    first = api.last_poll_transport
+    assert api.fetch_water_test_data()
+    second = api.last_poll_transport
+    totals = api.transport_stats.snapshot()
+    api.session.close()
+
+    assert totals["connections"] == 1
+    assert totals["handshakes"] == 0  # Plain HTTP
+    assert first["requests"] == second["requests"] == 2
+    assert second["connections"] == 0
+    # Bodies arrive gzipped and are counted before decoding
+    assert 0 < second["bytes_received"] < second["bytes_decoded"]
+
+
+def test_sibling_pools_share_counters(fake_server):
+    """Test clients for other pools of the account count into one session."""
+    api = LesliesPoolApi("user", "pass", "123456", "Pool")
+    fake_server.configure(api)
+    sibling = api.for_pool("654321", "Spa")
+    fake_server.configure(sibling)
+
+    assert api.authenticate()
+    assert sibling.fetch_water_test_data()
+    api.session.close()
+
+    assert sibling.transport_stats is api.transport_stats
+    assert api.transport_stats.snapshot()["connections"] == 1
+
+
+def test_dns_cache_reuses_addresses():
+    """Test lookups are cached until their TTL passes."""
+    cache = DNSCache(ttl=60)
+    stats = TransportStats()
+    answer = [
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("203.0.113.7", 443)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("203.0.113.8", 443)),
+        (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("203.0.113.7", 443)),
+    ]
+    addresses = ["203.0.113.7", "203.0.113.8"]
+
+    with patch(
+        "homeassistant.components.leslies_pool.transport.socket.getaddrinfo",
+        return_value=answer,
+    ) as getaddrinfo, patch(
+        "homeassistant.components.leslies_pool.transport.allowed_gai_family",
+        return_value=socket.AF_INET,
+    ), patch(
+        "homeassistant.components.leslies_pool.transport.time.monotonic",
+        side_effect=[0.0, 30.0, 61.0],
+    ):
+        assert cache.resolve("lesliespool.com", 443, stats) == addresses
+        assert cache.resolve("lesliespool.com", 443, stats) == addresses
+        assert cache.resolve("lesliespool.com", 443, stats) == addresses
+
+    assert getaddrinfo.call_count == 2
+    # Only the families urllib3 allows are looked up
+    assert getaddrinfo.call_args.kwargs["family"] == socket.AF_INET
+    assert stats.snapshot()["dns_lookups"] == 2
+
+
+def test_dns_failure_is_left_to_the_connection():
+    """Test a failed lookup returns the host so the connection error surfaces."""
+    cache = DNSCache(ttl=60)
+
+    with patch(
+        "homeassistant.components.leslies_pool.transport.socket.getaddrinfo",
+        side_effect=socket.gaierror,
+    ):
+        assert cache.resolve("lesliespool.com", 443, TransportStats()) == [
+            "lesliespool.com"
+        ]
+
+
+def _connect_to(cache, reachable):
+    """Open a connection through the cache, reaching only ``reachable``."""
+    adapter = TransportAdapter(dns_cache=cache)
+    connection_cls = adapter._pool_classes["http"].ConnectionCls
+    tried = []
+
+    def _new_conn(connection):
+        tried.append(connection._dns_host)
+        if connection._dns_host != reachable:
+            raise NewConnectionError(connection, "Connection refused")
+        return MagicMock()
+
+    connection = connection_cls("lesliespool.com", 80)
+    with patch.object(HTTPConnection, "_new_conn", autospec=True) as new_conn:
+        new_conn.side_effect = _new_conn
+        try:
+            connection._new_conn()
+        finally:
+            adapter.close()
+    assert connection._dns_host == "lesliespool.com"
+    return tried
+
+
+def test_connection_falls_back_to_next_address():
+    """Test an unreachable address is skipped for the host's next one."""
+    cache = DNSCache(ttl=60)
+    cache._addresses[("lesliespool.com", 80)] = (
+        ["2001:db8::7", "203.0.113.7"],
+        float("inf"),
+    )
+
+    assert _connect_to(cache, "203.0.113.7") == ["2001:db8::7", "203.0.113.7"]
+
+
+def test_failed_addresses_are_forgotten():
+    """Test the host is resolved again once every cached address failed."""
+    cache = DNSCache(ttl=60)
+    cache._addresses[("lesliespool.com", 80)] = (["203.0.113.7"], float("inf"))
+
+    with pytest.raises(NewConnectionError):
+        _connect_to(cache, None)
+
+    assert ("lesliespool.com", 80) not in cache._addresses
@@ -0,0 +1,85 @@
+"""Test the Leslie's Pool Water Tests rolling statistics."""
+
+from datetime import datetime
+from datetime import timedelta
+import statistics
+
+import pytest
+from homeassistant.components.leslies_pool.coordinator import parse_test_date
+from homeassistant.components.leslies_pool.trends import ChemicalTrends
+from homeassistant.components.leslies_pool.trends import RollingWindow
+
+START = datetime(2025, 5, 1, 12)
+
+
+def test_window_matches_full_recompute():
+    """Test incremental statistics match a recompute over the window."""
+    window = RollingWindow(7)
+    values = [3.0, 2.5, 4.0, 3.5, 1.0, 2.0, 5.0, 4.5, 3.0, 2.0, 6.0, 1.5]
+    for day, value in enumerate(values):
+        window.add(START + timedelta(days=day), value)
+
+    # Only the samples from the last seven days remain
+    expected = values[-7:]
+    assert len(window) == 7
+    assert window.mean == pytest.approx(statistics.mean(expected))
+    assert window.std_dev == pytest.approx(statistics.stdev(expected))
+
+
+def test_window_rate_of_change():
+    """Test the slope is reported in units per day."""
+    window = RollingWindow(30)
+    for day in range(5):
+        window.add(START + timedelta(days=day), 3000 + 50 * day)
+
+    assert window.rate_of_change == pytest.approx(50)
+
+
+def test_window_evicts_relative_to_now():
+    """Test samples age out when no new tests arrive."""
+    window = RollingWindow(7)
+    window.add(START, 7.4)
+    window.evict(START + timedelta(days=6))
+    assert window.mean == pytest.approx(7.4)
+
+    window.evict(START + timedelta(days=8))
+    assert window.mean is None
+    assert window.as_dict()["samples"] == 0
+
+
+def test_window_capacity_is_bounded():
+    """Test the ring buffer never grows beyond its capacity."""
+    window = RollingWindow(30, capacity=4)
+    for hour in range(10):
+        window.add(START + timedelta(hours=hour), float(hour))
+
+    assert len(window) == 4
+    assert window.mean == pytest.approx(7.5)
+
+
+def test_trends_skip_non_numeric_values():
+    """Test rows are fed oldest first and blank readings are ignored."""
+    trends = ChemicalTrends()
+    trends.add_rows(
+        [
+            {
+                "test_date": "05/03/2025",
+                "free_chlorine": "3.0",
+                "ph": "",
+                "salt": "N/A",
+            },
+            {
+                "test_date": "05/01/2025",
+                "free_chlorine": "1.0",
+                "ph": "7.4",
+                "salt": "3200",
+            },
+        ],
+        parse_test_date,
+    )
+
+    snapshot = trends.snapshot()
+    assert snapshot["free_chlorine"][7]["mean"] == 2.0
+    assert snapshot["free_chlorine"][7]["rate_of_change"] == 1.0
+    assert snapshot["ph"][7]["samples"] == 1
+    assert snapshot["salt"][30]["mean"] == 3200